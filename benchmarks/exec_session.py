@@ -0,0 +1,101 @@
+"""
+Throughput of concurrent exec sessions in one worker.
+
+Every session relays a `cat`-like pod: each message the client sends is
+echoed back. One extra session is stalled (its pod never answers) to show
+it does not hold up the others. Reports messages per second and the
+slowest round trip.
+
+    PYTHONPATH=src python benchmarks/exec_session.py --sessions 200 --messages 200
+"""
+import argparse
+import asyncio
+import queue
+import time
+from types import SimpleNamespace
+
+from kubernetes.stream.ws_client import STDIN_CHANNEL, STDOUT_CHANNEL
+from websocket import ABNF, WebSocketConnectionClosedException
+
+from base.exec_session import ExecSession
+
+
+class EchoStream:
+    def __init__(self, echo: bool = True):
+        self.frames: "queue.Queue" = queue.Queue()
+        self.echo = echo
+        self.sock = self
+
+    def recv_data_frame(self, control_frame: bool):
+        frame = self.frames.get()
+        if frame is None:
+            raise WebSocketConnectionClosedException("aborted")
+        return frame
+
+    def abort(self):
+        self.frames.put(None)
+
+    def write_channel(self, channel: int, data: bytes):
+        if self.echo and channel == STDIN_CHANNEL:
+            self.frames.put((ABNF.OPCODE_BINARY, SimpleNamespace(data=bytes([STDOUT_CHANNEL]) + data)))
+
+    def close(self):
+        pass
+
+
+class Client:
+    def __init__(self):
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.output: asyncio.Queue = asyncio.Queue()
+
+    async def accept(self):
+        pass
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def send_text(self, text: str):
+        await self.output.put(text)
+
+    async def send_bytes(self, data: bytes):
+        await self.output.put(data)
+
+    async def close(self, code: int = 1000, reason: str = None):
+        pass
+
+
+async def drive(client: Client, messages: int) -> float:
+    slowest = 0.0
+    for index in range(messages):
+        started = time.perf_counter()
+        client.incoming.put_nowait({"type": "websocket.receive", "text": f"{index}\n"})
+        await client.output.get()
+        slowest = max(slowest, time.perf_counter() - started)
+    client.incoming.put_nowait({"type": "websocket.disconnect"})
+    return slowest
+
+
+async def main(sessions: int, messages: int) -> None:
+    pods = [EchoStream(echo=index > 0) for index in range(sessions + 1)]
+    clients = [Client() for _ in pods]
+    connected = iter(pods)
+    ExecSession._connect = lambda self: next(connected)
+    runs = [asyncio.create_task(ExecSession(client, "default", f"pod-{index}", "shell").run()) for index, client in enumerate(clients)]
+
+    started = time.perf_counter()
+    slowest = await asyncio.gather(*(drive(client, messages) for client in clients[1:]))
+    elapsed = time.perf_counter() - started
+
+    clients[0].incoming.put_nowait({"type": "websocket.disconnect"})
+    await asyncio.gather(*runs)
+    total = sessions * messages
+    print(f"{sessions} sessions (+1 stalled), {total} round trips in {elapsed:.2f}s: "
+          f"{total / elapsed:,.0f} msg/s, slowest round trip {max(slowest) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.messages))
@@ -0,0 +1,118 @@
+"""
+Secret masking on wide, deep and very large documents.
+
+Compares SecretMasker with the former recursive, in-place `mask_secrets`
+(run on a fresh copy, which is not timed) and, for CRD listings, with
+schema-driven masking. Reports the best of `--repeat` runs.
+
+    PYTHONPATH=src python benchmarks/masking.py --items 40000
+"""
+import argparse
+import copy
+import json
+import sys
+import time
+
+from base.masking import SchemaMask, SecretMasker
+
+
+def legacy_mask(value):
+    # mask_secrets before the masking engine, kept for comparison
+    if isinstance(value, dict):
+        for key in value:
+            if any(sensitive in key.lower() for sensitive in ["secret", "token", "password", "tls", "auth", "PrivateKey"]):
+                value[key] = "***REDACTED***"
+            elif isinstance(value[key], dict):
+                value[key] = legacy_mask(value[key])
+            elif isinstance(value[key], list):
+                value[key] = [legacy_mask(item) if isinstance(item, dict) else item for item in value[key]]
+    return value
+
+
+ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "spec": {
+            "type": "object",
+            "properties": {
+                "replicas": {"type": "integer"},
+                "password": {"type": "string"},
+                "users": {"type": "array", "items": {"type": "object", "properties": {"name": {"type": "string"}, "pw": {"type": "string", "format": "password"}}}},
+                "containers": {"type": "array", "items": {"type": "object", "properties": {
+                    "name": {"type": "string"},
+                    "image": {"type": "string"},
+                    "env": {"type": "array", "items": {"type": "object", "properties": {"name": {"type": "string"}, "value": {"type": "string"}}}},
+                }}},
+            },
+        },
+        "status": {"type": "object", "properties": {
+            "phase": {"type": "string"},
+            "conditions": {"type": "array", "items": {"type": "object", "properties": {"type": {"type": "string"}, "status": {"type": "string"}, "message": {"type": "string"}}}},
+        }},
+    },
+}
+
+
+def crd_item(index: int) -> dict:
+    return {
+        "apiVersion": "example.com/v1",
+        "kind": "Widget",
+        "metadata": {"name": f"widget-{index}", "namespace": "default", "resourceVersion": str(index), "labels": {f"label-{n}": "value" for n in range(5)}},
+        "spec": {
+            "replicas": 3,
+            "password": "p",
+            "users": [{"name": f"user-{n}", "pw": "x"} for n in range(3)],
+            "containers": [{"name": "app", "image": "registry/app:1", "env": [{"name": f"VAR_{n}", "value": "v"} for n in range(5)]}],
+        },
+        "status": {"phase": "Ready", "conditions": [{"type": f"C{n}", "status": "True", "message": "ok"} for n in range(3)]},
+    }
+
+
+def documents(items: int, width: int, depth: int) -> dict:
+    deep = leaf = {}
+    for _ in range(depth):
+        leaf["child"] = {"secret": "s", "value": 1}
+        leaf = leaf["child"]
+    return {
+        "large": {"apiVersion": "v1", "kind": "List", "items": [crd_item(index) for index in range(items)]},
+        "wide": {f"key-{index}": {"value": index, ("token" if index % 100 == 0 else "name"): "v"} for index in range(width)},
+        "deep": deep,
+    }
+
+
+def best_of(repeat: int, function, make_input) -> float:
+    timings = []
+    for _ in range(repeat):
+        value = make_input()
+        started = time.perf_counter()
+        function(value)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=20000, help="objects in the large listing")
+    parser.add_argument("--width", type=int, default=200000, help="keys of the wide document")
+    parser.add_argument("--depth", type=int, default=5000, help="nesting of the deep document")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    masker = SecretMasker()
+    schema_mask = SchemaMask(ITEM_SCHEMA, masker)
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), args.depth * 2 + 100))
+
+    for name, document in documents(args.items, args.width, args.depth).items():
+        size = len(json.dumps(document)) / 1e6 if name != "deep" else None
+        label = f"{name} ({size:.1f} MB)" if size else f"{name} ({args.depth} levels)"
+        engine = best_of(args.repeat, masker.mask, lambda: document)
+        legacy = best_of(args.repeat, legacy_mask, lambda: copy.deepcopy(document))
+        line = f"{label:<20} engine {engine:.3f}s   legacy {legacy:.3f}s"
+        if name == "large":
+            schema = best_of(args.repeat, lambda listing: [schema_mask.mask(item) for item in listing["items"]], lambda: document)
+            line += f"   schema paths {schema:.3f}s"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
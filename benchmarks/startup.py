@@ -0,0 +1,35 @@
+"""
+Time-to-ready of the application against the configured cluster.
+
+Imports `main`, runs its lifespan and polls /readiness until it returns
+200. Reports the import time, time-to-ready and how long every startup
+step took. Uses the kubeconfig or in-cluster configuration like the
+application does.
+
+    KUBECONFIG=~/.kube/config PYTHONPATH=src python benchmarks/startup.py
+"""
+import json
+import time
+
+started = time.perf_counter()
+import main  # noqa: E402
+imported = time.perf_counter() - started
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+def run(timeout: float = 120.0) -> None:
+    with TestClient(main.app) as client:
+        deadline = time.monotonic() + timeout
+        response = client.get("/readiness")
+        while response.status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.02)
+            response = client.get("/readiness")
+        status = response.json()
+    print(f"import main:   {imported:.3f}s")
+    print(f"time-to-ready: {status['startup_seconds']}s" if status["ready"] else f"not ready after {timeout:.0f}s")
+    print(json.dumps(status["steps"], indent=2))
+
+
+if __name__ == "__main__":
+    run()
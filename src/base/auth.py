@@ -2,23 +2,21 @@ import os
 import uuid
 import base64
 import logging
+import threading
 import jwt
-from jwt import PyJWKClient
 from fastapi import FastAPI, HTTPException, Depends, Request, status
 from fastapi.security.api_key import APIKeyHeader
 from fastapi.security import OAuth2AuthorizationCodeBearer, OAuth2PasswordBearer
-from kubernetes import client, config
+from kubernetes import client
+from base.clients import get_api
 from base.helpers import KubernetesHelper
+from base.jwks import get_jwks_cache
+from base.token_cache import get_token_cache
+from base.tracing import start_span
 from typing import Optional, Union
 
-# Configure logging for this module
+# Handlers and levels are configured by LoggerConfigurator (LOG_LEVELS=AuthWrapper=...)
 logger = logging.getLogger("AuthWrapper")
-if not logger.hasHandlers():
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-    logger.setLevel(logging.INFO)
 
 class AuthWrapper:
     def __init__(self, enable_validation: bool = True):
@@ -31,8 +29,9 @@ class AuthWrapper:
         self.enable_apikey = os.getenv("ENABLE_APIKEY", "true").lower() == "true"
         self.enable_oauth2 = os.getenv("ENABLE_OAUTH2", "true").lower() == "true"
 
-        # Initialize API key
-        self.API_KEY = self._initialize_api_key()
+        # The API key is read from the Kubernetes secret on first use (or by load_api_key at startup)
+        self._api_key: Optional[str] = None
+        self._api_key_lock = threading.Lock()
 
         # OAuth2 Authorization Code flow config for Keycloak
         self.oauth2_scheme = OAuth2AuthorizationCodeBearer(
@@ -62,6 +61,29 @@ class AuthWrapper:
             "https://sts.itlusions.com/realms/itlusions/protocol/openid-connect/certs"
         )
 
+    @property
+    def API_KEY(self) -> str:
+        """
+        The API key callers authenticate with, loaded once. Loading blocks on the
+        Kubernetes API: async code checks `_api_key` instead.
+        """
+        if self._api_key is None:
+            return self.load_api_key()
+        return self._api_key
+
+    def load_api_key(self) -> str:
+        """
+        Load the API key if it has not been loaded yet. Blocks on the Kubernetes API,
+        so the application calls it in the background during startup.
+
+        Returns:
+            str: The API key.
+        """
+        with self._api_key_lock:
+            if self._api_key is None:
+                self._api_key = self._initialize_api_key()
+        return self._api_key
+
     def _initialize_api_key(self) -> str:
         """
         Initialize the API key by retrieving it from a Kubernetes secret or environment variable,
@@ -114,8 +136,7 @@ class AuthWrapper:
             RuntimeError: If the secret or key is not found, or if decoding fails.
         """
         try:
-            config.load_incluster_config()
-            clientv1 = client.CoreV1Api()
+            clientv1 = get_api(client.CoreV1Api)
             secret = clientv1.read_namespaced_secret(name=secret_name, namespace=namespace)
 
             if key not in secret.data:
@@ -197,20 +218,71 @@ class AuthWrapper:
                 raise
         return None
 
-    def get_keycloak_public_key(self, token: str):
+    async def get_keycloak_public_key(self, token: str):
         """
-        Fetch the public key from Keycloak's JWKS endpoint and use it to verify the token.
+        Look up the key that signed the token in the cached Keycloak JWKS.
+
+        Keys are fetched once per process and refreshed by the JWKS cache,
+        so validating a token does not contact Keycloak in the steady state.
         """
         try:
-            jwk_client = PyJWKClient(self.jwks_url)
-            signing_key = jwk_client.get_signing_key_from_jwt(token)
-            return signing_key.key
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError as e:
+            self.logger.warning(f"Invalid token header: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Invalid or malformed token"
+            )
+        try:
+            public_key = await get_jwks_cache().get_signing_key(self.jwks_url, kid)
         except Exception as e:
-            self.logger.error(f"Failed to fetch public key from Keycloak: {e}")
+            self.logger.error(f"Failed to load public key from Keycloak: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to fetch public key from Keycloak"
             )
+        if public_key is None:
+            self.logger.warning(f"No Keycloak signing key found for kid: {kid}")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not find a matching public key"
+            )
+        return public_key
+
+    async def decode_token(self, token: str) -> dict:
+        """
+        Verify a Keycloak token and return its claims.
+
+        Tokens that passed verification are kept in the process-wide token
+        cache until shortly before they expire, so a client repeating the
+        same token skips the RS256 signature check.
+
+        Args:
+            token (str): The bearer token.
+
+        Returns:
+            dict: The decoded claims.
+
+        Raises:
+            jwt.InvalidTokenError: If the token is invalid or expired.
+            HTTPException: If the signing key cannot be found.
+        """
+        with start_span("jwt.validate", attributes={"auth.issuer": "keycloak"}) as span:
+            token_cache = get_token_cache()
+            decoded = token_cache.get(token)
+            if span is not None:
+                span.set_attribute("auth.cached", decoded is not None)
+            if decoded is not None:
+                return decoded
+            public_key = await self.get_keycloak_public_key(token)
+            decoded = jwt.decode(
+                token,
+                key=public_key,
+                algorithms=["RS256"],
+                audience=os.getenv("OAUTH2_CLIENT_ID")
+            )
+            token_cache.put(token, decoded)
+            return decoded
 
     async def validate(
         self,
@@ -226,22 +298,24 @@ class AuthWrapper:
         Returns user info or API key info if valid, else raises HTTPException.
         Enforces group membership and resource access if required.
         """
-        # Try API key
-        if api_key and api_key == self.API_KEY:
-            self.logger.info("Authenticated using API key.")
-            return {"auth_type": "api_key"}
+        # Try API key. The key is loaded by the startup bootstrap; reading the secret here
+        # would block the event loop, so until then the request is answered with 503
+        if api_key:
+            if self._api_key is None:
+                self.logger.warning("API key received before the key was loaded.")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="API key not loaded yet, retry shortly"
+                )
+            if api_key == self._api_key:
+                self.logger.info("Authenticated using API key.")
+                return {"auth_type": "api_key"}
 
         # Try OAuth2 Authorization Code flow (user)
         token = await self.oauth2_scheme(request)
         if token:
             try:
-                public_key = self.get_keycloak_public_key(token)
-                decoded = jwt.decode(
-                    token,
-                    key=public_key,
-                    algorithms=["RS256"],
-                    audience=os.getenv("OAUTH2_CLIENT_ID")
-                )
+                decoded = await self.decode_token(token)
                 groups = decoded.get("groups", [])
                 resource_access = decoded.get("resource_access", {})
                 if required_resource and required_resource != "*" and required_resource not in resource_access:
@@ -280,13 +354,7 @@ class AuthWrapper:
         client_token = await self.oauth2_client_credentials_scheme(request)
         if client_token:
             try:
-                public_key = self.get_keycloak_public_key(client_token)
-                decoded = jwt.decode(
-                    client_token,
-                    key=public_key,
-                    algorithms=["RS256"],
-                    audience=os.getenv("OAUTH2_CLIENT_ID")
-                )
+                decoded = await self.decode_token(client_token)
                 resource_access = decoded.get("resource_access", {})
                 groups = []
                 for client, access in resource_access.items():
@@ -327,4 +395,17 @@ class AuthWrapper:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authenticated (API key or OAuth2 token required)",
-        )
\ No newline at end of file
+        )
+
+
+_default_auth_wrapper: Optional[AuthWrapper] = None
+
+
+def get_auth_wrapper() -> AuthWrapper:
+    """
+    Return the process-wide AuthWrapper shared by the application and its routers.
+    """
+    global _default_auth_wrapper
+    if _default_auth_wrapper is None:
+        _default_auth_wrapper = AuthWrapper()
+    return _default_auth_wrapper
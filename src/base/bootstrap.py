@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# Set when this module is first imported, which main.py does before anything expensive
+_process_started = time.perf_counter()
+
+
+def get_bootstrap_retry_interval() -> float:
+    """
+    Helper function returning the seconds before a failed startup step is retried; doubles up to 60s.
+    """
+    return max(0.0, float(os.getenv("BOOTSTRAP_RETRY_INTERVAL", "2")))
+
+
+class Bootstrap:
+    """
+    Run the expensive startup steps concurrently, after the server accepted its socket.
+
+    Each step is a coroutine function or a blocking function (run in the
+    thread pool). A failing step is logged, reported and retried with
+    backoff (BOOTSTRAP_RETRY_INTERVAL); it does not stop the others. The
+    application is ready once every step succeeded; until then the
+    readiness probe returns 503, so a pod that cannot reach the API server
+    at startup receives no traffic but recovers without a restart.
+    """
+
+    # Upper bound of the retry backoff, in seconds
+    MAX_RETRY_INTERVAL = 60.0
+
+    def __init__(self, started: Optional[float] = None, retry_interval: Optional[float] = None):
+        """
+        Initialize the bootstrap.
+
+        Args:
+            started (float, optional): `time.perf_counter()` value time-to-ready is measured from,
+                defaults to the time this module was imported.
+            retry_interval (float, optional): Seconds before the first retry of a failed step
+                (BOOTSTRAP_RETRY_INTERVAL).
+        """
+        self.started = _process_started if started is None else started
+        self.retry_interval = get_bootstrap_retry_interval() if retry_interval is None else retry_interval
+        self.ready_after: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_after is not None
+
+    async def _run_step(self, name: str, step: Callable[[], Any]) -> None:
+        started = time.perf_counter()
+        status = {"status": "running", "attempts": 0}
+        self.steps[name] = status
+        backoff = self.retry_interval
+        try:
+            while True:
+                status["attempts"] += 1
+                try:
+                    result = step()
+                    if asyncio.iscoroutine(result):
+                        await result
+                    status["status"] = "ok"
+                    status.pop("error", None)
+                    return
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    status.update(status="failed", error=str(e))
+                    logger.warning(f"Startup step '{name}' failed (attempt {status['attempts']}), retrying in {backoff:.1f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(max(backoff, 0.1) * 2, self.MAX_RETRY_INTERVAL)
+        except asyncio.CancelledError:
+            status["status"] = "cancelled"
+            raise
+        finally:
+            status["seconds"] = round(time.perf_counter() - started, 3)
+
+    async def run(self, steps: Dict[str, Callable[[], Any]]) -> None:
+        """
+        Run the steps concurrently, retrying failed ones, and mark the application ready once all succeeded.
+
+        Args:
+            steps (Dict[str, Callable]): Steps by name. Coroutine functions run on the
+                event loop; pass blocking functions wrapped with `blocking(...)`.
+        """
+        await asyncio.gather(*(self._run_step(name, step) for name, step in steps.items()))
+        self.ready_after = time.perf_counter() - self.started
+        logger.info(
+            f"Application ready in {self.ready_after:.3f}s.",
+            extra={"startup_seconds": round(self.ready_after, 3), "steps": self.steps},
+        )
+
+    def start(self, steps: Dict[str, Callable[[], Any]]) -> asyncio.Task:
+        """
+        Run the steps in a background task on the running loop, so startup does not wait for them.
+        """
+        self._task = asyncio.get_running_loop().create_task(self.run(steps), name="bootstrap")
+        return self._task
+
+    async def stop(self) -> None:
+        """
+        Cancel the steps still running, e.g. on shutdown during startup.
+        """
+        task, self._task = self._task, None
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Return whether the application is ready, the time it took and the outcome of every step.
+        """
+        return {
+            "ready": self.ready,
+            "startup_seconds": None if self.ready_after is None else round(self.ready_after, 3),
+            "steps": self.steps,
+        }
+
+
+def blocking(function: Callable[..., Any], *args: Any, **kwargs: Any) -> Callable[[], Awaitable[Any]]:
+    """
+    Wrap a blocking function as a bootstrap step that runs in the thread pool.
+    """
+    return lambda: run_in_threadpool(function, *args, **kwargs)
+
+
+_default_bootstrap: Optional[Bootstrap] = None
+
+
+def get_bootstrap() -> Bootstrap:
+    """
+    Return the process-wide Bootstrap.
+    """
+    global _default_bootstrap
+    if _default_bootstrap is None:
+        _default_bootstrap = Bootstrap()
+    return _default_bootstrap
@@ -0,0 +1,144 @@
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Type, TypeVar
+
+from kubernetes import client
+from base.k8s_config import load_k8s_config
+
+logger = logging.getLogger(__name__)
+
+Api = TypeVar("Api")
+
+# Client for list/watch loops; their long-lived watch connections would otherwise occupy the request pool
+INFORMER_POOL = "informers"
+DEFAULT_POOL = "default"
+
+
+def get_k8s_pool_size() -> int:
+    """
+    Helper function returning the connection pool size of the synchronous API clients (K8S_POOL_SIZE).
+
+    Defaults to K8S_MAX_CONNECTIONS, the limit of the async client.
+    """
+    return max(1, int(os.getenv("K8S_POOL_SIZE", os.getenv("K8S_MAX_CONNECTIONS", "100"))))
+
+
+def is_tcp_keepalive_enabled() -> bool:
+    """
+    Helper function to determine if TCP keep-alive probes are sent on API server connections (K8S_TCP_KEEPALIVE).
+    """
+    return os.getenv("K8S_TCP_KEEPALIVE", "True").lower() in ("true", "1", "yes")
+
+
+class ClientRegistry:
+    """
+    Process-wide synchronous Kubernetes API clients.
+
+    Every `ApiClient` owns a urllib3 pool, so creating one per call means
+    a new TLS handshake with the API server per call. The registry creates
+    one `ApiClient` per named pool on first use and hands out API group
+    objects (`CoreV1Api`, `CustomObjectsApi`, ...) bound to it. The default
+    pool is also installed as the kubernetes client default, so code that
+    calls `client.CoreV1Api()` without arguments shares it as well.
+    Informers use a pool of their own.
+    """
+
+    def __init__(self, pool_size: Optional[int] = None, tcp_keepalive: Optional[bool] = None):
+        """
+        Initialize the registry. Clients are created on first use, after the configuration is loaded.
+
+        Args:
+            pool_size (int, optional): Connections kept per pool (K8S_POOL_SIZE).
+            tcp_keepalive (bool, optional): Send TCP keep-alive probes (K8S_TCP_KEEPALIVE).
+        """
+        self.pool_size = pool_size or get_k8s_pool_size()
+        self.tcp_keepalive = is_tcp_keepalive_enabled() if tcp_keepalive is None else tcp_keepalive
+        self._api_clients: Dict[str, client.ApiClient] = {}
+        self._apis: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def api_client(self, pool: str = DEFAULT_POOL) -> client.ApiClient:
+        """
+        Return the shared ApiClient of a pool, creating it on first use.
+        """
+        api_client = self._api_clients.get(pool)
+        if api_client is not None:
+            return api_client
+        with self._lock:
+            if pool not in self._api_clients:
+                load_k8s_config()
+                configuration = client.Configuration.get_default_copy()
+                configuration.connection_pool_maxsize = self.pool_size
+                configuration.keep_alive = self.tcp_keepalive
+                api_client = client.ApiClient(configuration)
+                if pool == DEFAULT_POOL:
+                    client.ApiClient.set_default(api_client)
+                self._api_clients[pool] = api_client
+                logger.debug(f"Created Kubernetes API client pool '{pool}' with {self.pool_size} connections.")
+            return self._api_clients[pool]
+
+    def api(self, api_class: Type[Api], pool: str = DEFAULT_POOL) -> Api:
+        """
+        Return the shared instance of an API group class, e.g. `registry.api(client.CustomObjectsApi)`.
+        """
+        key = (api_class, pool)
+        api = self._apis.get(key)
+        if api is None:
+            api = self._apis.setdefault(key, api_class(self.api_client(pool)))
+        return api
+
+    def pool_stats(self) -> List[Dict[str, Any]]:
+        """
+        Return the connection usage of every pool: connections in use, idle and the pool size.
+        """
+        stats = []
+        for name, api_client in list(self._api_clients.items()):
+            pools = api_client.rest_client.pool_manager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None or pool.pool is None:
+                    continue
+                # The queue starts with `maxsize` placeholders; a connection taken out is in use
+                queued = list(pool.pool.queue)
+                idle = sum(1 for connection in queued if connection is not None)
+                stats.append({
+                    "client": f"sync:{name}",
+                    "host": pool.host,
+                    "active": max(0, pool.pool.maxsize - len(queued)),
+                    "idle": idle,
+                    "max": pool.pool.maxsize,
+                    "waiting": 0,
+                })
+        return stats
+
+    def close(self) -> None:
+        """
+        Close every pool.
+        """
+        with self._lock:
+            for api_client in self._api_clients.values():
+                api_client.close()
+            self._api_clients.clear()
+            self._apis.clear()
+            client.ApiClient.set_default(None)
+
+
+_default_registry: Optional[ClientRegistry] = None
+
+
+def get_client_registry() -> ClientRegistry:
+    """
+    Return the process-wide ClientRegistry.
+    """
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ClientRegistry()
+    return _default_registry
+
+
+def get_api(api_class: Type[Api], pool: str = DEFAULT_POOL) -> Api:
+    """
+    Return the shared instance of a kubernetes API group class, e.g. `get_api(client.CoreV1Api)`.
+    """
+    return get_client_registry().api(api_class, pool)
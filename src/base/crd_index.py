@@ -0,0 +1,229 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Type
+
+from kubernetes import client
+from pydantic import BaseModel, ConfigDict, create_model
+from base.clients import get_api
+from base.informer import _crd_summary, get_informer
+from base.k8s_client import json_loads
+
+logger = logging.getLogger(__name__)
+
+
+def get_crd_index_ttl() -> float:
+    """
+    Helper function returning how long a CRD index listed from the API server is used, in seconds.
+
+    Does not apply while the CRD informer is synced: its watch keeps the index current.
+    """
+    return float(os.getenv("CRD_INDEX_TTL", "60"))
+
+
+class CRDIndex:
+    """
+    Index of the CRDs in the cluster by the names they are addressed with under `/crds/{plural}`.
+
+    A CRD can be addressed by its plural (`certificates`), by plural and
+    group (`certificates.cert-manager.io`, as kubectl does) or by the
+    underscored name the former per-CRD routes used
+    (`cert-manager_io_certificates`). The index is built from the CRD
+    informer, whose watch marks it stale on every change, so new CRDs are
+    served without a restart. While the informer is disabled or not synced
+    yet, the CRDs are listed from the API server and the index is rebuilt
+    after `ttl` seconds (CRD_INDEX_TTL), or sooner when a name is not found.
+    Only the first build blocks the caller: later rebuilds run in a single
+    background thread while lookups are answered from the current index.
+
+    The pydantic model of a CRD is built the first time one of its objects is returned.
+    """
+
+    # A name that is not found relists the CRDs at most this often, in the background
+    MISS_REFRESH_INTERVAL = 5.0
+
+    def __init__(self, ttl: Optional[float] = None):
+        """
+        Initialize an empty index. It is built on first use.
+
+        Args:
+            ttl (float, optional): Lifetime of an index listed from the API server (CRD_INDEX_TTL).
+        """
+        self.ttl = get_crd_index_ttl() if ttl is None else ttl
+        self.metrics: Dict[str, int] = {"hits": 0, "misses": 0, "rebuilds": 0}
+        self._crds: List[dict] = []
+        self._by_name: Dict[str, List[dict]] = {}
+        self._models: Dict[str, Type[BaseModel]] = {}
+        self._built_at: Optional[float] = None
+        self._from_informer = False
+        self._stale = True
+        self._refreshing = False
+        # Guards the swap of a rebuilt index and `_refreshing`; held only briefly
+        self._lock = threading.Lock()
+        # Serializes rebuilds, which list CRDs and analyze their schemas
+        self._refresh_lock = threading.Lock()
+
+    def on_crd_event(self, event_type: str, obj: dict) -> None:
+        """
+        Informer handler marking the index stale whenever a CRD is added, changed, removed or relisted.
+        """
+        self._stale = True
+        name = (obj.get("metadata") or {}).get("name")
+        if name:
+            self._models.pop(name, None)
+
+    # ------------------------------------------------------------------ #
+    # Lookups
+    # ------------------------------------------------------------------ #
+    def resolve(self, name: str) -> List[dict]:
+        """
+        Return the CRDs addressed by a name.
+
+        Args:
+            name (str): A plural, `plural.group` or the underscored `group_plural` name.
+
+        Returns:
+            List[dict]: The matching CRD summaries (name, group, versions, plural,
+            kind, scope). More than one if a plural is served by several groups.
+        """
+        self._ensure_current()
+        matches = self._by_name.get(name)
+        if not matches and not self._from_informer and self._age() >= self.MISS_REFRESH_INTERVAL:
+            # Possibly created since the last list; found once the rebuild finished
+            self._refresh_in_background()
+        if matches:
+            self.metrics["hits"] += 1
+            return list(matches)
+        self.metrics["misses"] += 1
+        return []
+
+    def find(self, group: str, plural: str) -> Optional[dict]:
+        """
+        Return the CRD serving `plural` in `group`, or None. Unlike `resolve`, not counted and a miss does not relist.
+        """
+        self._ensure_current()
+        matches = self._by_name.get(f"{plural}.{group}")
+        return matches[0] if matches else None
+
+    def list(self) -> List[dict]:
+        """
+        Return the summaries of all CRDs, sorted by name.
+        """
+        self._ensure_current()
+        return list(self._crds)
+
+    def get_model(self, crd: dict) -> Type[BaseModel]:
+        """
+        Return the response model of a CRD, building it on first use.
+        """
+        model = self._models.get(crd["name"])
+        if model is None:
+            model = create_model(
+                f"{crd.get('kind') or crd['plural'].capitalize()}Model",
+                apiVersion=(Optional[str], None),
+                kind=(Optional[str], None),
+                metadata=(Optional[Dict[str, Any]], None),
+                items=(Optional[List[Dict[str, Any]]], None),
+                group=(Optional[str], None),
+                version=(Optional[str], None),
+                plural=(Optional[str], None),
+                # spec, status and other fields of the object are kept
+                __config__=ConfigDict(extra="allow"),
+            )
+            self._models[crd["name"]] = model
+        return model
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the index counters, the number of CRDs and built models, and where the index came from.
+        """
+        return {
+            **self.metrics,
+            "crds": len(self._crds),
+            "models": len(self._models),
+            "source": "informer" if self._from_informer else "api",
+            "refreshing": self._refreshing,
+            "age_seconds": None if self._built_at is None else round(self._age(), 1),
+        }
+
+    # ------------------------------------------------------------------ #
+    # Building
+    # ------------------------------------------------------------------ #
+    def _age(self) -> float:
+        return time.monotonic() - self._built_at if self._built_at is not None else float("inf")
+
+    def _synced_informer(self):
+        informer = get_informer("customresourcedefinitions")
+        return informer if informer is not None and informer.has_synced() else None
+
+    def _ensure_current(self) -> None:
+        if self._built_at is None:
+            # Nothing to answer from yet
+            with self._refresh_lock:
+                if self._built_at is None:
+                    self._rebuild()
+        elif self._stale or (not self._from_informer and (self._age() >= self.ttl or self._synced_informer() is not None)):
+            self._refresh_in_background()
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, name="crd-index-refresh", daemon=True).start()
+
+    def _background_refresh(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"CRD index refresh failed, serving the previous index: {e}")
+        finally:
+            self._refreshing = False
+
+    def refresh(self) -> None:
+        """
+        Rebuild the index from the CRD informer, or from the API server if the informer is not synced.
+
+        Lookups keep using the current index until the new one is in place.
+        """
+        with self._refresh_lock:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        # Cleared before reading, so a change arriving during the rebuild marks it stale again
+        self._stale = False
+        informer = self._synced_informer()
+        if informer is not None:
+            crds = informer.list()
+        else:
+            response = get_api(client.ApiextensionsV1Api).list_custom_resource_definition(_preload_content=False)
+            crds = [_crd_summary(crd) for crd in json_loads(response.data).get("items") or []]
+
+        by_name: Dict[str, List[dict]] = {}
+        for crd in crds:
+            if not crd.get("plural") or not crd.get("versions"):
+                continue
+            for key in (crd["plural"], f"{crd['plural']}.{crd['group']}", f"{crd['group'].replace('.', '_')}_{crd['plural']}"):
+                by_name.setdefault(key, []).append(crd)
+
+        with self._lock:
+            self._crds = sorted(crds, key=lambda crd: crd["name"])
+            self._by_name = by_name
+            self._from_informer = informer is not None
+            self._built_at = time.monotonic()
+            self.metrics["rebuilds"] += 1
+        logger.debug(f"CRD index rebuilt with {len(crds)} CRDs from the {'informer' if informer else 'API server'}.")
+
+
+_default_index: Optional[CRDIndex] = None
+
+
+def get_crd_index() -> CRDIndex:
+    """
+    Return the process-wide CRDIndex.
+    """
+    global _default_index
+    if _default_index is None:
+        _default_index = CRDIndex()
+    return _default_index
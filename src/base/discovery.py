@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from kubernetes.client.exceptions import ApiException
+from base.k8s_client import AsyncApiClient, get_async_api_client
+
+logger = logging.getLogger(__name__)
+
+# Aggregated discovery (GA in 1.30, beta since 1.26); plain JSON is the legacy fallback
+AGGREGATED_DISCOVERY_ACCEPT = ",".join([
+    "application/json;g=apidiscovery.k8s.io;v=v2;as=APIGroupDiscoveryList",
+    "application/json;g=apidiscovery.k8s.io;v=v2beta1;as=APIGroupDiscoveryList",
+    "application/json",
+])
+AGGREGATED_DISCOVERY_KIND = "APIGroupDiscoveryList"
+
+
+def get_discovery_ttl() -> float:
+    """
+    Helper function returning how long discovered resource types are cached, in seconds.
+    """
+    return float(os.getenv("DISCOVERY_CACHE_TTL", "300"))
+
+
+def get_discovery_concurrency() -> int:
+    """
+    Helper function returning the maximum number of group versions fetched at once.
+    """
+    return max(1, int(os.getenv("DISCOVERY_CONCURRENCY", "16")))
+
+
+def is_aggregated_discovery_enabled() -> bool:
+    """
+    Helper function to determine if the aggregated discovery endpoint should be tried first.
+    """
+    return os.getenv("DISCOVERY_AGGREGATED", "True").lower() in ("true", "1", "yes")
+
+
+def _error_message(e: Exception) -> str:
+    if isinstance(e, ApiException):
+        return f"{e.status}: {e.reason}"
+    return str(e) or e.__class__.__name__
+
+
+class DiscoveryCache:
+    """
+    Cache of the resource types served by the API server.
+
+    Discovery first asks `/api` and `/apis` for the aggregated document, which
+    describes every group version in two requests. Older API servers answer
+    with the legacy group lists instead; in that case every group version is
+    fetched concurrently, bounded by a semaphore. Failing group versions are
+    reported in the result rather than dropped. Concurrent callers share a
+    single refresh, and the result is kept until the TTL expires or the cache
+    is invalidated (e.g. when a CRD changes).
+    """
+
+    def __init__(self, api_client: Optional[AsyncApiClient] = None, ttl: Optional[float] = None, max_concurrency: Optional[int] = None, aggregated: Optional[bool] = None):
+        """
+        Initialize the cache. Nothing is fetched until the first lookup.
+
+        Args:
+            api_client (AsyncApiClient, optional): Defaults to the shared async API client.
+            ttl (float, optional): Seconds a discovery result stays valid (DISCOVERY_CACHE_TTL).
+            max_concurrency (int, optional): Group versions fetched at once (DISCOVERY_CONCURRENCY).
+            aggregated (bool, optional): Try aggregated discovery first (DISCOVERY_AGGREGATED).
+        """
+        self._api_client = api_client
+        self.ttl = ttl if ttl is not None else get_discovery_ttl()
+        self.max_concurrency = max_concurrency or get_discovery_concurrency()
+        self.aggregated = aggregated if aggregated is not None else is_aggregated_discovery_enabled()
+        self._result: Optional[Dict[str, list]] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.metrics: Dict[str, int] = {"hits": 0, "misses": 0}
+
+    @property
+    def api_client(self) -> AsyncApiClient:
+        return self._api_client or get_async_api_client()
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def invalidate(self) -> None:
+        """
+        Drop the cached result; the next lookup runs discovery again. Safe to call from any thread.
+        """
+        self._generation += 1
+        self._expires_at = 0.0
+
+    def on_crd_event(self, event_type: str, obj: dict) -> None:
+        """
+        Informer handler invalidating the cache whenever a CRD is added, changed or removed.
+        """
+        if event_type in ("ADDED", "MODIFIED", "DELETED"):
+            self.invalidate()
+
+    def _is_fresh(self) -> bool:
+        return self._result is not None and time.monotonic() < self._expires_at
+
+    async def get_resource_types(self, refresh: bool = False) -> Dict[str, list]:
+        """
+        Return all resource types, running discovery if the cache is empty, expired or a refresh is requested.
+
+        Args:
+            refresh (bool): Ignore the cached result.
+
+        Returns:
+            Dict[str, list]: "resource_types" with one entry per resource and
+            "errors" with the group versions that could not be discovered.
+
+        Raises:
+            ApiException: If the API server cannot be reached for discovery at all.
+        """
+        if not refresh and self._is_fresh():
+            self.metrics["hits"] += 1
+            return self._result
+
+        requested_at = time.monotonic()
+        async with self._get_lock():
+            # Another caller may have refreshed while we were waiting
+            if self._is_fresh() and (not refresh or self._expires_at - self.ttl >= requested_at):
+                self.metrics["hits"] += 1
+                return self._result
+
+            self.metrics["misses"] += 1
+
+            generation = self._generation
+            started = time.monotonic()
+            result = await self._discover()
+            logger.info(
+                f"Discovered {len(result['resource_types'])} resource types in {time.monotonic() - started:.2f}s "
+                f"({len(result['errors'])} group versions failed)."
+            )
+            self._result = result
+            # A CRD change during discovery leaves the result usable but not cacheable
+            self._expires_at = time.monotonic() + self.ttl if generation == self._generation else 0.0
+            return result
+
+    # ------------------------------------------------------------------ #
+    # Discovery
+    # ------------------------------------------------------------------ #
+    async def _discover(self) -> Dict[str, list]:
+        if self.aggregated:
+            core, groups = await asyncio.gather(
+                self.api_client.request("GET", "/api", accept=AGGREGATED_DISCOVERY_ACCEPT),
+                self.api_client.request("GET", "/apis", accept=AGGREGATED_DISCOVERY_ACCEPT),
+            )
+            if (core or {}).get("kind") == AGGREGATED_DISCOVERY_KIND and (groups or {}).get("kind") == AGGREGATED_DISCOVERY_KIND:
+                return self._from_aggregated(core, groups)
+            logger.debug("Aggregated discovery is not served by the API server; using legacy discovery.")
+            return await self._discover_legacy(groups if (groups or {}).get("kind") == "APIGroupList" else None)
+        return await self._discover_legacy()
+
+    def _from_aggregated(self, core: dict, groups: dict) -> Dict[str, list]:
+        resource_types, errors = [], []
+        for group in (core.get("items") or []) + (groups.get("items") or []):
+            group_name = (group.get("metadata") or {}).get("name") or ""
+            for version in group.get("versions") or []:
+                group_version = f"{group_name}/{version['version']}" if group_name else version["version"]
+                if version.get("freshness") == "Stale":
+                    errors.append({"groupVersion": group_version, "error": "Discovery document is stale"})
+                for resource in version.get("resources") or []:
+                    namespaced = resource.get("scope") == "Namespaced"
+                    kind = (resource.get("responseKind") or {}).get("kind")
+                    resource_types.append(self._entry(resource["resource"], kind, namespaced, group_name, group_version))
+                    for subresource in resource.get("subresources") or []:
+                        resource_types.append(self._entry(
+                            f"{resource['resource']}/{subresource['subresource']}",
+                            (subresource.get("responseKind") or {}).get("kind"),
+                            namespaced,
+                            group_name,
+                            group_version,
+                        ))
+        return {"resource_types": resource_types, "errors": errors}
+
+    async def _discover_legacy(self, groups: Optional[dict] = None) -> Dict[str, list]:
+        if groups is None:
+            groups = await self.api_client.request("GET", "/apis")
+
+        # Core resources first, then every served group version
+        group_versions: List[Tuple[str, str]] = [("", "v1")]
+        for group in groups.get("groups") or []:
+            for version in group.get("versions") or []:
+                group_versions.append((group["name"], version["groupVersion"]))
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(group_version: str) -> Any:
+            path = "/api/v1" if group_version == "v1" else f"/apis/{group_version}"
+            async with semaphore:
+                return await self.api_client.request("GET", path)
+
+        responses = await asyncio.gather(*(fetch(gv) for _, gv in group_versions), return_exceptions=True)
+
+        resource_types, errors = [], []
+        for (group_name, group_version), response in zip(group_versions, responses):
+            if isinstance(response, Exception):
+                if not group_name:
+                    raise response
+                logger.warning(f"Discovery of {group_version} failed: {_error_message(response)}")
+                errors.append({"groupVersion": group_version, "error": _error_message(response)})
+                continue
+            for resource in response.get("resources") or []:
+                resource_types.append(self._entry(resource["name"], resource.get("kind"), resource.get("namespaced"), group_name, group_version))
+        return {"resource_types": resource_types, "errors": errors}
+
+    @staticmethod
+    def _entry(name: str, kind: Optional[str], namespaced: bool, group_name: str, group_version: str) -> Dict[str, Any]:
+        entry = {"name": name, "kind": kind, "namespaced": namespaced}
+        if group_name:
+            entry["groupVersion"] = group_version
+        return entry
+
+
+_discovery_cache: Optional[DiscoveryCache] = None
+
+
+def get_discovery_cache() -> DiscoveryCache:
+    """
+    Return the process-wide discovery cache.
+    """
+    global _discovery_cache
+    if _discovery_cache is None:
+        _discovery_cache = DiscoveryCache()
+    return _discovery_cache
@@ -0,0 +1,345 @@
+import asyncio
+import logging
+import os
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, FrozenSet, List, Optional, Set
+
+from kubernetes.client.exceptions import ApiException
+from base.k8s_client import AsyncApiClient, get_async_api_client
+
+logger = logging.getLogger(__name__)
+
+HTTP_STATUS_GONE = 410
+EVENTS_PATH = "/api/v1/events"
+
+
+def get_event_buffer_size() -> int:
+    """
+    Helper function returning how many recent events are kept for `Last-Event-ID` resumes.
+    """
+    return max(1, int(os.getenv("EVENT_STREAM_BUFFER_SIZE", "1000")))
+
+
+def get_event_queue_size() -> int:
+    """
+    Helper function returning the maximum number of undelivered events per subscriber.
+    """
+    return max(1, int(os.getenv("EVENT_STREAM_QUEUE_SIZE", "256")))
+
+
+def get_event_heartbeat_interval() -> float:
+    """
+    Helper function returning the idle time after which a keepalive comment is sent, in seconds.
+    """
+    return float(os.getenv("EVENT_STREAM_HEARTBEAT", "15"))
+
+
+def _event_summary(obj: dict) -> dict:
+    metadata = obj.get("metadata") or {}
+    involved = obj.get("involvedObject") or {}
+    return {
+        "name": metadata.get("name"),
+        "namespace": metadata.get("namespace"),
+        "uid": metadata.get("uid"),
+        "type": obj.get("type"),
+        "reason": obj.get("reason"),
+        "message": obj.get("message"),
+        "count": obj.get("count"),
+        "first_timestamp": obj.get("firstTimestamp"),
+        "last_timestamp": obj.get("lastTimestamp") or obj.get("eventTime"),
+        "source": (obj.get("source") or {}).get("component") or obj.get("reportingComponent"),
+        "involved_object": {
+            "kind": involved.get("kind"),
+            "name": involved.get("name"),
+            "namespace": involved.get("namespace"),
+        },
+    }
+
+
+def _split_values(value: Optional[str]) -> Optional[FrozenSet[str]]:
+    if not value:
+        return None
+    values = frozenset(part.strip() for part in value.split(",") if part.strip())
+    return values or None
+
+
+@dataclass(frozen=True)
+class StreamedEvent:
+    """
+    One change of a Kubernetes Event object, as delivered to subscribers.
+    """
+    id: str
+    type: str
+    key: str
+    data: dict
+
+
+@dataclass(frozen=True)
+class EventFilter:
+    """
+    Server-side filter of a subscription. Every field accepts a comma separated list of values.
+    """
+    namespaces: Optional[FrozenSet[str]] = None
+    reasons: Optional[FrozenSet[str]] = None
+    types: Optional[FrozenSet[str]] = None
+    kinds: Optional[FrozenSet[str]] = None
+
+    @classmethod
+    def from_query(cls, namespace: Optional[str] = None, reason: Optional[str] = None, type: Optional[str] = None, kind: Optional[str] = None) -> "EventFilter":
+        """
+        Build a filter from query parameters, e.g. `reason=BackOff,Failed`.
+        """
+        return cls(_split_values(namespace), _split_values(reason), _split_values(type), _split_values(kind))
+
+    def matches(self, data: dict) -> bool:
+        """
+        Return True if the event summary passes every configured filter.
+        """
+        if self.namespaces is not None and data.get("namespace") not in self.namespaces:
+            return False
+        if self.reasons is not None and data.get("reason") not in self.reasons:
+            return False
+        if self.types is not None and data.get("type") not in self.types:
+            return False
+        if self.kinds is not None and data["involved_object"].get("kind") not in self.kinds:
+            return False
+        return True
+
+
+class Subscription:
+    """
+    The bounded, coalescing queue of one stream client.
+
+    Pending changes are keyed by the Event object, so a client that falls
+    behind only receives the latest state of every event (e.g. the final
+    `count` of a repeating warning). When the queue is still full the oldest
+    pending event is dropped and counted in `dropped`.
+    """
+
+    def __init__(self, event_filter: Optional[EventFilter] = None, max_size: Optional[int] = None):
+        self.filter = event_filter or EventFilter()
+        self.max_size = max_size or get_event_queue_size()
+        self.dropped = 0
+        self._pending: "OrderedDict[str, StreamedEvent]" = OrderedDict()
+        self._ready = asyncio.Event()
+
+    def offer(self, event: StreamedEvent) -> None:
+        """
+        Queue an event if it passes the filter, replacing an undelivered change of the same object.
+        """
+        if not self.filter.matches(event.data):
+            return
+        # Re-append so pending ids stay in resourceVersion order
+        self._pending.pop(event.key, None)
+        self._pending[event.key] = event
+        if len(self._pending) > self.max_size:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[StreamedEvent]:
+        """
+        Wait for the next event; returns None if nothing arrived within the timeout.
+        """
+        if not self._pending:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._pending.popitem(last=False)[1]
+
+
+class EventBroadcaster:
+    """
+    Fan a single watch on `/api/v1/events` out to any number of subscribers.
+
+    The watch runs as one background task per process and is started by the
+    first subscriber. It resumes from the last seen resourceVersion when the
+    API server closes the connection, backs off on errors and starts over
+    from the current resourceVersion after a 410 Gone, so reconnects are
+    invisible to subscribers. Recent events are kept in a ring buffer, which
+    lets a client resume from its `Last-Event-ID` (the event's resourceVersion).
+    """
+
+    def __init__(
+        self,
+        api_client: Optional[AsyncApiClient] = None,
+        buffer_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        watch_timeout: int = 300,
+        backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 30.0,
+    ):
+        """
+        Initialize the broadcaster. The upstream watch starts with the first subscription.
+
+        Args:
+            api_client (AsyncApiClient, optional): Defaults to the shared async API client.
+            buffer_size (int, optional): Recent events kept for resumes (EVENT_STREAM_BUFFER_SIZE).
+            queue_size (int, optional): Undelivered events kept per subscriber (EVENT_STREAM_QUEUE_SIZE).
+            watch_timeout (int): Server-side timeout for a single watch request, in seconds.
+            backoff_seconds (float): Initial delay before retrying after an error.
+            max_backoff_seconds (float): Upper bound for the retry delay.
+        """
+        self._api_client = api_client
+        self.queue_size = queue_size or get_event_queue_size()
+        self.watch_timeout = watch_timeout
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+        self.resource_version: Optional[str] = None
+        self._buffer: Deque[StreamedEvent] = deque(maxlen=buffer_size or get_event_buffer_size())
+        self._subscribers: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def api_client(self) -> AsyncApiClient:
+        return self._api_client or get_async_api_client()
+
+    # ------------------------------------------------------------------ #
+    # Subscriptions
+    # ------------------------------------------------------------------ #
+    def subscribe(self, event_filter: Optional[EventFilter] = None, last_event_id: Optional[str] = None) -> Subscription:
+        """
+        Register a subscriber, starting the upstream watch if it is not running.
+
+        Args:
+            event_filter (EventFilter, optional): Only events passing the filter are queued.
+            last_event_id (str, optional): The last id the client received; buffered
+                events after it are queued right away.
+
+        Returns:
+            Subscription: The subscriber's queue. Call `unsubscribe` when done.
+        """
+        self._ensure_started()
+        subscription = Subscription(event_filter, self.queue_size)
+        if last_event_id:
+            for event in self._replay(last_event_id):
+                subscription.offer(event)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Remove a subscriber. The upstream watch keeps running so later clients can resume.
+        """
+        self._subscribers.discard(subscription)
+
+    def _replay(self, last_event_id: str) -> List[StreamedEvent]:
+        buffered = list(self._buffer)
+        for position, event in enumerate(buffered):
+            if event.id == last_event_id:
+                return buffered[position + 1:]
+        # The id fell out of the buffer (or the client saw it from another replica);
+        # resourceVersions are opaque, but etcd-backed ones compare as integers
+        try:
+            last = int(last_event_id)
+            return [event for event in buffered if int(event.id) > last]
+        except ValueError:
+            return []
+
+    def _publish(self, event: StreamedEvent) -> None:
+        self._buffer.append(event)
+        for subscription in list(self._subscribers):
+            subscription.offer(event)
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+    def _ensure_started(self) -> None:
+        # The watch task belongs to the event loop that started it
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._task = loop.create_task(self._run(), name="event-broadcaster")
+
+    async def stop(self) -> None:
+        """
+        Cancel the upstream watch, if it is running.
+        """
+        task, self._task = self._task, None
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    # ------------------------------------------------------------------ #
+    # Watch loop
+    # ------------------------------------------------------------------ #
+    async def _run(self) -> None:
+        backoff = self.backoff_seconds
+        while True:
+            try:
+                if self.resource_version is None:
+                    await self._resync()
+                await self._watch()
+                backoff = self.backoff_seconds
+            except asyncio.CancelledError:
+                raise
+            except ApiException as e:
+                if e.status == HTTP_STATUS_GONE:
+                    logger.info("Event stream: resourceVersion expired, resuming from the current resourceVersion.")
+                    self.resource_version = None
+                    continue
+                logger.warning(f"Event stream: API error {e.status}: {e.reason}")
+                backoff = await self._sleep(backoff)
+            except Exception as e:
+                logger.warning(f"Event stream: watch interrupted: {e}")
+                backoff = await self._sleep(backoff)
+
+    async def _sleep(self, backoff: float) -> float:
+        await asyncio.sleep(backoff)
+        return min(backoff * 2, self.max_backoff_seconds)
+
+    async def _resync(self) -> None:
+        # Only the current resourceVersion is needed, the stream carries changes from here on
+        result = await self.api_client.request("GET", EVENTS_PATH, limit=1)
+        self.resource_version = (result.get("metadata") or {}).get("resourceVersion")
+        logger.info(f"Event stream: watching events from resourceVersion {self.resource_version}.")
+
+    async def _watch(self) -> None:
+        async for event in self.api_client.watch(
+            EVENTS_PATH,
+            resource_version=self.resource_version,
+            allow_watch_bookmarks=True,
+            timeout_seconds=self.watch_timeout,
+            # Detect a silently dropped connection; bookmarks arrive well within this
+            _request_timeout=self.watch_timeout + 30,
+        ):
+            obj = event["raw_object"]
+            metadata = obj.get("metadata") or {}
+            resource_version = metadata.get("resourceVersion")
+            if resource_version:
+                self.resource_version = resource_version
+            if event.get("type") == "BOOKMARK" or not resource_version:
+                continue
+            key = metadata.get("uid") or f"{metadata.get('namespace')}/{metadata.get('name')}"
+            self._publish(StreamedEvent(resource_version, event.get("type"), key, _event_summary(obj)))
+
+
+_default_broadcaster: Optional[EventBroadcaster] = None
+
+
+def get_event_broadcaster() -> EventBroadcaster:
+    """
+    Return the process-wide EventBroadcaster.
+    """
+    global _default_broadcaster
+    if _default_broadcaster is None:
+        _default_broadcaster = EventBroadcaster()
+    return _default_broadcaster
+
+
+async def stop_event_broadcaster() -> None:
+    """
+    Stop the process-wide EventBroadcaster, if it was created.
+    """
+    if _default_broadcaster is not None:
+        await _default_broadcaster.stop()
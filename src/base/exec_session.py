@@ -0,0 +1,231 @@
+import asyncio
+import codecs
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from fastapi import WebSocket
+from kubernetes import client
+from kubernetes.stream import stream
+from kubernetes.stream.ws_client import CLOSE_CHANNEL, ERROR_CHANNEL, RESIZE_CHANNEL, STDIN_CHANNEL, STDOUT_CHANNEL
+from websocket import ABNF, WebSocketConnectionClosedException
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXEC_COMMAND = ["/bin/sh"]
+
+
+def get_exec_queue_size() -> int:
+    """
+    Helper function returning how many output frames are buffered per exec session before reading from the pod pauses.
+    """
+    return max(1, int(os.getenv("EXEC_OUTPUT_QUEUE_SIZE", "64")))
+
+
+class ExecSession:
+    """
+    Bridge one client WebSocket to an interactive shell in a container.
+
+    The pod side uses the kubernetes client's synchronous WebSocket, so every
+    session owns two threads: one blocks on reading frames from the pod, the
+    other performs writes. Neither runs on the event loop or in the shared
+    threadpool, so a busy or stalled session cannot delay the others.
+
+    Output flows through a bounded queue: when the client reads slower than
+    the pod writes, the queue fills up, the reader stops pulling frames and
+    TCP pushes back on the container. Input is written one message at a
+    time, so a slow pod likewise stops the session from reading the client.
+
+    Client protocol:
+        * Text messages are written to stdin. In text mode output is sent
+          as UTF-8 text messages.
+        * Binary messages start with a channel byte, as in the Kubernetes
+          channel protocol: 0 is stdin, 4 is a terminal resize with a JSON
+          body such as `{"Width": 120, "Height": 40}`. In binary mode output
+          is sent as binary messages prefixed with channel 1 (stdout) and,
+          when the shell exits, channel 3 with the exit status.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        namespace: str,
+        pod_name: str,
+        container_name: str,
+        command: Optional[List[str]] = None,
+        binary: bool = False,
+        queue_size: Optional[int] = None,
+    ):
+        """
+        Initialize the session. Nothing is opened until `run` is awaited.
+
+        Args:
+            websocket (WebSocket): The client connection, not yet accepted.
+            namespace (str): The namespace of the pod.
+            pod_name (str): The name of the pod.
+            container_name (str): The container to run the shell in.
+            command (List[str], optional): The command to run, defaults to /bin/sh.
+            binary (bool): Send output as channel-prefixed binary messages instead of text.
+            queue_size (int, optional): Output frames buffered for the client (EXEC_OUTPUT_QUEUE_SIZE).
+        """
+        self.websocket = websocket
+        self.namespace = namespace
+        self.pod_name = pod_name
+        self.container_name = container_name
+        self.command = command or DEFAULT_EXEC_COMMAND
+        self.binary = binary
+        self.status: Optional[bytes] = None
+
+        self._output: asyncio.Queue = asyncio.Queue(maxsize=queue_size or get_exec_queue_size())
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._resp = None
+
+    async def run(self) -> None:
+        """
+        Open the exec stream, accept the client and relay data until either side closes.
+        """
+        loop = asyncio.get_running_loop()
+        # One thread blocks on reads from the pod, the other performs writes
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"exec-{self.pod_name}")
+        try:
+            self._resp = await loop.run_in_executor(self._executor, self._connect)
+        except Exception as e:
+            logger.warning(f"Exec into {self.namespace}/{self.pod_name}/{self.container_name} failed: {e}")
+            self._executor.shutdown(wait=False)
+            await self.websocket.accept()
+            await self.websocket.close(code=1011, reason=str(e)[:120])
+            return
+
+        await self.websocket.accept()
+        reader = asyncio.create_task(self._read_pod())
+        sender = asyncio.create_task(self._send_output())
+        receiver = asyncio.create_task(self._receive_input())
+        tasks = [reader, sender, receiver]
+        try:
+            # The session ends when the output is fully relayed or the client goes away
+            done, _ = await asyncio.wait([sender, receiver], return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception():
+                    logger.warning(f"Exec session {self.namespace}/{self.pod_name} ended with an error: {task.exception()}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._close()
+
+    def _connect(self):
+        # A dedicated ApiClient: `stream` swaps the client's transport while it connects
+        api_client = client.ApiClient()
+        try:
+            return stream(
+                client.CoreV1Api(api_client).connect_get_namespaced_pod_exec,
+                self.pod_name,
+                self.namespace,
+                container=self.container_name,
+                command=self.command,
+                stderr=True,
+                stdin=True,
+                stdout=True,
+                tty=True,
+                binary=True,
+                _preload_content=False,
+            )
+        finally:
+            api_client.close()
+
+    def _close(self) -> None:
+        resp = self._resp
+        if resp is not None and resp.sock is not None:
+            try:
+                # Shutting the socket down unblocks the reader thread
+                resp.sock.abort()
+                resp.close()
+            except Exception:
+                pass
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------ #
+    # Pod -> client
+    # ------------------------------------------------------------------ #
+    def _read_frame(self) -> Optional[Tuple[int, bytes]]:
+        # Blocks until the pod sends a frame; returns None once the stream is closed
+        try:
+            opcode, frame = self._resp.sock.recv_data_frame(True)
+        except (WebSocketConnectionClosedException, OSError):
+            return None
+        if opcode == ABNF.OPCODE_CLOSE:
+            return None
+        data = frame.data if isinstance(frame.data, bytes) else frame.data.encode()
+        if not data or data[0] == CLOSE_CHANNEL:
+            return (CLOSE_CHANNEL, b"")
+        return (data[0], data[1:])
+
+    async def _read_pod(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                frame = await loop.run_in_executor(self._executor, self._read_frame)
+                if frame is None:
+                    break
+                channel, data = frame
+                if channel == ERROR_CHANNEL:
+                    self.status = data
+                elif data and channel != CLOSE_CHANNEL:
+                    # Waits while the client is behind, which stops reads from the pod
+                    await self._output.put((channel, data))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Exec session {self.namespace}/{self.pod_name}: reading from the pod failed: {e}")
+        await self._output.put(None)
+
+    async def _send_output(self) -> None:
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        while True:
+            item = await self._output.get()
+            if item is None:
+                break
+            channel, data = item
+            if self.binary:
+                # With a TTY stderr is merged into stdout
+                await self.websocket.send_bytes(bytes([STDOUT_CHANNEL]) + data)
+            else:
+                text = decoder.decode(data)
+                if text:
+                    await self.websocket.send_text(text)
+        if self.binary and self.status:
+            await self.websocket.send_bytes(bytes([ERROR_CHANNEL]) + self.status)
+        await self.websocket.close(code=1000)
+
+    # ------------------------------------------------------------------ #
+    # Client -> pod
+    # ------------------------------------------------------------------ #
+    async def _write(self, channel: int, data: bytes) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._resp.write_channel, channel, data)
+
+    async def _receive_input(self) -> None:
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                channel, data = message["bytes"][0], message["bytes"][1:]
+                if channel == STDIN_CHANNEL and data:
+                    await self._write(STDIN_CHANNEL, data)
+                elif channel == RESIZE_CHANNEL:
+                    await self._resize(data)
+            elif message.get("text"):
+                await self._write(STDIN_CHANNEL, message["text"].encode())
+
+    async def _resize(self, data: bytes) -> None:
+        try:
+            size = json.loads(data)
+            width, height = int(size["Width"]), int(size["Height"])
+        except (ValueError, KeyError, TypeError):
+            logger.debug(f"Exec session {self.namespace}/{self.pod_name}: ignoring invalid resize message {data!r}")
+            return
+        await self._write(RESIZE_CHANNEL, json.dumps({"Width": width, "Height": height}).encode())
@@ -0,0 +1,11 @@
+import os
+
+
+def is_feature_enabled(name: str) -> bool:
+    """
+    Helper function to determine if an optional integration (e.g. s3, acr, pypi) is enabled.
+
+    Controlled by ENABLE_<NAME>, enabled by default. The router of a disabled
+    integration is not imported, so its SDK is never loaded.
+    """
+    return os.getenv(f"ENABLE_{name.upper()}", "True").lower() in ("true", "1", "yes")
@@ -0,0 +1,404 @@
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from kubernetes import client
+from kubernetes.client.exceptions import ApiException
+from kubernetes.watch.watch import iter_resp_lines
+from base.clients import INFORMER_POOL, get_api
+from base.masking import compile_schema_masks
+from base.k8s_client import PARTIAL_OBJECT_METADATA_ACCEPT, PARTIAL_OBJECT_METADATA_LIST_ACCEPT, json_loads
+
+logger = logging.getLogger(__name__)
+
+HTTP_STATUS_GONE = 410
+
+
+def is_informer_enabled() -> bool:
+    """
+    Helper function to determine if the informer cache is enabled.
+    """
+    return os.getenv("ENABLE_INFORMERS", "True").lower() in ("true", "1", "yes")
+
+
+class Informer:
+    """
+    Keep an in-process copy of one Kubernetes resource kind up to date.
+
+    The informer lists the resource once, then watches it from the returned
+    resourceVersion. Bookmarks advance the resourceVersion without touching
+    the store, and a 410 Gone (expired resourceVersion) triggers a fresh list.
+    Objects are stored as plain dicts, optionally reduced by a transform
+    function, and indexed by namespace so per-namespace reads are cheap.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        list_func: Callable[..., Any],
+        transform: Optional[Callable[[dict], dict]] = None,
+        page_size: int = 500,
+        watch_timeout: int = 300,
+        backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 30.0,
+        metadata_only: bool = False,
+    ):
+        """
+        Initialize the informer.
+
+        Args:
+            name (str): Name of the informer (used for logging and lookups).
+            list_func (Callable): A kubernetes client list function, e.g. `CoreV1Api.list_pod_for_all_namespaces`.
+            transform (Callable, optional): Reduces a raw object dict to the fields that should be stored.
+            page_size (int): The `limit` used for paginated relists.
+            watch_timeout (int): Server-side timeout for a single watch request, in seconds.
+            backoff_seconds (float): Initial delay before retrying after an error.
+            max_backoff_seconds (float): Upper bound for the retry delay.
+            metadata_only (bool): List and watch object metadata only (PartialObjectMetadata),
+                for informers whose transform reads nothing but metadata.
+        """
+        self.name = name
+        self.list_func = list_func
+        self.transform = transform or (lambda obj: obj)
+        self.page_size = page_size
+        self.watch_timeout = watch_timeout
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.metadata_only = metadata_only
+
+        self.resource_version: Optional[str] = None
+        self._index: Dict[str, Dict[str, dict]] = {}
+        self._lock = threading.RLock()
+        self._synced = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._response = None
+        self._handlers: List[Callable[[str, dict], None]] = []
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+    def start(self) -> None:
+        """
+        Start the list/watch loop in a background daemon thread.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=f"informer-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the list/watch loop and close the open watch connection.
+        """
+        self._stopped.set()
+        response = self._response
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+    def has_synced(self) -> bool:
+        """
+        Return True once the initial list has been loaded into the store.
+        """
+        return self._synced.is_set()
+
+    def wait_for_sync(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the initial list has been loaded or the timeout expires.
+        """
+        return self._synced.wait(timeout)
+
+    def add_handler(self, handler: Callable[[str, dict], None]) -> None:
+        """
+        Register a callback invoked as `handler(event_type, obj)` for every change.
+
+        Event types are "ADDED", "MODIFIED", "DELETED" and "RELISTED"; for a
+        relist the object is an empty dict.
+        """
+        self._handlers.append(handler)
+
+    # ------------------------------------------------------------------ #
+    # Store access
+    # ------------------------------------------------------------------ #
+    def list(self, namespace: Optional[str] = None) -> List[dict]:
+        """
+        Return the stored objects, optionally restricted to one namespace.
+        """
+        with self._lock:
+            if namespace is not None:
+                return list(self._index.get(namespace, {}).values())
+            return [obj for bucket in self._index.values() for obj in bucket.values()]
+
+    def get(self, name: str, namespace: str = "") -> Optional[dict]:
+        """
+        Return a single stored object, or None if it is not in the store.
+        """
+        with self._lock:
+            return self._index.get(namespace, {}).get(name)
+
+    def namespaces(self) -> List[str]:
+        """
+        Return the namespaces that currently hold at least one object.
+        """
+        with self._lock:
+            return [namespace for namespace, bucket in self._index.items() if bucket]
+
+    # ------------------------------------------------------------------ #
+    # List / watch loop
+    # ------------------------------------------------------------------ #
+    def _run(self) -> None:
+        backoff = self.backoff_seconds
+        while not self._stopped.is_set():
+            try:
+                if self.resource_version is None:
+                    self._relist()
+                self._watch()
+                backoff = self.backoff_seconds
+            except ApiException as e:
+                if e.status == HTTP_STATUS_GONE:
+                    logger.info(f"Informer '{self.name}': resourceVersion expired, relisting.")
+                    self.resource_version = None
+                    continue
+                logger.warning(f"Informer '{self.name}': API error {e.status}: {e.reason}")
+                backoff = self._sleep(backoff)
+            except Exception as e:
+                if self._stopped.is_set():
+                    break
+                logger.warning(f"Informer '{self.name}': watch interrupted: {e}")
+                backoff = self._sleep(backoff)
+
+    def _sleep(self, backoff: float) -> float:
+        self._stopped.wait(backoff)
+        return min(backoff * 2, self.max_backoff_seconds)
+
+    def _relist(self) -> None:
+        index: Dict[str, Dict[str, dict]] = {}
+        _continue = None
+        while True:
+            kwargs = {"limit": self.page_size, "_preload_content": False}
+            if self.metadata_only:
+                kwargs["_headers"] = {"Accept": PARTIAL_OBJECT_METADATA_LIST_ACCEPT}
+            if _continue:
+                kwargs["_continue"] = _continue
+            response = self.list_func(**kwargs)
+            body = json_loads(response.data)
+            for item in body.get("items") or []:
+                metadata = item.get("metadata", {})
+                index.setdefault(metadata.get("namespace") or "", {})[metadata.get("name")] = self.transform(item)
+            _continue = body.get("metadata", {}).get("continue")
+            if not _continue:
+                resource_version = body.get("metadata", {}).get("resourceVersion")
+                break
+
+        with self._lock:
+            self._index = index
+            self.resource_version = resource_version
+        self._synced.set()
+        logger.info(f"Informer '{self.name}': listed {sum(len(b) for b in index.values())} objects at resourceVersion {resource_version}.")
+        self._notify("RELISTED", {})
+
+    def _watch(self) -> None:
+        kwargs = {"_headers": {"Accept": PARTIAL_OBJECT_METADATA_ACCEPT}} if self.metadata_only else {}
+        response = self.list_func(
+            watch=True,
+            resource_version=self.resource_version,
+            allow_watch_bookmarks=True,
+            timeout_seconds=self.watch_timeout,
+            _preload_content=False,
+            **kwargs,
+        )
+        self._response = response
+        try:
+            for line in iter_resp_lines(response):
+                if self._stopped.is_set():
+                    break
+                if not line or line.isspace():
+                    continue
+                event = json_loads(line)
+                self._handle_event(event.get("type"), event.get("object") or {})
+        finally:
+            self._response = None
+            response.close()
+            response.release_conn()
+
+    def _handle_event(self, event_type: str, obj: dict) -> None:
+        metadata = obj.get("metadata", {})
+
+        if event_type == "ERROR":
+            raise ApiException(status=obj.get("code"), reason=f"{obj.get('reason')}: {obj.get('message')}")
+
+        if event_type == "BOOKMARK":
+            self.resource_version = metadata.get("resourceVersion", self.resource_version)
+            return
+
+        namespace = metadata.get("namespace") or ""
+        name = metadata.get("name")
+        with self._lock:
+            if event_type == "DELETED":
+                self._index.get(namespace, {}).pop(name, None)
+            else:
+                self._index.setdefault(namespace, {})[name] = self.transform(obj)
+            self.resource_version = metadata.get("resourceVersion", self.resource_version)
+        self._notify(event_type, obj)
+
+    def _notify(self, event_type: str, obj: dict) -> None:
+        for handler in self._handlers:
+            try:
+                handler(event_type, obj)
+            except Exception as e:
+                logger.warning(f"Informer '{self.name}': handler failed: {e}")
+
+
+# ---------------------------------------------------------------------- #
+# Shared informers
+# ---------------------------------------------------------------------- #
+_informers: Dict[str, Informer] = {}
+_cache_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def _pod_summary(pod: dict) -> dict:
+    return {"name": pod["metadata"]["name"], "status": (pod.get("status") or {}).get("phase")}
+
+
+def _service_summary(svc: dict) -> dict:
+    return {"name": svc["metadata"]["name"], "type": (svc.get("spec") or {}).get("type")}
+
+
+def _deployment_summary(dep: dict) -> dict:
+    return {"name": dep["metadata"]["name"], "replicas": (dep.get("status") or {}).get("replicas")}
+
+
+def _namespace_summary(ns: dict) -> dict:
+    return {"name": ns["metadata"]["name"]}
+
+
+def _crd_summary(crd: dict) -> dict:
+    spec = crd.get("spec") or {}
+    names = spec.get("names") or {}
+    return {
+        "name": crd["metadata"]["name"],
+        "group": spec.get("group"),
+        "versions": [version.get("name") for version in spec.get("versions") or [] if version.get("served", True)],
+        "plural": names.get("plural"),
+        "kind": names.get("kind"),
+        "scope": spec.get("scope"),
+        # Analyzed here, so that the schema is not kept and is analyzed once per CRD change
+        "masks": compile_schema_masks(crd),
+    }
+
+
+def register_informer(informer: Informer) -> Informer:
+    """
+    Register an informer under its name so that controllers can look it up.
+    """
+    _informers[informer.name] = informer
+    return informer
+
+
+def get_informer(name: str) -> Optional[Informer]:
+    """
+    Return the registered informer with the given name, if any.
+    """
+    return _informers.get(name)
+
+
+def get_synced_informer(name: str) -> Optional[Informer]:
+    """
+    Return the registered informer with the given name if its store is populated.
+    """
+    informer = _informers.get(name)
+    if informer and informer.has_synced():
+        _cache_stats["hits"] += 1
+        return informer
+    # The caller falls back to the API server
+    _cache_stats["misses"] += 1
+    return None
+
+
+def get_informer_cache_stats() -> Dict[str, int]:
+    """
+    Return how often a lookup found a synced informer (hits) or had to fall back to the API server (misses).
+    """
+    return dict(_cache_stats)
+
+
+def start_default_informers() -> Dict[str, Informer]:
+    """
+    Create and start the informers backing the resource overview endpoints
+    and the CRD-driven caches.
+
+    Requires the Kubernetes configuration to be loaded.
+    """
+    if not is_informer_enabled():
+        logger.info("Informer cache is disabled.")
+        return _informers
+
+    # One pool for all watches, apart from the one serving requests
+    core_v1_api = get_api(client.CoreV1Api, INFORMER_POOL)
+    apps_v1_api = get_api(client.AppsV1Api, INFORMER_POOL)
+    apiextensions_v1_api = get_api(client.ApiextensionsV1Api, INFORMER_POOL)
+    defaults = [
+        Informer("namespaces", core_v1_api.list_namespace, transform=_namespace_summary, metadata_only=True),
+        Informer("pods", core_v1_api.list_pod_for_all_namespaces, transform=_pod_summary),
+        Informer("services", core_v1_api.list_service_for_all_namespaces, transform=_service_summary),
+        Informer("deployments", apps_v1_api.list_deployment_for_all_namespaces, transform=_deployment_summary),
+        Informer("customresourcedefinitions", apiextensions_v1_api.list_custom_resource_definition, transform=_crd_summary),
+    ]
+    for informer in defaults:
+        if informer.name not in _informers:
+            register_informer(informer).start()
+    return _informers
+
+
+def stop_informers() -> None:
+    """
+    Stop every registered informer.
+    """
+    for informer in _informers.values():
+        informer.stop()
+
+
+def cached_namespace_names() -> Optional[List[str]]:
+    """
+    Return all namespace names from the informer cache, or None if it is not synced.
+    """
+    informer = get_synced_informer("namespaces")
+    if not informer:
+        return None
+    return sorted(ns["name"] for ns in informer.list(namespace=""))
+
+
+def cached_resources_grouped_by_namespace(namespace: Optional[str] = None) -> Optional[Dict[str, dict]]:
+    """
+    Build the pods/services/deployments overview from the informer cache.
+
+    Args:
+        namespace (str, optional): Restrict the result to a single namespace.
+
+    Returns:
+        Optional[Dict[str, dict]]: Resources grouped by namespace, or None if
+        any of the required informers has not completed its initial list.
+    """
+    informers = [get_synced_informer(name) for name in ("namespaces", "pods", "services", "deployments")]
+    if not all(informers):
+        return None
+    namespaces, pods, services, deployments = informers
+
+    if namespace is not None:
+        names = [namespace] if namespaces.get(namespace) else []
+    else:
+        names = sorted(ns["name"] for ns in namespaces.list(namespace=""))
+
+    return {
+        name: {
+            "pods": pods.list(namespace=name),
+            "services": services.list(namespace=name),
+            "deployments": deployments.list(namespace=name),
+        }
+        for name in names
+    }
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import jwt
+from base.metrics import observe_upstream
+
+logger = logging.getLogger(__name__)
+
+
+def get_jwks_cache_ttl() -> float:
+    """
+    Helper function returning how long a fetched key set is used before it is refreshed in the background, in seconds.
+    """
+    return float(os.getenv("JWKS_CACHE_TTL", "3600"))
+
+
+def get_jwks_min_refresh_interval() -> float:
+    """
+    Helper function returning the minimum time between two fetches of the same key set, in seconds.
+    """
+    return float(os.getenv("JWKS_MIN_REFRESH_INTERVAL", "30"))
+
+
+def get_jwks_fetch_timeout() -> float:
+    """
+    Helper function returning the timeout of a single key set fetch, in seconds.
+    """
+    return float(os.getenv("JWKS_FETCH_TIMEOUT", "10"))
+
+
+class _KeySet:
+    """
+    The cached keys of one JWKS endpoint.
+    """
+
+    def __init__(self):
+        self.keys: Dict[str, dict] = {}
+        self.signing_keys: Dict[str, Any] = {}
+        self.fetched_at: Optional[float] = None
+        self.attempted_at: Optional[float] = None
+        self.refresh_task: Optional[asyncio.Task] = None
+
+
+class JWKSCache:
+    """
+    Process-wide cache of JSON Web Key Sets, keyed by JWKS URL (one per issuer) and `kid`.
+
+    In the steady state a lookup is a dictionary access. A key set older
+    than `ttl` (JWKS_CACHE_TTL) keeps being served while it is refreshed in
+    the background. A token signed with an unknown `kid` (a rotated key)
+    triggers a refresh that the request waits for, at most once every
+    `min_refresh_interval` seconds (JWKS_MIN_REFRESH_INTERVAL) per URL, so
+    tokens with made-up key ids cannot hammer the identity provider.
+    Concurrent requests share one fetch, and a failed fetch keeps the
+    previously fetched keys.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, min_refresh_interval: Optional[float] = None, timeout: Optional[float] = None):
+        """
+        Initialize an empty cache. Key sets are fetched on first use.
+
+        Args:
+            ttl (float, optional): Age after which a key set is refreshed (JWKS_CACHE_TTL).
+            min_refresh_interval (float, optional): Minimum time between fetches per URL (JWKS_MIN_REFRESH_INTERVAL).
+            timeout (float, optional): Timeout of a single fetch (JWKS_FETCH_TIMEOUT).
+        """
+        self.ttl = get_jwks_cache_ttl() if ttl is None else ttl
+        self.min_refresh_interval = get_jwks_min_refresh_interval() if min_refresh_interval is None else min_refresh_interval
+        self.timeout = get_jwks_fetch_timeout() if timeout is None else timeout
+        self.metrics: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "rate_limited": 0,
+        }
+        self._key_sets: Dict[str, _KeySet] = {}
+
+    # ------------------------------------------------------------------ #
+    # Lookups
+    # ------------------------------------------------------------------ #
+    async def get_jwk(self, jwks_url: str, kid: Optional[str]) -> Optional[dict]:
+        """
+        Return the JWK with the given key id, as published by the endpoint.
+
+        Args:
+            jwks_url (str): The JWKS endpoint of the issuer.
+            kid (str, optional): The `kid` from the token header. Without one,
+                the only key of a single-key set is returned.
+
+        Returns:
+            Optional[dict]: The JWK, or None if the issuer does not publish it.
+        """
+        key_set = self._key_sets.setdefault(jwks_url, _KeySet())
+        now = time.monotonic()
+        if key_set.fetched_at is not None and now - key_set.fetched_at > self.ttl:
+            self._refresh_in_background(jwks_url, key_set)
+
+        jwk = self._lookup(key_set, kid)
+        if jwk is not None:
+            self.metrics["hits"] += 1
+            return jwk
+
+        self.metrics["misses"] += 1
+        refreshing = key_set.refresh_task is not None and not key_set.refresh_task.done()
+        if not refreshing and key_set.attempted_at is not None and now - key_set.attempted_at < self.min_refresh_interval:
+            self.metrics["rate_limited"] += 1
+            return None
+        await self._refresh(jwks_url, key_set)
+        return self._lookup(key_set, kid)
+
+    async def get_signing_key(self, jwks_url: str, kid: Optional[str]) -> Optional[Any]:
+        """
+        Return the public key object for `jwt.decode` (PyJWT) with the given key id.
+
+        The key is parsed once per fetched key set.
+        """
+        jwk = await self.get_jwk(jwks_url, kid)
+        if jwk is None:
+            return None
+        key_set = self._key_sets[jwks_url]
+        signing_key = key_set.signing_keys.get(jwk.get("kid", ""))
+        if signing_key is None:
+            signing_key = jwt.PyJWK(jwk).key
+            key_set.signing_keys[jwk.get("kid", "")] = signing_key
+        return signing_key
+
+    def _lookup(self, key_set: _KeySet, kid: Optional[str]) -> Optional[dict]:
+        if kid is None:
+            return next(iter(key_set.keys.values())) if len(key_set.keys) == 1 else None
+        return key_set.keys.get(kid)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the cache counters and, per JWKS URL, the number of keys and their age in seconds.
+        """
+        now = time.monotonic()
+        return {
+            **self.metrics,
+            "key_sets": {
+                url: {
+                    "keys": len(key_set.keys),
+                    "age_seconds": None if key_set.fetched_at is None else round(now - key_set.fetched_at, 1),
+                }
+                for url, key_set in self._key_sets.items()
+            },
+        }
+
+    # ------------------------------------------------------------------ #
+    # Refreshing
+    # ------------------------------------------------------------------ #
+    def _refresh_in_background(self, jwks_url: str, key_set: _KeySet) -> None:
+        if key_set.attempted_at is not None and time.monotonic() - key_set.attempted_at < self.min_refresh_interval:
+            return
+        self._start_refresh(jwks_url, key_set)
+
+    def _start_refresh(self, jwks_url: str, key_set: _KeySet) -> asyncio.Task:
+        # One fetch per URL at a time; concurrent callers await the same task
+        task = key_set.refresh_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            key_set.attempted_at = time.monotonic()
+            task = asyncio.get_running_loop().create_task(self._fetch(jwks_url, key_set), name="jwks-refresh")
+            key_set.refresh_task = task
+        return task
+
+    async def _refresh(self, jwks_url: str, key_set: _KeySet) -> None:
+        # Shielded: a cancelled request must not cancel the fetch other requests wait for
+        await asyncio.shield(self._start_refresh(jwks_url, key_set))
+
+    async def _fetch(self, jwks_url: str, key_set: _KeySet) -> None:
+        self.metrics["refreshes"] += 1
+        try:
+            with observe_upstream("jwks", "GET", resource=urlsplit(jwks_url).netloc) as observed:
+                async with httpx.AsyncClient(timeout=self.timeout) as http:
+                    response = await http.get(jwks_url)
+                    observed["status"] = str(response.status_code)
+                    response.raise_for_status()
+                keys = {jwk.get("kid", ""): jwk for jwk in response.json().get("keys", [])}
+        except Exception as e:
+            # Keep serving the keys we have; the identity provider may be briefly unavailable
+            self.metrics["refresh_failures"] += 1
+            logger.warning(f"Failed to refresh JWKS from {jwks_url}: {e}")
+            return
+        if keys != key_set.keys:
+            key_set.signing_keys = {}
+            logger.info(f"Loaded {len(keys)} signing keys from {jwks_url}.")
+        key_set.keys = keys
+        key_set.fetched_at = time.monotonic()
+
+
+_default_cache: Optional[JWKSCache] = None
+
+
+def get_jwks_cache() -> JWKSCache:
+    """
+    Return the process-wide JWKSCache.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = JWKSCache()
+    return _default_cache
@@ -0,0 +1,509 @@
+import asyncio
+import json
+import logging
+import os
+import ssl
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from kubernetes import client
+from kubernetes.client.exceptions import ApiException
+from base.metrics import kubernetes_request_labels, observe_upstream, record_upstream
+from base.tracing import inject_trace_context, start_span
+
+try:
+    # Parses API server responses several times faster than the standard library
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# Ask the API server for object metadata only; plain JSON is the fallback for servers that cannot
+PARTIAL_OBJECT_METADATA_LIST_ACCEPT = "application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1,application/json"
+PARTIAL_OBJECT_METADATA_ACCEPT = "application/json;as=PartialObjectMetadata;g=meta.k8s.io;v=v1,application/json"
+
+
+def _to_query_name(name: str) -> str:
+    """
+    Convert a kubernetes client keyword (e.g. `label_selector`, `_continue`) to its query parameter name.
+    """
+    head, *tail = name.lstrip("_").split("_")
+    return head + "".join(part.capitalize() for part in tail)
+
+
+def _to_query(params: Dict[str, Any]) -> Dict[str, str]:
+    query = {}
+    for key, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        query[_to_query_name(key)] = str(value)
+    return query
+
+
+class AsyncApiClient:
+    """
+    Non-blocking transport to the Kubernetes API server.
+
+    Wraps a single pooled `httpx.AsyncClient` (keep-alive, optionally HTTP/2)
+    configured from the loaded kubernetes `Configuration`, so authentication,
+    TLS and the API server address match the synchronous client. Responses
+    can be returned as plain dicts or deserialized into the kubernetes model
+    classes, which keeps controller code unchanged.
+    """
+
+    def __init__(
+        self,
+        configuration: Optional[client.Configuration] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Initialize the client. The HTTP transport is created lazily on first use.
+
+        Args:
+            configuration (client.Configuration, optional): Defaults to the loaded kubernetes configuration.
+            max_connections (int, optional): Maximum number of open connections (K8S_MAX_CONNECTIONS).
+            max_keepalive_connections (int, optional): Idle connections kept open (K8S_MAX_KEEPALIVE_CONNECTIONS).
+            keepalive_expiry (float, optional): Seconds an idle connection is kept (K8S_KEEPALIVE_EXPIRY).
+            http2 (bool, optional): Negotiate HTTP/2 with the API server (K8S_HTTP2).
+            timeout (float, optional): Default request timeout in seconds (K8S_REQUEST_TIMEOUT).
+        """
+        self._configuration = configuration
+        self.max_connections = max_connections or int(os.getenv("K8S_MAX_CONNECTIONS", "100"))
+        self.max_keepalive_connections = max_keepalive_connections or int(os.getenv("K8S_MAX_KEEPALIVE_CONNECTIONS", "20"))
+        self.keepalive_expiry = keepalive_expiry or float(os.getenv("K8S_KEEPALIVE_EXPIRY", "30"))
+        self.http2 = http2 if http2 is not None else os.getenv("K8S_HTTP2", "false").lower() in ("true", "1", "yes")
+        self.timeout = timeout or float(os.getenv("K8S_REQUEST_TIMEOUT", "30"))
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._model_client: Optional[client.ApiClient] = None
+
+    @property
+    def configuration(self) -> client.Configuration:
+        if self._configuration is None:
+            self._configuration = client.Configuration.get_default_copy()
+        return self._configuration
+
+    # ------------------------------------------------------------------ #
+    # Transport
+    # ------------------------------------------------------------------ #
+    def _ssl_context(self):
+        configuration = self.configuration
+        if not configuration.verify_ssl:
+            return False
+        context = ssl.create_default_context(cafile=configuration.ssl_ca_cert)
+        if configuration.cert_file:
+            context.load_cert_chain(configuration.cert_file, configuration.key_file)
+        return context
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Pooled connections belong to the event loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is not loop:
+            self._discard_client()
+        if self._client is None:
+            self._loop = loop
+            http2 = self.http2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    logger.warning("K8S_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1.")
+                    http2 = False
+
+            self._client = httpx.AsyncClient(
+                base_url=self.configuration.host,
+                verify=self._ssl_context(),
+                http2=http2,
+                proxy=self.configuration.proxy or None,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+            )
+        return self._client
+
+    def _discard_client(self) -> None:
+        # The pool of another event loop cannot be used (or awaited) from this one
+        stale, stale_loop = self._client, self._loop
+        self._client = None
+        if stale_loop is not None and stale_loop.is_running() and not stale_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(stale.aclose(), stale_loop)
+            logger.info("Event loop changed; closing the Kubernetes async client pool of the previous loop.")
+        else:
+            # Its loop is gone: the sockets are closed when the transports are garbage collected
+            logger.warning("Event loop changed; dropping the Kubernetes async client pool of the closed previous loop.")
+
+    async def close(self) -> None:
+        """
+        Close all pooled connections.
+        """
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Return the connection usage of the pool: connections in use, idle, the limit and requests waiting for a connection.
+        """
+        stats = {"client": "async", "host": self.configuration.host, "active": 0, "idle": 0, "max": self.max_connections, "waiting": 0}
+        # httpx does not expose its pool; read the httpcore pool behind the transport
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        if pool is not None:
+            connections = list(pool.connections)
+            stats["idle"] = sum(1 for connection in connections if connection.is_idle())
+            stats["active"] = len(connections) - stats["idle"]
+            stats["waiting"] = sum(1 for request in list(getattr(pool, "_requests", [])) if request.is_queued())
+        return stats
+
+    def _headers(self, accept: str = "application/json", content_type: Optional[str] = None) -> Dict[str, str]:
+        headers = {"Accept": accept}
+        if content_type:
+            headers["Content-Type"] = content_type
+
+        # get_api_key_with_prefix runs the refresh hook, so rotated tokens are picked up
+        token = self.configuration.get_api_key_with_prefix("authorization") or self.configuration.get_api_key_with_prefix("BearerToken")
+        if token:
+            headers["Authorization"] = token
+        elif self.configuration.username and self.configuration.password:
+            headers["Authorization"] = self.configuration.get_basic_auth_token()
+        # Lets API server traces join the request's trace
+        inject_trace_context(headers)
+        return headers
+
+    @staticmethod
+    async def _raise_for_status(response: httpx.Response) -> None:
+        if response.status_code < 400:
+            return
+        body = await response.aread()
+        error = ApiException(status=response.status_code, reason=response.reason_phrase)
+        error.body = body.decode("utf-8", errors="replace")
+        error.headers = response.headers
+        raise error
+
+    # ------------------------------------------------------------------ #
+    # (De)serialization
+    # ------------------------------------------------------------------ #
+    @property
+    def model_client(self) -> client.ApiClient:
+        """
+        A synchronous ApiClient used only to (de)serialize kubernetes models; it never performs I/O.
+        """
+        if self._model_client is None:
+            self._model_client = client.ApiClient(self.configuration)
+        return self._model_client
+
+    def deserialize(self, data: Any, response_type: str) -> Any:
+        """
+        Convert a decoded JSON document into the given kubernetes model class (e.g. "V1PodList").
+        """
+        # Same conversion the synchronous client applies after reading a response
+        return self.model_client._ApiClient__deserialize(data, response_type)
+
+    def serialize(self, body: Any) -> bytes:
+        return json.dumps(self.model_client.sanitize_for_serialization(body)).encode("utf-8")
+
+    # ------------------------------------------------------------------ #
+    # Requests
+    # ------------------------------------------------------------------ #
+    async def request(
+        self,
+        method: str,
+        path: str,
+        response_type: Optional[str] = None,
+        body: Any = None,
+        content_type: Optional[str] = None,
+        accept: str = "application/json",
+        _preload_content: bool = True,
+        _request_timeout: Optional[float] = None,
+        **params: Any,
+    ) -> Any:
+        """
+        Perform a request against the API server.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The API path, e.g. "/api/v1/namespaces".
+            response_type (str, optional): Kubernetes model to deserialize into.
+            body (Any, optional): Request body (dict or kubernetes model).
+            content_type (str, optional): Request content type, defaults to JSON.
+            accept (str): The Accept header, e.g. to request an alternative representation.
+            _preload_content (bool): If False, return the decoded JSON without model deserialization.
+            _request_timeout (float, optional): Overrides the default timeout.
+            **params: Query parameters using kubernetes client names (e.g. `label_selector`).
+
+        Returns:
+            Any: The deserialized model, or the decoded JSON document.
+
+        Raises:
+            ApiException: If the API server responds with an error status.
+        """
+        content = self.serialize(body) if body is not None else None
+        group, verb, resource = kubernetes_request_labels(method, path, params)
+        with observe_upstream("kubernetes", verb, group, resource) as observed:
+            response = await self._get_client().request(
+                method,
+                path,
+                params=_to_query(params),
+                content=content,
+                headers=self._headers(accept=accept, content_type=content_type or ("application/json" if content is not None else None)),
+                timeout=_request_timeout or self.timeout,
+            )
+            observed["status"] = str(response.status_code)
+            await self._raise_for_status(response)
+
+        data = json_loads(response.content) if response.content else None
+        if response_type and _preload_content:
+            return self.deserialize(data, response_type)
+        return data
+
+    @asynccontextmanager
+    async def stream(self, method: str, path: str, accept: str = "application/json", _request_timeout: Optional[float] = None, **params: Any) -> AsyncIterator[httpx.Response]:
+        """
+        Open a streaming request; the connection is released when the context exits.
+
+        Raises:
+            ApiException: If the API server responds with an error status.
+        """
+        timeout = httpx.Timeout(self.timeout, read=_request_timeout)
+        group, verb, resource = kubernetes_request_labels(method, path, params)
+        started = time.perf_counter()
+        async with AsyncExitStack() as stack:
+            # Only the time until the response starts; watches and followed logs stay open much longer
+            name = " ".join(part for part in ("kubernetes", verb, group, resource) if part)
+            with start_span(name, client=True, attributes={"http.request.method": method, "url.path": path}) as span:
+                try:
+                    response = await stack.enter_async_context(
+                        self._get_client().stream(method, path, params=_to_query(params), headers=self._headers(accept=accept), timeout=timeout)
+                    )
+                except httpx.TransportError:
+                    record_upstream("kubernetes", verb, group, resource, "error", time.perf_counter() - started)
+                    raise
+                record_upstream("kubernetes", verb, group, resource, str(response.status_code), time.perf_counter() - started)
+                if span is not None:
+                    span.set_attribute("http.response.status_code", response.status_code)
+            await self._raise_for_status(response)
+            yield response
+
+    async def watch(self, path: str, response_type: Optional[str] = None, **params: Any) -> AsyncIterator[dict]:
+        """
+        Watch a collection and yield events as they arrive.
+
+        Each event is a dict with "type", "raw_object" and "object" (deserialized
+        into `response_type` when given). ERROR events are raised as ApiException.
+
+        Args:
+            path (str): The collection path, e.g. "/api/v1/events".
+            response_type (str, optional): Kubernetes model for the watched objects (e.g. "CoreV1Event").
+            **params: Query parameters using kubernetes client names.
+        """
+        params["watch"] = True
+        async with self.stream("GET", path, **params) as response:
+            async for line in response.aiter_lines():
+                if not line or line.isspace():
+                    continue
+                event = json_loads(line)
+                raw_object = event.get("object") or {}
+                if event.get("type") == "ERROR":
+                    raise ApiException(status=raw_object.get("code"), reason=f"{raw_object.get('reason')}: {raw_object.get('message')}")
+                event["raw_object"] = raw_object
+                if response_type and event.get("type") != "BOOKMARK":
+                    event["object"] = self.deserialize(raw_object, response_type)
+                yield event
+
+
+_default_api_client: Optional[AsyncApiClient] = None
+
+
+def get_async_api_client() -> AsyncApiClient:
+    """
+    Return the process-wide AsyncApiClient shared by all async API groups.
+    """
+    global _default_api_client
+    if _default_api_client is None:
+        _default_api_client = AsyncApiClient()
+    return _default_api_client
+
+
+def get_async_pool_stats() -> List[Dict[str, Any]]:
+    """
+    Return the pool usage of the process-wide AsyncApiClient, if it was created.
+    """
+    return [_default_api_client.pool_stats()] if _default_api_client is not None else []
+
+
+async def close_async_api_client() -> None:
+    """
+    Close the process-wide AsyncApiClient, if it was created.
+    """
+    if _default_api_client is not None:
+        await _default_api_client.close()
+
+
+class _AsyncApi:
+    def __init__(self, api_client: Optional[AsyncApiClient] = None):
+        self._api_client = api_client
+
+    @property
+    def api_client(self) -> AsyncApiClient:
+        return self._api_client or get_async_api_client()
+
+    async def _get(self, path: str, response_type: str, _metadata_only: bool = False, **kwargs: Any) -> Any:
+        if _metadata_only:
+            # Items come back as PartialObjectMetadata; they deserialize into the
+            # regular list model with only `metadata` populated
+            kwargs["accept"] = PARTIAL_OBJECT_METADATA_LIST_ACCEPT
+        return await self.api_client.request("GET", path, response_type, **kwargs)
+
+
+class AsyncCoreV1Api(_AsyncApi):
+    """
+    Coroutine equivalents of the `CoreV1Api` calls used by the controllers.
+    """
+
+    async def get_api_resources(self, **kwargs):
+        return await self._get("/api/v1", "V1APIResourceList", **kwargs)
+
+    async def list_namespace(self, **kwargs):
+        return await self._get("/api/v1/namespaces", "V1NamespaceList", **kwargs)
+
+    async def read_namespace(self, name: str, **kwargs):
+        return await self._get(f"/api/v1/namespaces/{name}", "V1Namespace", **kwargs)
+
+    async def delete_namespace(self, name: str, **kwargs):
+        return await self.api_client.request("DELETE", f"/api/v1/namespaces/{name}", "V1Status", **kwargs)
+
+    async def list_pod_for_all_namespaces(self, **kwargs):
+        return await self._get("/api/v1/pods", "V1PodList", **kwargs)
+
+    async def list_namespaced_pod(self, namespace: str, **kwargs):
+        return await self._get(f"/api/v1/namespaces/{namespace}/pods", "V1PodList", **kwargs)
+
+    async def read_namespaced_pod(self, name: str, namespace: str, **kwargs):
+        return await self._get(f"/api/v1/namespaces/{namespace}/pods/{name}", "V1Pod", **kwargs)
+
+    def stream_namespaced_pod_log(self, name: str, namespace: str, **kwargs):
+        """
+        Open a streaming request for the log of a pod; use it as `async with`.
+        The connection is closed, and a followed log stops, when the context exits.
+        """
+        return self.api_client.stream("GET", f"/api/v1/namespaces/{namespace}/pods/{name}/log", accept="text/plain, */*", **kwargs)
+
+    async def delete_namespaced_pod(self, name: str, namespace: str, **kwargs):
+        return await self.api_client.request("DELETE", f"/api/v1/namespaces/{namespace}/pods/{name}", "V1Pod", **kwargs)
+
+    async def list_service_for_all_namespaces(self, **kwargs):
+        return await self._get("/api/v1/services", "V1ServiceList", **kwargs)
+
+    async def list_namespaced_service(self, namespace: str, **kwargs):
+        return await self._get(f"/api/v1/namespaces/{namespace}/services", "V1ServiceList", **kwargs)
+
+    async def read_namespaced_service(self, name: str, namespace: str, **kwargs):
+        return await self._get(f"/api/v1/namespaces/{namespace}/services/{name}", "V1Service", **kwargs)
+
+    async def delete_namespaced_service(self, name: str, namespace: str, **kwargs):
+        return await self.api_client.request("DELETE", f"/api/v1/namespaces/{namespace}/services/{name}", "V1Service", **kwargs)
+
+    async def list_node(self, **kwargs):
+        return await self._get("/api/v1/nodes", "V1NodeList", **kwargs)
+
+    async def list_persistent_volume(self, **kwargs):
+        return await self._get("/api/v1/persistentvolumes", "V1PersistentVolumeList", **kwargs)
+
+    async def delete_persistent_volume(self, name: str, **kwargs):
+        return await self.api_client.request("DELETE", f"/api/v1/persistentvolumes/{name}", "V1PersistentVolume", **kwargs)
+
+    async def list_persistent_volume_claim_for_all_namespaces(self, **kwargs):
+        return await self._get("/api/v1/persistentvolumeclaims", "V1PersistentVolumeClaimList", **kwargs)
+
+    async def list_namespaced_persistent_volume_claim(self, namespace: str, **kwargs):
+        return await self._get(f"/api/v1/namespaces/{namespace}/persistentvolumeclaims", "V1PersistentVolumeClaimList", **kwargs)
+
+    async def delete_namespaced_persistent_volume_claim(self, name: str, namespace: str, **kwargs):
+        return await self.api_client.request("DELETE", f"/api/v1/namespaces/{namespace}/persistentvolumeclaims/{name}", "V1PersistentVolumeClaim", **kwargs)
+
+    async def list_secret_for_all_namespaces(self, **kwargs):
+        return await self._get("/api/v1/secrets", "V1SecretList", **kwargs)
+
+    async def read_namespaced_secret(self, name: str, namespace: str, **kwargs):
+        return await self._get(f"/api/v1/namespaces/{namespace}/secrets/{name}", "V1Secret", **kwargs)
+
+    async def list_namespaced_service_account(self, namespace: str, **kwargs):
+        return await self._get(f"/api/v1/namespaces/{namespace}/serviceaccounts", "V1ServiceAccountList", **kwargs)
+
+    async def read_namespaced_service_account(self, name: str, namespace: str, **kwargs):
+        return await self._get(f"/api/v1/namespaces/{namespace}/serviceaccounts/{name}", "V1ServiceAccount", **kwargs)
+
+    async def list_event_for_all_namespaces(self, **kwargs):
+        return await self._get("/api/v1/events", "CoreV1EventList", **kwargs)
+
+
+class AsyncAppsV1Api(_AsyncApi):
+    """
+    Coroutine equivalents of the `AppsV1Api` calls used by the controllers.
+    """
+
+    async def list_deployment_for_all_namespaces(self, **kwargs):
+        return await self._get("/apis/apps/v1/deployments", "V1DeploymentList", **kwargs)
+
+    async def list_namespaced_deployment(self, namespace: str, **kwargs):
+        return await self._get(f"/apis/apps/v1/namespaces/{namespace}/deployments", "V1DeploymentList", **kwargs)
+
+    async def read_namespaced_deployment(self, name: str, namespace: str, **kwargs):
+        return await self._get(f"/apis/apps/v1/namespaces/{namespace}/deployments/{name}", "V1Deployment", **kwargs)
+
+    async def patch_namespaced_deployment(self, name: str, namespace: str, body: Any, **kwargs):
+        content_type = "application/json-patch+json" if isinstance(body, list) else "application/strategic-merge-patch+json"
+        return await self.api_client.request(
+            "PATCH", f"/apis/apps/v1/namespaces/{namespace}/deployments/{name}", "V1Deployment",
+            body=body, content_type=content_type, **kwargs,
+        )
+
+    async def delete_namespaced_deployment(self, name: str, namespace: str, **kwargs):
+        return await self.api_client.request("DELETE", f"/apis/apps/v1/namespaces/{namespace}/deployments/{name}", "V1Status", **kwargs)
+
+    async def delete_namespaced_stateful_set(self, name: str, namespace: str, **kwargs):
+        return await self.api_client.request("DELETE", f"/apis/apps/v1/namespaces/{namespace}/statefulsets/{name}", "V1Status", **kwargs)
+
+    async def delete_namespaced_replica_set(self, name: str, namespace: str, **kwargs):
+        return await self.api_client.request("DELETE", f"/apis/apps/v1/namespaces/{namespace}/replicasets/{name}", "V1Status", **kwargs)
+
+
+class AsyncBatchV1Api(_AsyncApi):
+    """
+    Coroutine equivalents of the `BatchV1Api` calls used by the controllers.
+    """
+
+    async def create_namespaced_job(self, namespace: str, body: Any, **kwargs):
+        return await self.api_client.request("POST", f"/apis/batch/v1/namespaces/{namespace}/jobs", "V1Job", body=body, **kwargs)
+
+
+class AsyncNetworkingV1Api(_AsyncApi):
+    """
+    Coroutine equivalents of the `NetworkingV1Api` calls used by the controllers.
+    """
+
+    async def list_namespaced_ingress(self, namespace: str, **kwargs):
+        return await self._get(f"/apis/networking.k8s.io/v1/namespaces/{namespace}/ingresses", "V1IngressList", **kwargs)
+
+
+class AsyncStorageV1Api(_AsyncApi):
+    """
+    Coroutine equivalents of the `StorageV1Api` calls used by the controllers.
+    """
+
+    async def list_storage_class(self, **kwargs):
+        return await self._get("/apis/storage.k8s.io/v1/storageclasses", "V1StorageClassList", **kwargs)
+
+    async def read_storage_class(self, name: str, **kwargs):
+        return await self._get(f"/apis/storage.k8s.io/v1/storageclasses/{name}", "V1StorageClass", **kwargs)
@@ -1,17 +1,46 @@
 from kubernetes import config, client
+import logging
 import os
+import threading
 
+logger = logging.getLogger(__name__)
 
-def load_k8s_config():
-    """Load Kubernetes configuration."""
-    try:
-        # Try to load the in-cluster config (for running inside Kubernetes)
-        config.load_incluster_config()
-        print("Loaded in-cluster Kubernetes config.")
-    except config.ConfigException:
-        # Fallback to local kubeconfig file (for local development)
-        kubeconfig_path = os.getenv(
-            "KUBECONFIG", "~/.kube/config"
-        )  # Default to ~/.kube/config if not set
-        config.load_kube_config(config_file=kubeconfig_path)
-        print(f"Loaded kubeconfig from {kubeconfig_path}")
\ No newline at end of file
+_config_lock = threading.Lock()
+_config_loaded = False
+
+
+def load_k8s_config(force: bool = False):
+    """
+    Load Kubernetes configuration.
+
+    The configuration is loaded once per process; later calls return
+    immediately, so modules can call this before using a client.
+
+    Args:
+        force (bool): Load the configuration again, e.g. after the kubeconfig changed.
+    """
+    global _config_loaded
+    if _config_loaded and not force:
+        return
+    with _config_lock:
+        if _config_loaded and not force:
+            return
+        try:
+            # Try to load the in-cluster config (for running inside Kubernetes)
+            config.load_incluster_config()
+            logger.info("Loaded in-cluster Kubernetes config.")
+        except config.ConfigException:
+            # Fallback to local kubeconfig file (for local development)
+            kubeconfig_path = os.getenv(
+                "KUBECONFIG", "~/.kube/config"
+            )  # Default to ~/.kube/config if not set
+            config.load_kube_config(config_file=kubeconfig_path)
+            logger.info(f"Loaded kubeconfig from {kubeconfig_path}")
+        _config_loaded = True
+
+
+def is_k8s_config_loaded() -> bool:
+    """
+    Helper function to determine if the Kubernetes configuration has been loaded.
+    """
+    return _config_loaded
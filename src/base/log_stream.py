@@ -0,0 +1,250 @@
+import asyncio
+import heapq
+import logging
+import os
+import zlib
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi import Request
+from base.responses import ClosingStreamingResponse
+
+TEXT_MEDIA_TYPE = "text/plain; charset=utf-8"
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+
+logger = logging.getLogger(__name__)
+
+# A log line ready to be merged: its sortable timestamp key and the output bytes
+MergeItem = Tuple[bytes, bytes]
+
+
+def is_log_gzip_enabled() -> bool:
+    """
+    Helper function to determine if log streams are gzip-compressed for clients that accept it.
+    """
+    return os.getenv("LOG_STREAM_GZIP", "True").lower() in ("true", "1", "yes")
+
+
+def get_max_line_bytes() -> int:
+    """
+    Helper function returning the longest log line kept in memory; longer lines are split.
+    """
+    return max(1, int(os.getenv("LOG_MAX_LINE_BYTES", "65536")))
+
+
+def get_log_search_max_streams() -> int:
+    """
+    Helper function returning how many pod/container log streams one search may open at once.
+    """
+    return max(1, int(os.getenv("LOG_SEARCH_MAX_STREAMS", "20")))
+
+
+def get_log_merge_window() -> float:
+    """
+    Helper function returning how long followed lines are held back to order them by timestamp, in seconds.
+    """
+    return float(os.getenv("LOG_MERGE_WINDOW", "0.5"))
+
+
+def get_log_merge_buffer_size() -> int:
+    """
+    Helper function returning the maximum number of followed lines held for ordering.
+    """
+    return max(1, int(os.getenv("LOG_MERGE_BUFFER_SIZE", "1000")))
+
+
+def wants_event_stream(request: Request) -> bool:
+    """
+    Return True if the client asked for Server-Sent Events.
+    """
+    return EVENT_STREAM_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def accepts_gzip(request: Request) -> bool:
+    """
+    Return True if the response may be gzip-compressed.
+    """
+    return is_log_gzip_enabled() and "gzip" in request.headers.get("accept-encoding", "")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: Optional[int] = None) -> AsyncIterator[bytes]:
+    """
+    Split a byte stream into lines (without the trailing newline).
+
+    At most one partial line is buffered, and a line longer than
+    `max_line_bytes` (LOG_MAX_LINE_BYTES) is yielded in pieces, so memory
+    stays bounded whatever the size of the log.
+    """
+    max_line_bytes = max_line_bytes or get_max_line_bytes()
+    pending = b""
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line
+        while len(pending) >= max_line_bytes:
+            yield pending[:max_line_bytes]
+            pending = pending[max_line_bytes:]
+    if pending:
+        yield pending
+
+
+def split_timestamp(line: bytes) -> MergeItem:
+    """
+    Split a line of a `timestamps=true` log into a sortable timestamp key and the message.
+
+    The kubelet writes RFC 3339 timestamps with trailing zeros trimmed from the
+    fraction; the key pads the fraction so keys compare in time order. Lines
+    without a timestamp get an empty key.
+    """
+    timestamp, separator, message = line.partition(b" ")
+    if not separator or not timestamp[:1].isdigit():
+        return b"", line
+    seconds, _, fraction = timestamp.rstrip(b"Z").partition(b".")
+    return seconds + b"." + fraction.ljust(9, b"0"), message
+
+
+async def _next(stream: AsyncIterator[MergeItem]) -> Optional[MergeItem]:
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def _close_streams(streams: List[AsyncIterator[MergeItem]]) -> None:
+    for stream in streams:
+        await stream.aclose()
+
+
+async def merge_sorted(streams: List[AsyncIterator[MergeItem]]) -> AsyncIterator[bytes]:
+    """
+    Merge streams that are each in timestamp order into one stream in timestamp order.
+
+    Only the head line of every stream is held in memory; the first lines of
+    all streams are requested concurrently.
+    """
+    try:
+        heads = await asyncio.gather(*(_next(stream) for stream in streams))
+        heap = [(head[0], position, head[1]) for position, head in enumerate(heads) if head is not None]
+        heapq.heapify(heap)
+        while heap:
+            _, position, data = heap[0]
+            yield data
+            head = await _next(streams[position])
+            if head is None:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (head[0], position, head[1]))
+    finally:
+        # Shielded: when the client disconnects the surrounding scope stays cancelled
+        await asyncio.shield(_close_streams(streams))
+
+
+_STREAM_DONE = object()
+
+
+async def merge_live(streams: List[AsyncIterator[MergeItem]], window: Optional[float] = None, buffer_size: Optional[int] = None) -> AsyncIterator[bytes]:
+    """
+    Merge followed streams, which never end, in approximate timestamp order.
+
+    Every stream is read by its own task, so a quiet stream does not hold up
+    the others. Lines are held for `window` seconds (LOG_MERGE_WINDOW) and
+    released in timestamp order, which orders the initial backlog and lines
+    arriving close together. At most `buffer_size` lines
+    (LOG_MERGE_BUFFER_SIZE) are held; readers wait while the buffer is full.
+    """
+    window = get_log_merge_window() if window is None else window
+    buffer_size = buffer_size or get_log_merge_buffer_size()
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+
+    async def pump(stream: AsyncIterator[MergeItem]) -> None:
+        try:
+            async for item in stream:
+                await queue.put(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Log stream interrupted: {e}")
+        finally:
+            # The reader owns its stream, so cancelling it closes the upstream request
+            await stream.aclose()
+        await queue.put(_STREAM_DONE)
+
+    tasks = [asyncio.create_task(pump(stream)) for stream in streams]
+    remaining, sequence = len(tasks), 0
+    held: List[Tuple[bytes, int, float, bytes]] = []
+    try:
+        while remaining or held:
+            timeout = None
+            if held:
+                timeout = held[0][2] + window - loop.time()
+                if timeout <= 0 or not remaining or len(held) >= buffer_size:
+                    yield heapq.heappop(held)[3]
+                    continue
+            try:
+                async with asyncio.timeout(timeout):
+                    item = await queue.get()
+            except TimeoutError:
+                continue
+            if item is _STREAM_DONE:
+                remaining -= 1
+                continue
+            heapq.heappush(held, (item[0], sequence, loop.time(), item[1]))
+            sequence += 1
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Shielded so a repeated cancellation does not interrupt the readers closing their streams
+        await asyncio.shield(asyncio.gather(*tasks, return_exceptions=True))
+
+
+async def _event_stream(lines: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    async for line in lines:
+        yield b"data: " + line.rstrip(b"\r") + b"\n\n"
+
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        # Flush every chunk so a followed log is not held back by the compressor
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def _closing(body: AsyncIterator[bytes], source: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    # Closing the response closes this generator; pass that on to the source past the wrappers
+    try:
+        async for data in body:
+            yield data
+    finally:
+        await source.aclose()
+
+
+def log_stream_response(request: Request, chunks: AsyncIterator[bytes]) -> ClosingStreamingResponse:
+    """
+    Stream log output to the client as it is produced.
+
+    The body is chunked plain text, or one Server-Sent Event per line when the
+    client accepts `text/event-stream`, and is gzip-compressed when the client
+    accepts it. When the client disconnects the iterator is closed, which
+    closes the upstream request.
+
+    Args:
+        request (Request): The incoming request, used for content negotiation.
+        chunks (AsyncIterator[bytes]): Newline-delimited log output.
+
+    Returns:
+        ClosingStreamingResponse: The log stream.
+    """
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if wants_event_stream(request):
+        body, media_type = _event_stream(iter_lines(chunks)), EVENT_STREAM_MEDIA_TYPE
+    else:
+        body, media_type = chunks, TEXT_MEDIA_TYPE
+    if accepts_gzip(request):
+        body = _gzip(body)
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    return ClosingStreamingResponse(_closing(body, chunks), media_type=media_type, headers=headers)
@@ -1,27 +1,208 @@
 import os
+import sys
+import copy
+import time
+import queue
+import atexit
 import logging
-from typing import Optional
+import logging.handlers
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+import orjson
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+def get_log_level() -> int:
+    """
+    Helper function returning the root log level (LOG_LEVEL), INFO by default.
+    """
+    return logging.getLevelName(os.getenv("LOG_LEVEL", "INFO").upper())
+
+
+def get_logger_levels() -> Dict[str, int]:
+    """
+    Helper function parsing per-logger levels from LOG_LEVELS, e.g. `AuthWrapper=WARNING,base.informer=DEBUG`.
+    """
+    levels = {}
+    for entry in os.getenv("LOG_LEVELS", "").split(","):
+        name, separator, level = entry.partition("=")
+        if separator and name.strip():
+            levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return levels
+
+
+def is_json_logging_enabled() -> bool:
+    """
+    Helper function to determine if log records are written as JSON lines (LOG_FORMAT=json) or plain text.
+    """
+    return os.getenv("LOG_FORMAT", "json").lower() == "json"
+
+
+def get_log_queue_size() -> int:
+    """
+    Helper function returning how many records may wait for the log writer thread before new ones are dropped.
+    """
+    return max(1, int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+
+
+def get_log_rate_limit() -> Tuple[int, float]:
+    """
+    Helper function returning how many identical INFO/DEBUG messages are written per interval (LOG_RATE_LIMIT,
+    LOG_RATE_LIMIT_INTERVAL in seconds). A limit of 0 disables rate limiting.
+    """
+    return max(0, int(os.getenv("LOG_RATE_LIMIT", "10"))), float(os.getenv("LOG_RATE_LIMIT_INTERVAL", "60"))
+
+
+def _extra_fields(record: logging.LogRecord) -> Dict[str, object]:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES and not key.startswith("_")}
+
+
+class TextFormatter(logging.Formatter):
+    """
+    Format records with a format string, followed by any `extra` values as key=value pairs.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extra = _extra_fields(record)
+        if extra:
+            line += " " + " ".join(f"{key}={value}" for key, value in extra.items())
+        return line
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line.
+
+    Values passed through `extra` become top-level fields, so
+    `logger.info("Pod log opened", extra={"pod": name})` is searchable by pod.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        entry.update(_extra_fields(record))
+        return orjson.dumps(entry, default=str).decode()
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let at most `limit` identical messages through per `interval` seconds.
+
+    Messages are identified by logger, level and message template, which
+    catches per-request success lines such as "API key validated
+    successfully." Warnings and errors always pass. The first message after
+    a suppressed period reports how many were left out.
+    """
+
+    def __init__(self, limit: int, interval: float, max_keys: int = 10000):
+        super().__init__()
+        self.limit = limit
+        self.interval = interval
+        self.max_keys = max_keys
+        self._windows: Dict[tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.interval:
+            if len(self._windows) >= self.max_keys:
+                self._windows.clear()
+            suppressed = window[2] if window is not None else 0
+            # [window start, messages written, messages suppressed]
+            self._windows[key] = [now, 1, 0]
+            if suppressed:
+                record.suppressed = suppressed
+            return True
+        if window[1] < self.limit:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hand records to the writer thread without ever waiting on it.
+
+    When the queue is full (stdout is not keeping up) the record is dropped
+    and counted in `dropped` rather than stalling the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now, they may change after the call; the traceback stays separate for the formatter
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        # Writes the records still in the queue
+        _listener.stop()
+        _listener = None
+
 
 class LoggerConfigurator:
     """
     A class to configure logging for the application.
+
+    Records from every logger go through a bounded queue to a single writer
+    thread, so a slow stdout never blocks request handling. Output is JSON
+    lines by default (LOG_FORMAT), the root level comes from LOG_LEVEL and
+    individual loggers can be tuned with LOG_LEVELS. Repeated INFO/DEBUG
+    messages are rate limited (LOG_RATE_LIMIT).
     """
 
-    def __init__(self, level: int = logging.DEBUG, format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"):
+    def __init__(self, level: Optional[int] = None, format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"):
         """
         Initializes the LoggerConfigurator with default logging level and format.
 
         Args:
-            level (int): Logging level (e.g., logging.DEBUG, logging.INFO).
-            format (str): Logging format string.
+            level (int, optional): Root logging level (e.g., logging.DEBUG, logging.INFO), defaults to LOG_LEVEL.
+            format (str): Logging format string used when LOG_FORMAT is not json.
         """
-        self.level = level
+        self.level = get_log_level() if level is None else level
         self.format = format
         self.logger = logging.getLogger(__name__)
 
     def configure_logging(self, log_file: Optional[str] = None) -> logging.Logger:
         """
-        Configures logging for the application.
+        Configures logging for the application. Calling it again has no effect.
 
         Args:
             log_file (Optional[str]): Path to a log file (if any).
@@ -29,19 +210,31 @@ class LoggerConfigurator:
         Returns:
             logging.Logger: Configured logger instance.
         """
-        if not self.logger.hasHandlers():  # Prevent duplicate handlers
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter(self.format)
+        global _listener
+        if _listener is not None:  # Prevent duplicate handlers
+            return self.logger
+
+        formatter = JSONFormatter() if is_json_logging_enabled() else TextFormatter(self.format)
+        handlers = [logging.StreamHandler(sys.stdout)]
+        if log_file:
+            handlers.append(logging.FileHandler(log_file))
+        for handler in handlers:
             handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
 
-            if log_file:
-                file_handler = logging.FileHandler(log_file)
-                file_handler.setFormatter(formatter)
-                self.logger.addHandler(file_handler)
+        queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=get_log_queue_size()))
+        limit, interval = get_log_rate_limit()
+        if limit:
+            queue_handler.addFilter(RateLimitFilter(limit, interval))
 
-            self.logger.setLevel(self.level)
+        root = logging.getLogger()
+        root.addHandler(queue_handler)
+        root.setLevel(self.level)
+        for name, level in get_logger_levels().items():
+            logging.getLogger(name).setLevel(level)
 
+        _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_stop_listener)
         return self.logger
 
     def log_message(self, level: int, message: str) -> None:
@@ -52,6 +245,6 @@ class LoggerConfigurator:
             level (int): Logging level (e.g., logging.DEBUG, logging.INFO).
             message (str): The message to log.
         """
-        if not self.logger.hasHandlers():
+        if _listener is None:
             self.configure_logging()
-        self.logger.log(level, message)
\ No newline at end of file
+        self.logger.log(level, message)
@@ -0,0 +1,327 @@
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
+
+logger = logging.getLogger(__name__)
+
+REDACTED = "***REDACTED***"
+
+# Keys containing one of these (case-insensitive) are masked
+DEFAULT_DENY_PATTERNS = ["secret", "token", "password", "tls", "auth", "privatekey"]
+
+
+def _split_patterns(value: Optional[str]) -> List[str]:
+    return [pattern.strip() for pattern in (value or "").split(",") if pattern.strip()]
+
+
+def get_masking_deny_patterns() -> List[str]:
+    """
+    Helper function returning the key patterns that are masked: the defaults plus MASKING_DENY_PATTERNS.
+    """
+    return DEFAULT_DENY_PATTERNS + _split_patterns(os.getenv("MASKING_DENY_PATTERNS"))
+
+
+def get_masking_allow_patterns() -> List[str]:
+    """
+    Helper function returning the key patterns that are never masked (MASKING_ALLOW_PATTERNS), e.g. "^tlsVersion$".
+    """
+    return _split_patterns(os.getenv("MASKING_ALLOW_PATTERNS"))
+
+
+def _compile(patterns: Iterable[str]) -> Optional[Pattern[str]]:
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+
+
+class SecretMasker:
+    """
+    Replace the values of sensitive keys in parsed API objects with "***REDACTED***".
+
+    A key is sensitive if one of the deny patterns is found in it and none
+    of the allow patterns is; patterns are case-insensitive regular
+    expressions, so a plain word matches as a substring. Both lists are
+    compiled into a single expression each, and the verdict per key name is
+    cached: API objects repeat the same few hundred keys, so after warm-up
+    a key costs one dict lookup.
+
+    Masking walks the document with an explicit stack (no recursion limit on
+    deep objects) and is copy-on-write: the input is never modified, only
+    the dicts and lists on the path to a masked key are copied, and a
+    document without sensitive keys is returned as is. Inputs may therefore
+    be shared, e.g. informer or cache entries.
+    """
+
+    # Bound on the verdict cache; keys seen once it is full (e.g. arbitrary label keys) are matched every time
+    MAX_CACHED_KEYS = 8192
+
+    def __init__(self, deny_patterns: Optional[Iterable[str]] = None, allow_patterns: Optional[Iterable[str]] = None):
+        """
+        Compile the masking rules.
+
+        Args:
+            deny_patterns (Iterable[str], optional): Patterns of keys to mask, defaults to the built-in
+                keywords plus MASKING_DENY_PATTERNS.
+            allow_patterns (Iterable[str], optional): Patterns of keys never masked (MASKING_ALLOW_PATTERNS).
+
+        Raises:
+            re.error: If a pattern is not a valid regular expression.
+        """
+        self._deny = _compile(get_masking_deny_patterns() if deny_patterns is None else deny_patterns)
+        self._allow = _compile(get_masking_allow_patterns() if allow_patterns is None else allow_patterns)
+        self._verdicts: Dict[str, bool] = {}
+
+    def is_sensitive(self, key: str) -> bool:
+        """
+        Return whether the value of a key is masked.
+        """
+        verdict = self._verdicts.get(key)
+        if verdict is None:
+            name = key if isinstance(key, str) else str(key)
+            verdict = bool(
+                self._deny is not None
+                and self._deny.search(name)
+                and not (self._allow is not None and self._allow.search(name))
+            )
+            if len(self._verdicts) < self.MAX_CACHED_KEYS:
+                self._verdicts[key] = verdict
+        return verdict
+
+    def mask(self, value: Any) -> Any:
+        """
+        Return the document with the values of sensitive keys masked, in nested dicts and lists too.
+
+        Args:
+            value (Any): A parsed API object or list of objects. It is not modified.
+
+        Returns:
+            Any: The masked document; `value` itself if nothing was masked.
+        """
+        if not isinstance(value, (dict, list)):
+            return value
+
+        # Scan: a container's position is a link (parent link, key in parent), None for the document itself
+        is_sensitive = self.is_sensitive
+        verdicts = self._verdicts
+        masked = []
+        stack = [value, None]
+        pop, push = stack.pop, stack.append
+        while stack:
+            link = pop()
+            container = pop()
+            if isinstance(container, dict):
+                for key, item in container.items():
+                    sensitive = verdicts.get(key)
+                    if sensitive is None:
+                        sensitive = is_sensitive(key)
+                    if sensitive:
+                        masked.append((link, key))
+                    elif item and isinstance(item, (dict, list)):
+                        push(item)
+                        push((link, key))
+            else:
+                for index, item in enumerate(container):
+                    if item and isinstance(item, (dict, list)):
+                        push(item)
+                        push((link, index))
+        if not masked:
+            return value
+
+        # Copy on write: copy the containers on the path to every masked key, once each
+        # (the links in `masked` keep their ancestors alive, so their ids are unique)
+        copies: Dict[int, Any] = {}
+        root = value.copy()
+        for link, key in masked:
+            self._copy_path(root, link, copies)[key] = REDACTED
+        return root
+
+    @staticmethod
+    def _copy_path(root: Any, link: Optional[tuple], copies: Dict[int, Any]) -> Any:
+        # Walk up to the closest container copied already, then copy the ones below it into their parent copies
+        path = []
+        while link is not None and id(link) not in copies:
+            path.append(link)
+            link = link[0]
+        container = root if link is None else copies[id(link)]
+        for link in reversed(path):
+            child = container[link[1]].copy()
+            container[link[1]] = child
+            copies[id(link)] = container = child
+        return container
+
+
+@dataclass
+class _MaskNode:
+    # What to mask in a value at one schema position
+    redact: Tuple[str, ...] = ()  # keys of the object whose values are masked
+    fields: Dict[str, "_MaskNode"] = field(default_factory=dict)  # properties with something to mask below
+    each: Optional["_MaskNode"] = None  # applies to every array item or map value
+    redact_each: bool = False  # every array item or map value is masked
+    map_keys: bool = False  # map keys are data: mask the entries whose key is sensitive
+    scan: bool = False  # not described by the schema: mask by key name, like SecretMasker
+
+
+_SCAN = _MaskNode(scan=True)
+# Labels and annotations are not part of CRD schemas, their keys are data; the other metadata fields are fixed
+_METADATA = _MaskNode(fields={"labels": _MaskNode(map_keys=True), "annotations": _MaskNode(map_keys=True)})
+
+
+class SchemaMask:
+    """
+    Mask the objects of one CRD version at the paths its openAPIV3Schema marks as sensitive.
+
+    The schema is analyzed once: a property is sensitive if its name is
+    (by the SecretMasker rules) or if it is declared `format: password`,
+    which also catches fields whose names the keyword heuristic misses.
+    The result is a tree of the paths leading to sensitive properties, so
+    masking an object only visits those paths instead of every key. The
+    API server prunes fields a structural schema does not declare; the
+    parts it cannot describe (labels, annotations, map keys and subtrees
+    with `x-kubernetes-preserve-unknown-fields`) are masked by key name.
+    Copy-on-write, like SecretMasker.
+    """
+
+    def __init__(self, schema: Optional[dict], masker: Optional[SecretMasker] = None):
+        """
+        Analyze a schema.
+
+        Args:
+            schema (dict, optional): The `openAPIV3Schema` of a CRD version; without one, the whole object is
+                masked by key name.
+            masker (SecretMasker, optional): Rules for key names, defaults to the process-wide masker.
+        """
+        self.masker = masker or get_secret_masker()
+        # Readable paths of the sensitive fields, e.g. "spec.users[*].password"
+        self.paths: List[str] = []
+        root = self._analyze(schema, "") or _MaskNode() if schema else _SCAN
+        if not root.scan:
+            root.fields["metadata"] = _METADATA
+        self._root = root
+
+    def _analyze(self, schema: dict, path: str) -> Optional[_MaskNode]:
+        if schema.get("x-kubernetes-preserve-unknown-fields") or schema.get("x-kubernetes-embedded-resource"):
+            self.paths.append(f"{path or '.'} (by key name)")
+            return _SCAN
+
+        node = _MaskNode()
+        redact = []
+        for name, subschema in (schema.get("properties") or {}).items():
+            subpath = f"{path}.{name}" if path else name
+            if self.masker.is_sensitive(name) or subschema.get("format") == "password":
+                redact.append(name)
+                self.paths.append(subpath)
+                continue
+            child = self._analyze(subschema, subpath)
+            if child is not None:
+                node.fields[name] = child
+        node.redact = tuple(redact)
+
+        items = schema.get("items")
+        additional = schema.get("additionalProperties")
+        if isinstance(items, dict):
+            element, suffix = items, "[*]"
+        elif isinstance(additional, dict):
+            element, suffix = additional, ".*"
+            node.map_keys = True
+        else:
+            element = None
+            if additional is True:
+                self.paths.append(f"{path or '.'} (by key name)")
+                return _SCAN
+        if element is not None:
+            if element.get("format") == "password":
+                node.redact_each = True
+                self.paths.append(path + suffix)
+            else:
+                node.each = self._analyze(element, path + suffix)
+
+        if node.redact or node.fields or node.each or node.redact_each or node.map_keys:
+            return node
+        return None
+
+    def mask(self, value: Any) -> Any:
+        """
+        Return the object with its sensitive fields masked.
+
+        Args:
+            value (Any): An object of this CRD version. It is not modified.
+
+        Returns:
+            Any: The masked object; `value` itself if nothing was masked.
+        """
+        return self._apply(self._root, value)
+
+    def _apply(self, node: _MaskNode, value: Any) -> Any:
+        # Recursion is bounded by the depth of the schema, not of the document
+        if node.scan:
+            return self.masker.mask(value)
+        result = value
+        if isinstance(value, dict):
+            for key in node.redact:
+                if key in value:
+                    if result is value:
+                        result = value.copy()
+                    result[key] = REDACTED
+            for key, child in node.fields.items():
+                item = value.get(key)
+                if item is not None:
+                    masked = self._apply(child, item)
+                    if masked is not item:
+                        if result is value:
+                            result = value.copy()
+                        result[key] = masked
+            if node.map_keys or node.each or node.redact_each:
+                is_sensitive = self.masker.is_sensitive
+                for key, item in value.items():
+                    if node.redact_each or (node.map_keys and is_sensitive(key)):
+                        masked = REDACTED
+                    elif node.each is not None and item is not None:
+                        masked = self._apply(node.each, item)
+                    else:
+                        continue
+                    if masked is not item:
+                        if result is value:
+                            result = value.copy()
+                        result[key] = masked
+        elif isinstance(value, list) and (node.each or node.redact_each):
+            for index, item in enumerate(value):
+                masked = REDACTED if node.redact_each else self._apply(node.each, item)
+                if masked is not item:
+                    if result is value:
+                        result = value.copy()
+                    result[index] = masked
+        return result
+
+
+def compile_schema_masks(crd: dict) -> Dict[str, SchemaMask]:
+    """
+    Analyze the schema of every served version of a CRD.
+
+    Args:
+        crd (dict): A CustomResourceDefinition as returned by the API server.
+
+    Returns:
+        Dict[str, SchemaMask]: The mask of every served version by version name.
+    """
+    masks = {}
+    for version in (crd.get("spec") or {}).get("versions") or []:
+        if version.get("served", True) and version.get("name"):
+            schema = (version.get("schema") or {}).get("openAPIV3Schema")
+            masks[version["name"]] = SchemaMask(schema)
+    return masks
+
+
+_default_masker: Optional[SecretMasker] = None
+
+
+def get_secret_masker() -> SecretMasker:
+    """
+    Return the process-wide SecretMasker, configured from the environment.
+    """
+    global _default_masker
+    if _default_masker is None:
+        _default_masker = SecretMasker()
+    return _default_masker
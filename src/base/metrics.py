@@ -0,0 +1,340 @@
+import asyncio
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from base.tracing import start_span
+
+try:
+    import prometheus_client
+    from prometheus_client import Gauge, Histogram
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+except ImportError:
+    prometheus_client = None
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED_ROUTE = "unmatched"
+
+# Latency buckets from 5ms to 30s, shared by request and upstream histograms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def is_metrics_enabled() -> bool:
+    """
+    Helper function to determine if Prometheus metrics are collected and served on /metrics.
+    """
+    return prometheus_client is not None and os.getenv("ENABLE_METRICS", "True").lower() in ("true", "1", "yes")
+
+
+def get_event_loop_lag_interval() -> float:
+    """
+    Helper function returning how often the event loop lag is sampled, in seconds.
+    """
+    return float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "1"))
+
+
+if prometheus_client is not None:
+    REQUEST_DURATION = Histogram(
+        "http_request_duration_seconds",
+        "Time spent handling HTTP requests, by route template.",
+        ["method", "route", "status"],
+        buckets=LATENCY_BUCKETS,
+    )
+    REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being handled.")
+    UPSTREAM_DURATION = Histogram(
+        "upstream_request_duration_seconds",
+        "Time spent in calls to upstream services, by API group, verb and resource.",
+        ["upstream", "group", "verb", "resource", "status"],
+        buckets=LATENCY_BUCKETS,
+    )
+    UPSTREAM_IN_FLIGHT = Gauge("upstream_requests_in_flight", "Calls to upstream services currently in progress.", ["upstream"])
+    EVENT_LOOP_LAG = Gauge("event_loop_lag_seconds", "How late the last event loop lag probe woke up.")
+    EVENT_LOOP_LAG_HISTOGRAM = Histogram(
+        "event_loop_lag_probe_seconds",
+        "Distribution of event loop lag probe delays.",
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+    )
+
+
+# ---------------------------------------------------------------------- #
+# Upstream calls
+# ---------------------------------------------------------------------- #
+@contextmanager
+def observe_upstream(upstream: str, verb: str, group: str = "", resource: str = "") -> Iterator[Dict[str, str]]:
+    """
+    Time and trace a call to an upstream service.
+
+    Usable as a context manager around a sync or async call, or as a
+    decorator of a sync function. The call runs in a client span and is
+    recorded in the upstream histogram. The yielded dict may be given a
+    "status" (e.g. the HTTP status code); it defaults to "ok", or "error"
+    if the block raises.
+
+    Args:
+        upstream (str): The service, e.g. "kubernetes", "keycloak", "s3".
+        verb (str): The operation, e.g. "list", "get", "ListBuckets".
+        group (str): The API group, if the upstream has them.
+        resource (str): The resource type, if the upstream has them.
+    """
+    labels = {"status": "ok"}
+    name = " ".join(part for part in (upstream, verb, group, resource) if part)
+    attributes = {"upstream.name": upstream, "upstream.verb": verb, "upstream.group": group, "upstream.resource": resource}
+    with start_span(name, client=True, attributes=attributes) as span:
+        in_flight = UPSTREAM_IN_FLIGHT.labels(upstream) if is_metrics_enabled() else None
+        if in_flight is not None:
+            in_flight.inc()
+        started = time.perf_counter()
+        try:
+            yield labels
+        except BaseException:
+            if labels["status"] == "ok":
+                labels["status"] = "error"
+            raise
+        finally:
+            if in_flight is not None:
+                in_flight.dec()
+                record_upstream(upstream, verb, group, resource, labels["status"], time.perf_counter() - started)
+            if span is not None:
+                span.set_attribute("upstream.status", labels["status"])
+
+
+def record_upstream(upstream: str, verb: str, group: str, resource: str, status: str, seconds: float) -> None:
+    """
+    Record one upstream call timed by the caller, e.g. the time until a streaming response started.
+    """
+    if is_metrics_enabled():
+        UPSTREAM_DURATION.labels(upstream, group, verb, resource, status).observe(seconds)
+
+
+# /api/v1/namespaces/{ns}/pods/{name}/log, /apis/apps/v1/deployments, ...
+_K8S_PATH = re.compile(r"^/(?:api/(?P<core>v1)|apis/(?P<group>[^/]+)/[^/]+)(?:/namespaces/[^/]+(?=/))?(?:/(?P<rest>.*))?$")
+
+
+def kubernetes_request_labels(method: str, path: str, params: Dict[str, object]) -> Tuple[str, str, str]:
+    """
+    Derive the API group, verb and resource of a Kubernetes API request, keeping label cardinality bounded.
+
+    Returns:
+        Tuple[str, str, str]: e.g. ("apps", "list", "deployments") or ("core", "get", "pods/log").
+    """
+    match = _K8S_PATH.match(path)
+    if not match:
+        # Discovery and other non-resource paths
+        return "", method.lower(), path.strip("/").split("/")[0]
+    group = "core" if match.group("core") else match.group("group")
+    # resource[/name[/subresource]]
+    parts = [part for part in (match.group("rest") or "").split("/") if part]
+    if not parts:
+        # Group version discovery, e.g. /apis/apps/v1
+        return group, "discovery", ""
+    resource = parts[0]
+    if len(parts) > 2:
+        resource = f"{parts[0]}/{parts[2]}"
+    method = method.upper()
+    if method == "GET":
+        verb = "watch" if params.get("watch") else ("get" if len(parts) > 1 else "list")
+    elif method == "DELETE":
+        verb = "delete" if len(parts) > 1 else "deletecollection"
+    else:
+        verb = {"POST": "create", "PUT": "update", "PATCH": "patch"}.get(method, method.lower())
+    return group, verb, resource
+
+
+# ---------------------------------------------------------------------- #
+# Requests
+# ---------------------------------------------------------------------- #
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency by route template and status, and requests in flight.
+
+    The route is the matched path template (e.g. `/k8s/{namespace}/pods`), so
+    label cardinality does not grow with namespaces or names. Requests for
+    /metrics itself are not recorded.
+    """
+
+    def __init__(self, app: ASGIApp, excluded_paths: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.excluded_paths = excluded_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not is_metrics_enabled() or scope["path"].endswith(self.excluded_paths):
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # Routing stores the matched route in the scope, including routes of mounted apps
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            REQUEST_DURATION.labels(scope["method"], route, status).observe(time.perf_counter() - started)
+
+
+# ---------------------------------------------------------------------- #
+# Caches
+# ---------------------------------------------------------------------- #
+def _cache_sources() -> List[Tuple[str, Callable[[], dict]]]:
+    # Imported here: the caches import this module for their upstream metrics
+    from base.crd_index import get_crd_index
+    from base.discovery import get_discovery_cache
+    from base.informer import get_informer_cache_stats
+    from base.jwks import get_jwks_cache
+    from base.object_cache import get_crd_item_cache
+    from base.token_cache import get_token_cache
+
+    return [
+        ("crd_index", lambda: get_crd_index().metrics),
+        ("crd_item", lambda: get_crd_item_cache().metrics),
+        ("discovery", lambda: get_discovery_cache().metrics),
+        ("informer", get_informer_cache_stats),
+        ("jwks", lambda: get_jwks_cache().metrics),
+        ("token", lambda: get_token_cache().metrics),
+    ]
+
+
+class CacheCollector:
+    """
+    Export the hit and miss counters the in-process caches keep, labeled by cache.
+
+    The hit ratio is `rate(cache_hits_total[5m]) / (rate(cache_hits_total[5m]) + rate(cache_misses_total[5m]))`.
+    """
+
+    def describe(self):
+        # Registering a collector without `describe` would collect (and import the caches) right away
+        yield CounterMetricFamily("cache_hits", "Lookups answered from an in-process cache.", labels=["cache"])
+        yield CounterMetricFamily("cache_misses", "Lookups an in-process cache could not answer.", labels=["cache"])
+
+    def collect(self):
+        hits = CounterMetricFamily("cache_hits", "Lookups answered from an in-process cache.", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Lookups an in-process cache could not answer.", labels=["cache"])
+        for name, stats in _cache_sources():
+            try:
+                values = stats()
+            except Exception as e:
+                logger.debug(f"Cache statistics for {name} unavailable: {e}")
+                continue
+            hits.add_metric([name], values.get("hits", 0))
+            misses.add_metric([name], values.get("misses", 0))
+        yield hits
+        yield misses
+
+
+def _pool_stats() -> List[dict]:
+    # Imported here: the clients import this module for their upstream metrics
+    from base.clients import get_client_registry
+    from base.k8s_client import get_async_pool_stats
+
+    return get_async_pool_stats() + get_client_registry().pool_stats()
+
+
+class ConnectionPoolCollector:
+    """
+    Export the connection usage of the Kubernetes API client pools, labeled by client.
+
+    A pool is saturated when `k8s_client_pool_connections{state="active"}`
+    reaches `k8s_client_pool_max_connections`; requests then wait for a
+    connection (`k8s_client_pool_waiting_requests`, async client) or open
+    connections that are discarded afterwards (sync clients).
+    """
+
+    def _families(self):
+        return (
+            GaugeMetricFamily("k8s_client_pool_connections", "Connections of a Kubernetes API client pool, by state.", labels=["client", "state"]),
+            GaugeMetricFamily("k8s_client_pool_max_connections", "Connection limit of a Kubernetes API client pool.", labels=["client"]),
+            GaugeMetricFamily("k8s_client_pool_waiting_requests", "Requests waiting for a pooled connection.", labels=["client"]),
+        )
+
+    def describe(self):
+        yield from self._families()
+
+    def collect(self):
+        connections, limit, waiting = self._families()
+        totals: Dict[str, Dict[str, int]] = {}
+        try:
+            stats = _pool_stats()
+        except Exception as e:
+            logger.debug(f"Connection pool statistics unavailable: {e}")
+            stats = []
+        for pool in stats:
+            total = totals.setdefault(pool["client"], {"active": 0, "idle": 0, "max": 0, "waiting": 0})
+            for key in total:
+                total[key] += pool[key]
+        for name, total in totals.items():
+            connections.add_metric([name, "active"], total["active"])
+            connections.add_metric([name, "idle"], total["idle"])
+            limit.add_metric([name], total["max"])
+            waiting.add_metric([name], total["waiting"])
+        yield connections
+        yield limit
+        yield waiting
+
+
+if prometheus_client is not None:
+    prometheus_client.REGISTRY.register(CacheCollector())
+    prometheus_client.REGISTRY.register(ConnectionPoolCollector())
+
+
+# ---------------------------------------------------------------------- #
+# Event loop lag
+# ---------------------------------------------------------------------- #
+_lag_task: Optional[asyncio.Task] = None
+
+
+async def _monitor_event_loop_lag(interval: float) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - started - interval)
+        EVENT_LOOP_LAG.set(lag)
+        EVENT_LOOP_LAG_HISTOGRAM.observe(lag)
+
+
+def start_event_loop_monitor() -> None:
+    """
+    Start sampling the event loop lag on the running loop, if metrics are enabled.
+    """
+    global _lag_task
+    if not is_metrics_enabled() or (_lag_task is not None and not _lag_task.done()):
+        return
+    _lag_task = asyncio.get_running_loop().create_task(_monitor_event_loop_lag(get_event_loop_lag_interval()), name="event-loop-lag")
+
+
+async def stop_event_loop_monitor() -> None:
+    """
+    Stop sampling the event loop lag.
+    """
+    global _lag_task
+    task, _lag_task = _lag_task, None
+    if task is None or task.done():
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def metrics_response() -> Response:
+    """
+    Render all metrics in the Prometheus text format.
+    """
+    if not is_metrics_enabled():
+        return Response(status_code=404, content="Metrics are disabled.")
+    return Response(content=prometheus_client.generate_latest(), media_type=prometheus_client.CONTENT_TYPE_LATEST)
@@ -0,0 +1,103 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+def get_crd_item_cache_size() -> int:
+    """
+    Helper function returning how many masked custom objects are cached by resourceVersion; 0 disables the cache.
+    """
+    return max(0, int(os.getenv("CRD_ITEM_CACHE_SIZE", "512")))
+
+
+class ResourceVersionCache:
+    """
+    Bounded LRU cache of processed (e.g. masked) Kubernetes objects, keyed by object and resourceVersion.
+
+    The API server changes an object's resourceVersion on every write, so a
+    cached result is valid as long as the resourceVersion matches; nothing
+    expires by time. A caller looks up the current resourceVersion (cheaply,
+    e.g. with a metadata-only read) and reuses the stored result when it
+    matches. Safe to use from the thread pool.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_size (int, optional): Maximum number of cached objects (CRD_ITEM_CACHE_SIZE).
+        """
+        self.max_size = get_crd_item_cache_size() if max_size is None else max_size
+        self.metrics: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+        self._entries: "OrderedDict[Hashable, Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def peek(self, key: Hashable) -> Optional[str]:
+        """
+        Return the resourceVersion stored for an object, or None (counted as a miss) if it is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.metrics["misses"] += 1
+                return None
+            return entry[0]
+
+    def get(self, key: Hashable, resource_version: Optional[str]) -> Optional[Any]:
+        """
+        Return the cached result for an object at this resourceVersion, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not resource_version or entry[0] != resource_version:
+                self.metrics["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.metrics["hits"] += 1
+            return entry[1]
+
+    def put(self, key: Hashable, resource_version: Optional[str], value: Any) -> None:
+        """
+        Cache the result for an object at a resourceVersion. Callers must not modify `value` afterwards.
+        """
+        if not self.enabled or not resource_version:
+            return
+        with self._lock:
+            self._entries[key] = (resource_version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.metrics["evictions"] += 1
+
+    def discard(self, key: Hashable) -> None:
+        """
+        Drop the cached result of an object, e.g. after it was deleted.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the cache counters and the number of cached objects.
+        """
+        with self._lock:
+            return {**self.metrics, "size": len(self._entries)}
+
+
+_crd_item_cache: Optional[ResourceVersionCache] = None
+
+
+def get_crd_item_cache() -> ResourceVersionCache:
+    """
+    Return the process-wide cache of masked custom objects.
+    """
+    global _crd_item_cache
+    if _crd_item_cache is None:
+        _crd_item_cache = ResourceVersionCache()
+    return _crd_item_cache
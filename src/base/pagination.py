@@ -0,0 +1,128 @@
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Union
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+from base.responses import dumps_json
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CONTINUE_TOKEN_HEADER = "X-Continue-Token"
+REMAINING_ITEM_COUNT_HEADER = "X-Remaining-Item-Count"
+
+
+def get_stream_page_size() -> int:
+    """
+    Helper function returning the `limit` used for each API server request while streaming a list.
+    """
+    return max(1, int(os.getenv("LIST_STREAM_PAGE_SIZE", "500")))
+
+
+@dataclass
+class ListPage:
+    """
+    One page of a list call: the converted items plus the API server's continue token.
+    """
+    items: List[Any] = field(default_factory=list)
+    continue_token: Optional[str] = None
+    remaining_item_count: Optional[int] = None
+
+    @classmethod
+    def from_list(cls, result: Any, items: List[Any]) -> "ListPage":
+        """
+        Build a page from a kubernetes list model (or raw list dict) and its converted items.
+        """
+        if isinstance(result, dict):
+            metadata = result.get("metadata") or {}
+            return cls(items, metadata.get("continue") or None, metadata.get("remainingItemCount"))
+        metadata = result.metadata
+        if metadata is None:
+            return cls(items)
+        return cls(items, metadata._continue or None, metadata.remaining_item_count)
+
+    def apply_headers(self, response: Response) -> None:
+        """
+        Expose the continue token (and remaining item count) as response headers.
+        """
+        if self.continue_token:
+            response.headers[CONTINUE_TOKEN_HEADER] = self.continue_token
+        if self.remaining_item_count is not None:
+            response.headers[REMAINING_ITEM_COUNT_HEADER] = str(self.remaining_item_count)
+
+
+def wants_ndjson(request: Request) -> bool:
+    """
+    Return True if the client asked for a newline-delimited JSON stream.
+    """
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def iter_pages(
+    list_func: Callable[..., Awaitable[Any]],
+    limit: Optional[int] = None,
+    continue_token: Optional[str] = None,
+    **kwargs: Any,
+) -> AsyncIterator[Any]:
+    """
+    Call an async list function repeatedly, following continue tokens until the list is exhausted.
+
+    Args:
+        list_func (Callable): An async list function accepting `limit` and `_continue`.
+        limit (int, optional): Page size requested from the API server (LIST_STREAM_PAGE_SIZE).
+        continue_token (str, optional): Resume a list from a previous continue token.
+        **kwargs: Passed to every call of `list_func`.
+
+    Yields:
+        Any: Each list result as returned by `list_func`.
+    """
+    limit = limit or get_stream_page_size()
+    while True:
+        result = await list_func(limit=limit, _continue=continue_token, **kwargs)
+        yield result
+        continue_token = ListPage.from_list(result, []).continue_token
+        if not continue_token:
+            break
+
+
+def _ndjson_line(item: Any) -> bytes:
+    return dumps_json(item) + b"\n"
+
+
+async def ndjson_response(items: Union[AsyncIterator[Any], Iterator[Any]]) -> StreamingResponse:
+    """
+    Stream items as newline-delimited JSON, writing each item as soon as it is produced.
+
+    The first item is pulled before the response starts, so errors on the
+    first API server request still become regular HTTP errors. An error later
+    in the stream ends it with a final `{"error": ...}` line.
+
+    Args:
+        items (AsyncIterator | Iterator): The items to stream. Synchronous
+            iterators run in the threadpool.
+
+    Returns:
+        StreamingResponse: The NDJSON response.
+    """
+    if not hasattr(items, "__anext__"):
+        items = iterate_in_threadpool(items)
+
+    try:
+        first = await items.__anext__()
+    except StopAsyncIteration:
+        return StreamingResponse(iter(()), media_type=NDJSON_MEDIA_TYPE)
+
+    async def body() -> AsyncIterator[bytes]:
+        yield _ndjson_line(first)
+        try:
+            async for item in items:
+                yield _ndjson_line(item)
+        except HTTPException as e:
+            logger.warning(f"List stream interrupted: {e.detail}")
+            yield _ndjson_line({"error": e.detail})
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
+
@@ -0,0 +1,158 @@
+import logging
+from contextvars import ContextVar
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Mapping, Optional
+
+import orjson
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+# The serialization format negotiated for the current request
+_response_format: ContextVar[str] = ContextVar("response_format", default=JSON_MEDIA_TYPE)
+
+
+def _to_builtin(obj: Any) -> Any:
+    """
+    Convert the objects handlers commonly return into JSON-compatible builtins.
+    """
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if hasattr(obj, "to_dict"):
+        # Generated kubernetes models
+        return obj.to_dict()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def _msgpack_default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    return _to_builtin(obj)
+
+
+def dumps_json(content: Any) -> bytes:
+    """
+    Serialize content to JSON with orjson; datetimes, enums and dataclasses are handled natively.
+    """
+    return orjson.dumps(content, default=_to_builtin, option=orjson.OPT_NON_STR_KEYS)
+
+
+def negotiate_format(accept: str) -> str:
+    """
+    Pick the response format for an Accept header.
+
+    MessagePack is only used when the client lists it explicitly with a quality
+    at least as high as JSON's; wildcards and everything else get JSON.
+    """
+    if not accept or "msgpack" not in accept:
+        return JSON_MEDIA_TYPE
+    if msgpack is None:
+        logger.debug("MessagePack was requested but the 'msgpack' package is not installed; responding with JSON.")
+        return JSON_MEDIA_TYPE
+
+    msgpack_quality, json_quality = 0.0, 0.0
+    for media_range in accept.split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_quality = max(msgpack_quality, quality)
+        elif media_type == JSON_MEDIA_TYPE:
+            json_quality = max(json_quality, quality)
+    return MSGPACK_MEDIA_TYPE if msgpack_quality > 0 and msgpack_quality >= json_quality else JSON_MEDIA_TYPE
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    The default response class: orjson-encoded JSON, or MessagePack when the client negotiated it.
+
+    Handlers that build large bodies can return this response directly to skip
+    FastAPI's `jsonable_encoder` pass; kubernetes models, pydantic models and
+    datetimes are serialized without converting them first.
+    """
+
+    def __init__(
+        self,
+        content: Any = None,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+    ):
+        if media_type is None:
+            media_type = _response_format.get()
+        super().__init__(content, status_code, headers, media_type, background)
+        self.headers.setdefault("vary", "Accept")
+
+    def render(self, content: Any) -> bytes:
+        if self.media_type == MSGPACK_MEDIA_TYPE:
+            return msgpack.packb(content, default=_msgpack_default, use_bin_type=True, datetime=False)
+        return dumps_json(content)
+
+
+class ResponseFormatMiddleware:
+    """
+    Pure ASGI middleware recording the negotiated response format for the request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept":
+                accept = value.decode("latin-1")
+                break
+
+        token = _response_format.set(negotiate_format(accept))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _response_format.reset(token)
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    A StreamingResponse that closes its body iterator when the response ends for any reason.
+
+    When a client disconnects while the body iterator is suspended between
+    chunks, Starlette stops iterating but leaves the generator open until it
+    is garbage collected. Closing it right away runs its cleanup, such as
+    closing an upstream watch or log request.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            aclose = getattr(self.body_iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
@@ -1,6 +1,11 @@
 import os
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse, HTMLResponse
+from base.bootstrap import get_bootstrap
+from base.crd_index import get_crd_index
+from base.jwks import get_jwks_cache
+from base.metrics import metrics_response
+from base.token_cache import get_token_cache
 
 router = APIRouter()
 
@@ -14,20 +19,31 @@ async def health_check():
 # Readiness Check
 @router.get("/readiness", status_code=200, tags=["Health"])
 async def readiness_check():
-    try:
-        # Simulated checks
-        database_connected = True  # Replace with actual database connection check
-        external_service_available = True  # Replace with external service check
+    # Not ready until the startup work (API key, informers, discovery, CRD index) has finished
+    status = get_bootstrap().status()
+    if status["ready"]:
+        return JSONResponse(content={"status": "ready", **status}, status_code=200)
+    return JSONResponse(content={"status": "not ready", **status}, status_code=503)
 
-        if database_connected and external_service_available:
-            return JSONResponse(content={"status": "ready"}, status_code=200)
-        else:
-            return JSONResponse(content={"status": "not ready"}, status_code=503)
+# Prometheus metrics
+@router.get("/metrics", tags=["Health"], include_in_schema=False)
+async def metrics():
+    return metrics_response()
 
-    except Exception as e:
-        return JSONResponse(
-            content={"status": "error", "detail": str(e)}, status_code=503
-        )
+# Token validation key cache statistics
+@router.get("/health/jwks", status_code=200, tags=["Health"])
+async def jwks_cache_stats():
+    return JSONResponse(content=get_jwks_cache().stats(), status_code=200)
+
+# Verified token cache statistics
+@router.get("/health/token-cache", status_code=200, tags=["Health"])
+async def token_cache_stats():
+    return JSONResponse(content=get_token_cache().stats(), status_code=200)
+
+# CRD index statistics
+@router.get("/health/crd-index", status_code=200, tags=["Health"])
+async def crd_index_stats():
+    return JSONResponse(content=get_crd_index().stats(), status_code=200)
 
 @router.get("/", response_class=HTMLResponse)
 async def root():
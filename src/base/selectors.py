@@ -0,0 +1,345 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from fastapi import HTTPException, Query
+
+# Label keys are an optional DNS subdomain prefix and a name, e.g. "app.kubernetes.io/name"
+_LABEL_NAME = r"[A-Za-z0-9]([-A-Za-z0-9_.]{0,61}[A-Za-z0-9])?"
+_LABEL_PREFIX = r"[a-z0-9]([-a-z0-9]*[a-z0-9])?(\.[a-z0-9]([-a-z0-9]*[a-z0-9])?)*"
+_LABEL_KEY_RE = re.compile(rf"^({_LABEL_PREFIX}/)?{_LABEL_NAME}$")
+_LABEL_VALUE_RE = re.compile(rf"^({_LABEL_NAME})?$")
+_FIELD_PATH_RE = re.compile(r"^[A-Za-z0-9_]+(\.[A-Za-z0-9_]+)*$")
+
+_SET_RE = re.compile(r"^(?P<key>[^\s!=(),]+)\s+(?P<op>in|notin)\s*\((?P<values>[^()]*)\)$")
+_EQUALITY_RE = re.compile(r"^(?P<key>[^\s!=(),]+)\s*(?P<op>==|!=|=)\s*(?P<value>[^\s!=(),]*)$")
+_NOT_EXISTS_RE = re.compile(r"^!\s*(?P<key>[^\s!=(),]+)$")
+_EXISTS_RE = re.compile(r"^(?P<key>[^\s!=(),]+)$")
+
+# Fields every resource supports in a fieldSelector
+COMMON_SELECTABLE_FIELDS = frozenset({"metadata.name", "metadata.namespace"})
+
+# Additional fields the API server can select on, per resource
+SELECTABLE_FIELDS: Dict[str, FrozenSet[str]] = {
+    "events": COMMON_SELECTABLE_FIELDS | {
+        "involvedObject.kind", "involvedObject.namespace", "involvedObject.name", "involvedObject.uid",
+        "involvedObject.apiVersion", "involvedObject.resourceVersion", "involvedObject.fieldPath",
+        "reason", "reportingComponent", "source", "type",
+    },
+    "ingresses": COMMON_SELECTABLE_FIELDS,
+    "namespaces": COMMON_SELECTABLE_FIELDS | {"status.phase"},
+    "nodes": COMMON_SELECTABLE_FIELDS | {"spec.unschedulable"},
+    "persistentvolumeclaims": COMMON_SELECTABLE_FIELDS,
+    "persistentvolumes": COMMON_SELECTABLE_FIELDS,
+    "pods": COMMON_SELECTABLE_FIELDS | {
+        "spec.nodeName", "spec.restartPolicy", "spec.schedulerName", "spec.serviceAccountName",
+        "spec.hostNetwork", "status.phase", "status.podIP", "status.podIPs", "status.nominatedNodeName",
+    },
+    "secrets": COMMON_SELECTABLE_FIELDS | {"type"},
+}
+
+
+@dataclass(frozen=True)
+class Requirement:
+    """
+    A single selector requirement, e.g. `app in (web,api)` or `metadata.name=foo`.
+    """
+    key: str
+    operator: str
+    values: Tuple[str, ...] = ()
+
+    def __str__(self) -> str:
+        if self.operator == "exists":
+            return self.key
+        if self.operator == "!exists":
+            return f"!{self.key}"
+        if self.operator in ("in", "notin"):
+            return f"{self.key} {self.operator} ({','.join(self.values)})"
+        return f"{self.key}{self.operator}{self.values[0]}"
+
+
+def _split_requirements(selector: str) -> List[str]:
+    # Commas separate requirements except inside the value list of `in`/`notin`
+    parts, depth, current = [], 0, []
+    for char in selector:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth < 0:
+                raise ValueError("unbalanced parentheses")
+        if char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    if depth != 0:
+        raise ValueError("unbalanced parentheses")
+    parts.append("".join(current).strip())
+    if any(not part for part in parts):
+        raise ValueError("empty requirement")
+    return parts
+
+
+def _validate_label_key(key: str) -> str:
+    if len(key) > 317 or not _LABEL_KEY_RE.match(key):
+        raise ValueError(f"invalid label key '{key}'")
+    return key
+
+
+def _validate_label_value(value: str) -> str:
+    if not _LABEL_VALUE_RE.match(value):
+        raise ValueError(f"invalid label value '{value}'")
+    return value
+
+
+def _resolve_path(obj: Any, path: str) -> Any:
+    # Works for raw dicts (camelCase keys) and kubernetes models (snake_case attributes)
+    for part in path.split("."):
+        if obj is None:
+            return None
+        if isinstance(obj, dict):
+            obj = obj.get(part)
+        else:
+            obj = getattr(obj, re.sub(r"(?<!^)(?=[A-Z])", "_", part).lower(), None)
+    return obj
+
+
+def _field_string(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class LabelSelector:
+    """
+    A parsed and validated label selector.
+
+    Supports the full selector grammar: `key=value`, `key==value`,
+    `key!=value`, `key in (a,b)`, `key notin (a,b)`, `key` and `!key`. The
+    canonical string is sent to the API server; `matches` evaluates the same
+    requirements in-process.
+    """
+
+    def __init__(self, selector: str):
+        """
+        Parse the selector.
+
+        Raises:
+            ValueError: If the selector is not valid.
+        """
+        self.requirements: List[Requirement] = [self._parse(part) for part in _split_requirements(selector)]
+        self._matchers = [self._compile(requirement) for requirement in self.requirements]
+
+    @staticmethod
+    def _parse(part: str) -> Requirement:
+        match = _SET_RE.match(part)
+        if match:
+            values = tuple(_validate_label_value(value.strip()) for value in match["values"].split(","))
+            return Requirement(_validate_label_key(match["key"]), match["op"], values)
+        match = _EQUALITY_RE.match(part)
+        if match:
+            operator = "!=" if match["op"] == "!=" else "="
+            return Requirement(_validate_label_key(match["key"]), operator, (_validate_label_value(match["value"]),))
+        match = _NOT_EXISTS_RE.match(part)
+        if match:
+            return Requirement(_validate_label_key(match["key"]), "!exists")
+        match = _EXISTS_RE.match(part)
+        if match:
+            return Requirement(_validate_label_key(match["key"]), "exists")
+        raise ValueError(f"invalid requirement '{part}'")
+
+    @staticmethod
+    def _compile(requirement: Requirement) -> Callable[[Dict[str, str]], bool]:
+        key, values = requirement.key, requirement.values
+        if requirement.operator == "=":
+            return lambda labels: labels.get(key) == values[0]
+        if requirement.operator == "!=":
+            return lambda labels: labels.get(key) != values[0]
+        if requirement.operator == "in":
+            allowed = frozenset(values)
+            return lambda labels: key in labels and labels[key] in allowed
+        if requirement.operator == "notin":
+            denied = frozenset(values)
+            return lambda labels: labels.get(key) not in denied
+        if requirement.operator == "exists":
+            return lambda labels: key in labels
+        return lambda labels: key not in labels
+
+    def matches(self, labels: Optional[Dict[str, str]]) -> bool:
+        """
+        Return True if the labels satisfy every requirement.
+        """
+        labels = labels or {}
+        return all(matcher(labels) for matcher in self._matchers)
+
+    def __str__(self) -> str:
+        return ",".join(str(requirement) for requirement in self.requirements)
+
+
+class FieldSelector:
+    """
+    A parsed and validated field selector (`path=value`, `path==value`, `path!=value`).
+    """
+
+    def __init__(self, selector: str = "", requirements: Optional[List[Requirement]] = None):
+        """
+        Parse the selector, or wrap already parsed requirements.
+
+        Raises:
+            ValueError: If the selector is not valid.
+        """
+        if requirements is None:
+            requirements = [self._parse(part) for part in _split_requirements(selector)]
+        self.requirements = requirements
+
+    @staticmethod
+    def _parse(part: str) -> Requirement:
+        match = _EQUALITY_RE.match(part)
+        if not match or not _FIELD_PATH_RE.match(match["key"]):
+            raise ValueError(f"invalid requirement '{part}'")
+        operator = "!=" if match["op"] == "!=" else "="
+        return Requirement(match["key"], operator, (match["value"],))
+
+    def split(self, supported: FrozenSet[str]) -> Tuple[Optional["FieldSelector"], Optional["FieldSelector"]]:
+        """
+        Split into the requirements the API server can evaluate and the ones that must be matched in-process.
+        """
+        pushed = [requirement for requirement in self.requirements if requirement.key in supported]
+        residual = [requirement for requirement in self.requirements if requirement.key not in supported]
+        return (FieldSelector(requirements=pushed) if pushed else None, FieldSelector(requirements=residual) if residual else None)
+
+    def matches(self, obj: Any) -> bool:
+        """
+        Return True if the object (a raw dict or a kubernetes model) satisfies every requirement.
+        """
+        for requirement in self.requirements:
+            equal = _field_string(_resolve_path(obj, requirement.key)) == requirement.values[0]
+            if equal != (requirement.operator == "="):
+                return False
+        return True
+
+    def filter(self, items: List[Any]) -> List[Any]:
+        """
+        Return the items that satisfy every requirement.
+        """
+        return [item for item in items if self.matches(item)]
+
+    def __str__(self) -> str:
+        return ",".join(str(requirement) for requirement in self.requirements)
+
+
+def filter_items(items: List[Any], residual: Optional[FieldSelector]) -> List[Any]:
+    """
+    Apply the in-process part of a field selector, if there is one.
+    """
+    return residual.filter(items) if residual else items
+
+
+@dataclass
+class Selectors:
+    """
+    Label and field selectors of a list request.
+
+    Label selectors are always evaluated by the API server. Field selectors
+    are split per resource: supported fields are pushed down, the rest is
+    matched in-process on each returned page.
+    """
+    label: Optional[LabelSelector] = None
+    field: Optional[FieldSelector] = None
+
+    def with_field(self, path: str, value: str) -> "Selectors":
+        """
+        Return a copy with an additional `path=value` field requirement.
+        """
+        requirements = list(self.field.requirements) if self.field else []
+        requirements.append(Requirement(path, "=", (value,)))
+        return Selectors(self.label, FieldSelector(requirements=requirements))
+
+    def with_label_selector(self, selector: str) -> "Selectors":
+        """
+        Return a copy whose label selector also requires the given selector.
+
+        Raises:
+            ValueError: If the selector is not valid.
+        """
+        combined = f"{self.label},{selector}" if self.label else selector
+        return Selectors(LabelSelector(combined), self.field)
+
+    def for_resource(self, resource: str, supported: Optional[FrozenSet[str]] = None) -> Tuple[Dict[str, str], Optional[FieldSelector]]:
+        """
+        Resolve the selectors for one resource.
+
+        Args:
+            resource (str): The plural resource name, used to look up selectable fields.
+            supported (FrozenSet[str], optional): Overrides the selectable fields of the resource.
+
+        Returns:
+            Tuple[Dict[str, str], Optional[FieldSelector]]: The `label_selector`
+            and `field_selector` keyword arguments for the list call, and the
+            field requirements to match in-process (None if there are none).
+        """
+        kwargs = {}
+        if self.label:
+            kwargs["label_selector"] = str(self.label)
+        residual = None
+        if self.field:
+            pushed, residual = self.field.split(supported or SELECTABLE_FIELDS.get(resource, COMMON_SELECTABLE_FIELDS))
+            if pushed:
+                kwargs["field_selector"] = str(pushed)
+        return kwargs, residual
+
+
+def label_selector_from_spec(selector: Optional[Dict[str, Any]]) -> str:
+    """
+    Convert a LabelSelector object of a workload spec (e.g. a Deployment's `spec.selector`) to selector syntax.
+
+    Args:
+        selector (dict, optional): The raw selector with `matchLabels` and `matchExpressions`.
+
+    Returns:
+        str: The equivalent label selector string; empty if it selects everything.
+    """
+    selector = selector or {}
+    requirements = [f"{key}={value}" for key, value in (selector.get("matchLabels") or {}).items()]
+    for expression in selector.get("matchExpressions") or []:
+        key, operator, values = expression.get("key"), expression.get("operator"), expression.get("values") or []
+        if operator == "In":
+            requirements.append(f"{key} in ({','.join(values)})")
+        elif operator == "NotIn":
+            requirements.append(f"{key} notin ({','.join(values)})")
+        elif operator == "Exists":
+            requirements.append(key)
+        elif operator == "DoesNotExist":
+            requirements.append(f"!{key}")
+    return ",".join(requirements)
+
+
+def parse_selectors(label_selector: Optional[str] = None, field_selector: Optional[str] = None) -> Selectors:
+    """
+    Parse and validate label and field selectors.
+
+    Raises:
+        HTTPException: 400 if a selector is not valid.
+    """
+    try:
+        label = LabelSelector(label_selector) if label_selector and label_selector.strip() else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid label selector: {e}")
+    try:
+        field_ = FieldSelector(field_selector) if field_selector and field_selector.strip() else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid field selector: {e}")
+    return Selectors(label, field_)
+
+
+def selector_query(
+    label_selector: Optional[str] = Query(None, description="Kubernetes label selector, e.g. 'app=web,tier in (frontend,backend)'"),
+    field_selector: Optional[str] = Query(None, description="Kubernetes field selector, e.g. 'metadata.name=foo,status.phase!=Running'"),
+) -> Selectors:
+    """
+    FastAPI dependency parsing the `label_selector` and `field_selector` query parameters.
+    """
+    return parse_selectors(label_selector, field_selector)
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+def get_token_cache_size() -> int:
+    """
+    Helper function returning how many verified tokens are cached; 0 disables the cache.
+    """
+    return max(0, int(os.getenv("TOKEN_CACHE_SIZE", "1024")))
+
+
+def get_token_cache_clock_skew() -> float:
+    """
+    Helper function returning how long before its `exp` a cached token is verified again, in seconds.
+    """
+    return max(0.0, float(os.getenv("TOKEN_CACHE_CLOCK_SKEW", "30")))
+
+
+def get_token_cache_max_ttl() -> float:
+    """
+    Helper function returning the longest time a token is served from the cache, in seconds.
+    """
+    return max(0.0, float(os.getenv("TOKEN_CACHE_MAX_TTL", "300")))
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of the claims of verified tokens.
+
+    Entries are keyed by the SHA-256 digest of the token, so raw tokens are
+    never held in memory by the cache. An entry is dropped `clock_skew`
+    seconds before the token's `exp` (and at most `max_ttl` seconds after it
+    was cached), after which the token goes through full verification again
+    and an expired token is rejected as before. Tokens without `exp` are not
+    cached. Only authentication is cached: callers still run their
+    authorization checks against the returned claims on every request.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, clock_skew: Optional[float] = None, max_ttl: Optional[float] = None):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_size (int, optional): Maximum number of cached tokens (TOKEN_CACHE_SIZE).
+            clock_skew (float, optional): Margin before `exp` (TOKEN_CACHE_CLOCK_SKEW).
+            max_ttl (float, optional): Upper bound for the lifetime of an entry (TOKEN_CACHE_MAX_TTL).
+        """
+        self.max_size = get_token_cache_size() if max_size is None else max_size
+        self.clock_skew = get_token_cache_clock_skew() if clock_skew is None else clock_skew
+        self.max_ttl = get_token_cache_max_ttl() if max_ttl is None else max_ttl
+        self.metrics: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """
+        Return the cached claims of a token, or None if it has to be verified.
+        """
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.metrics["misses"] += 1
+            return None
+        expires_at, claims = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            self.metrics["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.metrics["hits"] += 1
+        return claims
+
+    def put(self, token: str, claims: dict) -> None:
+        """
+        Cache the claims of a token that passed verification.
+        """
+        if self.max_size <= 0:
+            return
+        try:
+            exp = float(claims["exp"])
+        except (KeyError, TypeError, ValueError):
+            return
+        now = time.time()
+        expires_at = min(exp - self.clock_skew, now + self.max_ttl)
+        if expires_at <= now:
+            return
+        key = self._key(token)
+        self._entries[key] = (expires_at, claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.metrics["evictions"] += 1
+
+    def clear(self) -> None:
+        """
+        Drop every cached token, e.g. after the signing keys were rotated.
+        """
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the cache counters and the number of cached tokens.
+        """
+        return {**self.metrics, "size": len(self._entries)}
+
+
+_default_cache: Optional[TokenCache] = None
+
+
+def get_token_cache() -> TokenCache:
+    """
+    Return the process-wide TokenCache.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TokenCache()
+    return _default_cache
@@ -0,0 +1,278 @@
+import importlib.util
+import json
+import logging
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, MutableMapping, Optional, Sequence
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+        SimpleSpanProcessor,
+        SpanExporter,
+        SpanExportResult,
+    )
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:
+    trace = None
+
+logger = logging.getLogger(__name__)
+
+TRACER_NAME = "resource-explorer"
+
+_SPAN_CONTEXT_KEY = "_resource_explorer_span"
+
+# FastAPI releases with built-in OpenTelemetry support create the server spans themselves
+FASTAPI_NATIVE_TELEMETRY = importlib.util.find_spec("fastapi.telemetry") is not None
+
+
+def is_tracing_enabled() -> bool:
+    """
+    Helper function to determine if spans are recorded and exported.
+    """
+    return trace is not None and os.getenv("ENABLE_TRACING", "False").lower() in ("true", "1", "yes")
+
+
+def get_trace_exporter_name() -> str:
+    """
+    Helper function returning the span exporter: otlp, console, file (TRACE_FILE) or memory.
+    """
+    return os.getenv("TRACE_EXPORTER", "otlp").lower()
+
+
+def get_trace_sample_ratio() -> float:
+    """
+    Helper function returning the share of new traces that are sampled (head-based), between 0 and 1.
+    """
+    return min(1.0, max(0.0, float(os.getenv("TRACE_SAMPLE_RATIO", "1.0"))))
+
+
+if trace is not None:
+
+    class FileSpanExporter(SpanExporter):
+        """
+        Append finished spans to a local file, one JSON object per line.
+        """
+
+        def __init__(self, path: str):
+            self.path = path
+            self._lock = threading.Lock()
+
+        def export(self, spans: Sequence[ReadableSpan]) -> "SpanExportResult":
+            lines = [json.dumps(json.loads(span.to_json()), separators=(",", ":")) for span in spans]
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                for line in lines:
+                    f.write(line + "\n")
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self) -> None:
+            pass
+
+
+def _create_exporter(name: str) -> Optional["SpanExporter"]:
+    if name == "console":
+        return ConsoleSpanExporter()
+    if name == "file":
+        return FileSpanExporter(os.getenv("TRACE_FILE", "traces.jsonl"))
+    if name == "memory":
+        return InMemorySpanExporter()
+    if name == "otlp":
+        try:
+            # Configured with the standard OTEL_EXPORTER_OTLP_* variables
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("TRACE_EXPORTER=otlp requires opentelemetry-exporter-otlp-proto-http; tracing is disabled.")
+            return None
+        return OTLPSpanExporter()
+    logger.warning(f"Unknown TRACE_EXPORTER '{name}'; tracing is disabled.")
+    return None
+
+
+_provider = None
+
+
+def configure_tracing(exporter: Optional["SpanExporter"] = None) -> Optional["SpanExporter"]:
+    """
+    Install the tracer provider, if tracing is enabled. Calling it again has no effect.
+
+    Args:
+        exporter (SpanExporter, optional): Overrides TRACE_EXPORTER, e.g. an
+            InMemorySpanExporter in tests. Passing one enables tracing.
+
+    Returns:
+        Optional[SpanExporter]: The exporter spans are sent to, or None if tracing is off.
+    """
+    global _provider
+    if trace is None or (exporter is None and not is_tracing_enabled()):
+        return None
+    if _provider is not None:
+        return None
+
+    exporter = exporter or _create_exporter(get_trace_exporter_name())
+    if exporter is None:
+        return None
+    # Follow the caller's sampling decision; sample new traces by ratio
+    sampler = ParentBased(TraceIdRatioBased(get_trace_sample_ratio()))
+    resource = Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", "resource-explorer")})
+    _provider = TracerProvider(sampler=sampler, resource=resource)
+    # Exporting happens on a background thread, except for the in-memory exporter used by tests
+    processor = SimpleSpanProcessor(exporter) if isinstance(exporter, InMemorySpanExporter) else BatchSpanProcessor(exporter)
+    _provider.add_span_processor(processor)
+    trace.set_tracer_provider(_provider)
+    if "boto3" in sys.modules:
+        # Otherwise the S3 controller instruments boto3 when it first imports it
+        instrument_boto3()
+    _instrument_azure()
+    logger.info(f"Tracing enabled with {type(exporter).__name__} (sample ratio {get_trace_sample_ratio()}).")
+    return exporter
+
+
+def shutdown_tracing() -> None:
+    """
+    Flush and stop exporting spans.
+    """
+    if _provider is not None:
+        _provider.shutdown()
+
+
+def get_tracer():
+    """
+    Return the application tracer; a no-op tracer until tracing is configured.
+    """
+    if _provider is not None:
+        return _provider.get_tracer(TRACER_NAME)
+    return trace.get_tracer(TRACER_NAME)
+
+
+@contextmanager
+def start_span(name: str, client: bool = False, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """
+    Run a block in a child span of the current span.
+
+    Exceptions are recorded on the span and re-raised. Without OpenTelemetry
+    installed this does nothing and yields None.
+
+    Args:
+        name (str): The span name, e.g. "kubernetes list pods".
+        client (bool): Mark the span as an outgoing call.
+        attributes (Dict[str, Any], optional): Span attributes.
+    """
+    if trace is None or _provider is None:
+        yield None
+        return
+    kind = SpanKind.CLIENT if client else SpanKind.INTERNAL
+    with get_tracer().start_as_current_span(name, kind=kind, attributes=attributes) as span:
+        yield span
+
+
+def inject_trace_context(headers: MutableMapping[str, str]) -> None:
+    """
+    Add the W3C `traceparent` header of the current span to outgoing request headers.
+    """
+    if _provider is not None:
+        propagate.inject(headers)
+
+
+# ---------------------------------------------------------------------- #
+# Inbound requests
+# ---------------------------------------------------------------------- #
+class TracingMiddleware:
+    """
+    Pure ASGI middleware running every request in a server span.
+
+    The trace context of the caller (`traceparent` header) is continued, so
+    the span joins an existing trace. The span is named after the matched
+    route template. On FastAPI versions with built-in telemetry, which
+    already trace every request with the global tracer provider, this
+    middleware passes requests through.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or _provider is None or FASTAPI_NATIVE_TELEMETRY:
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        parent = propagate.extract(carrier)
+        attributes = {"http.request.method": scope["method"], "url.path": scope["path"]}
+        with get_tracer().start_as_current_span(f"{scope['method']}", context=parent, kind=SpanKind.SERVER, attributes=attributes) as span:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.set_attribute("http.route", route)
+                    span.update_name(f"{scope['method']} {route}")
+
+
+# ---------------------------------------------------------------------- #
+# SDK instrumentation
+# ---------------------------------------------------------------------- #
+def _boto3_before_call(model, context, **kwargs) -> None:
+    name = f"{model.service_model.service_name} {model.name}"
+    span = get_tracer().start_span(name, kind=SpanKind.CLIENT, attributes={"rpc.system": "aws-api", "rpc.service": model.service_model.service_name, "rpc.method": model.name})
+    context[_SPAN_CONTEXT_KEY] = span
+
+
+def _boto3_after_call(http_response, context, **kwargs) -> None:
+    span = context.pop(_SPAN_CONTEXT_KEY, None)
+    if span is not None:
+        span.set_attribute("http.response.status_code", http_response.status_code)
+        if http_response.status_code >= 300:
+            span.set_status(Status(StatusCode.ERROR))
+        span.end()
+
+
+def _boto3_after_call_error(exception, context, **kwargs) -> None:
+    span = context.pop(_SPAN_CONTEXT_KEY, None)
+    if span is not None:
+        span.record_exception(exception)
+        span.set_status(Status(StatusCode.ERROR))
+        span.end()
+
+
+def instrument_boto3() -> None:
+    """
+    Trace the calls of boto3 clients, if tracing is configured.
+
+    boto3 is slow to import, so it is not imported for this: callers invoke
+    this after importing it. Calling it again has no effect.
+    """
+    if _provider is None:
+        return
+    import boto3
+
+    # Every boto3 client created from the default session emits these events around each API call
+    if boto3.DEFAULT_SESSION is None:
+        boto3.setup_default_session()
+    events = boto3.DEFAULT_SESSION.events
+    events.register("before-call", _boto3_before_call, unique_id="resource-explorer-trace-before")
+    events.register("after-call", _boto3_after_call, unique_id="resource-explorer-trace-after")
+    events.register("after-call-error", _boto3_after_call_error, unique_id="resource-explorer-trace-error")
+
+
+def _instrument_azure() -> None:
+    # azure-core creates spans for every SDK call through the global OpenTelemetry tracer;
+    # its settings read this variable on use, so the SDK need not be imported here
+    os.environ.setdefault("AZURE_TRACING_ENABLED", "true")
@@ -1,5 +1,6 @@
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from base.masking import SchemaMask, get_secret_masker
 
 def is_masking_enabled() -> bool:
     """
@@ -7,22 +8,48 @@ def is_masking_enabled() -> bool:
     """
     return os.getenv("ENABLE_MASKING", "True").lower() in ("true", "1", "yes")
 
-def mask_secrets(value: Dict[str, Any]) -> Dict[str, Any]:
+def mask_secrets(value: Dict[str, Any], schema_mask: Optional[SchemaMask] = None) -> Dict[str, Any]:
     """
-    Masks sensitive information in a dictionary, including nested dictionaries.
+    Masks sensitive information in a dictionary, including nested dictionaries and lists.
+
+    The input is not modified; see `base.masking.SecretMasker` for the rules.
+    Objects of a CRD are masked at the paths its schema marks as sensitive
+    if `schema_mask` is given (see `base.masking.SchemaMask`).
     """
     if not is_masking_enabled():
         return value
+    if schema_mask is not None:
+        return schema_mask.mask(value)
+    return get_secret_masker().mask(value)
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Split a comma-separated projection (e.g. "metadata.name,spec.containers") into dotted paths.
+    """
+    if not fields:
+        return None
+    paths = [path.strip() for path in fields.split(",") if path.strip()]
+    return [path for path in paths if all(path.split("."))] or None
+
+def project_fields(value: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Keep only the given dotted paths of a parsed API object, e.g. ["metadata.name", "status.phase"].
+    Paths that do not exist in the object are skipped.
+    """
+    if not fields:
+        return value
+
+    result: Dict[str, Any] = {}
+    for path in fields:
+        source, target = value, result
+        *parents, leaf = path.split(".")
+        for part in parents:
+            source = source.get(part) if isinstance(source, dict) else None
+            if not isinstance(source, dict):
+                break
+            target = target.setdefault(part, {})
+        else:
+            if isinstance(source, dict) and leaf in source:
+                target[leaf] = source[leaf]
+    return result
 
-    if isinstance(value, dict):
-        for key in value:
-            # Check if the key contains sensitive keywords
-            if any(sensitive in key.lower() for sensitive in ["secret", "token", "password", "tls", "auth", "PrivateKey"]):
-                value[key] = "***REDACTED***"
-            elif isinstance(value[key], dict):
-                # Recursively mask nested dictionaries
-                value[key] = mask_secrets(value[key])
-            elif isinstance(value[key], list):
-                # Recursively mask lists of dictionaries
-                value[key] = [mask_secrets(item) if isinstance(item, dict) else item for item in value[key]]
-    return value
\ No newline at end of file
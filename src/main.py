@@ -1,88 +1,145 @@
+import importlib
 import os
+from contextlib import asynccontextmanager
+# Imported first: time-to-ready is measured from here
+from base.bootstrap import blocking, get_bootstrap
 from fastapi import FastAPI, Depends
-from base.auth import AuthWrapper
+from base.auth import get_auth_wrapper
 from base.k8s_config import load_k8s_config
+from base.informer import get_informer, start_default_informers, stop_informers
+from base.crd_index import get_crd_index
+from base.discovery import get_discovery_cache
+from base.events import stop_event_broadcaster
+from base.k8s_client import close_async_api_client
+from base.clients import get_client_registry
+from base.features import is_feature_enabled
 from base.helpers import KubernetesHelper
 from base.routers import router as base_router
+from base.responses import FastJSONResponse, ResponseFormatMiddleware
 from base.logging import LoggerConfigurator
+from base.metrics import MetricsMiddleware, start_event_loop_monitor, stop_event_loop_monitor
+from base.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
 import logging
 
-from v1.routers import (
-    k8s as v1_k8s_resources_router,
-    resources as v1_resources_router,
-    s3 as v1_s3_router,
-    connection as v1_connection_router,
-    crd as v1_crd_router,
-    testmanager as v1_test_manager_router,
-    pypi as v1_pypi_router,
-    acr as v1_acr_router,
-    whoami as v1_whoami_router,
-)
-
 # Initialize logging
-logger = LoggerConfigurator()
-
-logger.configure_logging()
-logger.log_message(logging.INFO,"Logging has been configured successfully.")
-
-# Load Kubernetes configuration
-load_k8s_config()
-print("Kubernetes configuration loaded successfully.")
-
-# Initialize KubernetesHelper
-k8s_helper = KubernetesHelper()
+LoggerConfigurator().configure_logging()
+logger = logging.getLogger(__name__)
+logger.info("Logging has been configured successfully.")
 
-# Display runtime context
-runtime_info = k8s_helper.get_runtime_info()
-print("Runtime Context:")
-for key, value in runtime_info.items():
-    print(f"  {key}: {value}")
+# Initialize tracing (ENABLE_TRACING)
+configure_tracing()
 
 # Fetch dynamic configuration from environment variables
 root_path = os.getenv("ROOT_PATH", "/resource-explorer")
 openapi_url = os.getenv("OPENAPI_URL", f"{root_path}/openapi.json")
 
-auth_wrapper = AuthWrapper()
+# Shared by every router; the API key itself is loaded during startup
+auth_wrapper = get_auth_wrapper()
+
+
+def start_informers():
+    # Populate the shared resource cache in the background
+    start_default_informers()
+    crd_informer = get_informer("customresourcedefinitions")
+    if crd_informer:
+        # New or removed CRDs change the served resource types and /crds/{plural} routes
+        crd_informer.add_handler(get_discovery_cache().on_crd_event)
+        crd_informer.add_handler(get_crd_index().on_crd_event)
+
+
+async def warm_discovery():
+    # The first /resources request would otherwise pay for discovery
+    await get_discovery_cache().get_resource_types()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load the configuration once and start the expensive startup work in the background.
+
+    The server accepts connections right away; the readiness probe reports
+    503 until the API key, informers, discovery cache and CRD index are in
+    place.
+    """
+    # Load Kubernetes configuration; every client created afterwards uses it
+    load_k8s_config()
+    logger.info("Kubernetes configuration loaded successfully.")
+
+    # Display runtime context
+    runtime_info = KubernetesHelper().get_runtime_info()
+    logger.info("Runtime context", extra={"runtime": runtime_info})
+
+    # Sample event loop lag for /metrics
+    start_event_loop_monitor()
+    bootstrap = get_bootstrap()
+    bootstrap.start({
+        "api_key": blocking(auth_wrapper.load_api_key),
+        "informers": blocking(start_informers),
+        "discovery": warm_discovery,
+        "crd_index": blocking(get_crd_index().refresh),
+    })
+    yield
+    await bootstrap.stop()
+    stop_informers()
+    await stop_event_loop_monitor()
+    await stop_event_broadcaster()
+    await close_async_api_client()
+    get_client_registry().close()
+    shutdown_tracing()
+
 
 # Initialize FastAPI apps
-print("FastAPI applications initialized.")
-app = FastAPI(root_path=root_path, openapi_url=openapi_url)
-app_v1 = FastAPI(root_path=f"{root_path}/v1", openapi_url=f"{root_path}/openapi.json")
+app = FastAPI(root_path=root_path, openapi_url=openapi_url, default_response_class=FastJSONResponse, lifespan=lifespan)
+app_v1 = FastAPI(root_path=f"{root_path}/v1", openapi_url=f"{root_path}/openapi.json", default_response_class=FastJSONResponse)
+logger.info("FastAPI applications initialized.")
+app.add_middleware(ResponseFormatMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
 
 # Include routers
 app.include_router(base_router, tags=["Health"])
+# (module in v1.routers, router attribute, tag, feature); routers of disabled
+# features (ENABLE_S3=false, ...) are not imported
 v1_routers = [
-    (v1_resources_router.router, "Simple Resources"),
-    (v1_k8s_resources_router.k8s_resources_router, "K8s Resources"),
-    (v1_s3_router.router, "S3"),
-    (v1_connection_router.router, "Connection"),
-    (v1_test_manager_router.router, "Test"),
-    (v1_crd_router.router, "Custom Resources"),
-    (v1_pypi_router.router, "PyPi"),
-    (v1_acr_router.router, "ACR"),
-    (v1_whoami_router.router, "Authentication and Authorization"),
+    ("resources", "router", "Simple Resources", None),
+    ("k8s", "k8s_resources_router", "K8s Resources", None),
+    ("s3", "router", "S3", "s3"),
+    ("connection", "router", "Connection", None),
+    ("testmanager", "router", "Test", None),
+    ("crd", "router", "Custom Resources", None),
+    ("pypi", "router", "PyPi", "pypi"),
+    ("acr", "router", "ACR", "acr"),
+    ("whoami", "router", "Authentication and Authorization", None),
 ]
 
-for router, tag in v1_routers:
+for module_name, attribute, tag, feature in v1_routers:
+    if feature and not is_feature_enabled(feature):
+        logger.info(f"{tag} routes are disabled (ENABLE_{feature.upper()}=false).")
+        continue
+    router = getattr(importlib.import_module(f"v1.routers.{module_name}"), attribute)
     app_v1.include_router(router, tags=[tag], dependencies=[Depends(auth_wrapper.validate_api_key)])
-print("FastAPI routers included successfully.")
+logger.info("FastAPI routers included successfully.")
 
 # Mount versioned app
 app.mount("/", app_v1)
-print("FastAPI application mounted successfully.")
+logger.info("FastAPI application mounted successfully.")
 
 # Output app_v1 settings
-print("app_v1 settings:")
-print(f"Title: {app_v1.title}")
-print(f"Version: {app_v1.version}")
-print(f"OpenAPI URL: {app_v1.openapi_url}")
-print(f"Root Path: {app_v1.root_path}")
-print(f"Docs URL: {app_v1.docs_url}")
-print(f"Redoc URL: {app_v1.redoc_url}")
-
-print("FastAPI application is ready to run.")
-
+logger.info(
+    "app_v1 settings",
+    extra={
+        "settings": {
+            "title": app_v1.title,
+            "version": app_v1.version,
+            "openapi_url": app_v1.openapi_url,
+            "root_path": app_v1.root_path,
+            "docs_url": app_v1.docs_url,
+            "redoc_url": app_v1.redoc_url,
+        }
+    },
+)
 
+logger.info("FastAPI application is ready to run.")
 
 # Run the application
 if __name__ == "__main__":
@@ -1,11 +1,16 @@
-from azure.identity import ClientSecretCredential, DeviceCodeCredential
-from azure.containerregistry import ContainerRegistryClient
 from fastapi import HTTPException
+from base.metrics import observe_upstream
 from typing import List, Dict
+import logging
 
+logger = logging.getLogger(__name__)
+
+@observe_upstream("acr", "authenticate_to_acr")
 def authenticate_to_acr(client_id: str, client_secret: str, tenant_id: str):
+    # The Azure SDK is imported on first use, so workers that never call ACR do not load it
+    from azure.identity import ClientSecretCredential
     try:
-        print(f"Authenticating with Tenant ID: {tenant_id}, Client ID: {client_id}")
+        logger.info(f"Authenticating with Tenant ID: {tenant_id}, Client ID: {client_id}")
         credential = ClientSecretCredential(
             client_id=client_id,
             client_secret=client_secret,
@@ -13,7 +18,7 @@ def authenticate_to_acr(client_id: str, client_secret: str, tenant_id: str):
         )
         # Test the credential by requesting a token
         token = credential.get_token("https://management.azure.com/.default")
-        print(f"Authentication successful. Token: {token.token[:10]}...")
+        logger.info("Authentication successful.", extra={"token_expires_on": token.expires_on})
         return credential
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Authentication failed: {str(e)}")
@@ -22,14 +27,16 @@ def authenticate_to_azure(subscription_id: str):
     """
     Authenticate to Azure using Device Code flow.
     """
+    from azure.identity import DeviceCodeCredential
     try:
-        print("Authenticating to Azure using Device Code...")
+        logger.info("Authenticating to Azure using Device Code...")
         credential = DeviceCodeCredential()
-        print("Successfully authenticated to Azure.")
+        logger.info("Successfully authenticated to Azure.")
         return credential
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Azure authentication failed: {str(e)}")
 
+@observe_upstream("acr", "list_acr_repositories_and_images")
 def list_acr_repositories_and_images(
     registry_url: str,
     token_username: str = None,
@@ -53,6 +60,8 @@ def list_acr_repositories_and_images(
     Returns:
         dict: A dictionary containing repositories and their associated image tags.
     """
+    from azure.identity import ClientSecretCredential
+    from azure.containerregistry import ContainerRegistryClient
     try:
         # Determine the authentication method
         if token_username and token_password:
@@ -87,10 +96,12 @@ def list_acr_repositories_and_images(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch repositories/images: {str(e)}")
 
+@observe_upstream("acr", "list_acr_repositories")
 def list_acr_repositories(subscription_id: str, registry_name: str) -> Dict[str, List[str]]:
     """
     List repositories and their tags in an Azure Container Registry.
     """
+    from azure.containerregistry import ContainerRegistryClient
     try:
         # Authenticate to Azure
         credential = authenticate_to_azure(subscription_id)
@@ -109,6 +120,7 @@ def list_acr_repositories(subscription_id: str, registry_name: str) -> Dict[str,
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list repositories: {str(e)}")
 
+@observe_upstream("acr", "copy_acr_image_with_credentials")
 def copy_acr_image_with_credentials(
     source_registry_url: str,
     source_repository: str,
@@ -141,6 +153,7 @@ def copy_acr_image_with_credentials(
     Returns:
         dict: A dictionary containing the source and destination details.
     """
+    from azure.containerregistry import ContainerRegistryClient
     try:
         # Authenticate to the source registry
         source_credential = authenticate_to_acr(source_client_id, source_client_secret, source_tenant_id)
@@ -183,6 +196,7 @@ def copy_acr_image_with_credentials(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to copy image: {str(e)}")
 
+@observe_upstream("acr", "copy_acr_image")
 def copy_acr_image(
     subscription_id: str,
     source_registry: str,
@@ -194,6 +208,7 @@ def copy_acr_image(
     """
     Copy an image from one Azure Container Registry to another.
     """
+    from azure.containerregistry import ContainerRegistryClient
     try:
         # Authenticate to Azure
         credential = authenticate_to_azure(subscription_id)
@@ -1,8 +1,15 @@
 from fastapi import HTTPException
 from kubernetes import client
 from kubernetes.client.exceptions import ApiException
-from base.k8s_config import load_k8s_config
-from base.utils import mask_secrets
+from base.clients import get_api
+from base.utils import mask_secrets, project_fields
+from base.crd_index import get_crd_index
+from base.masking import SchemaMask
+from base.k8s_client import PARTIAL_OBJECT_METADATA_ACCEPT, json_loads
+from base.object_cache import get_crd_item_cache
+from typing import List, Optional
+from base.pagination import get_stream_page_size
+from base.selectors import COMMON_SELECTABLE_FIELDS, Selectors
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,12 +17,10 @@ logger = logging.getLogger(__name__)
 class CRDManager:
     def __init__(self):
         """
-        Initialize the CRDManager by loading Kubernetes configurations
-        and setting up API clients.
+        Initialize the CRDManager with the shared, pooled API clients.
         """
-        load_k8s_config()
-        self.api_extension_client = client.ApiextensionsV1Api()
-        self.custom_objects_api = client.CustomObjectsApi()
+        self.api_extension_client = get_api(client.ApiextensionsV1Api)
+        self.custom_objects_api = get_api(client.CustomObjectsApi)
 
     def list_crds(self):
         """
@@ -28,7 +33,90 @@ class CRDManager:
             logger.error(f"Error fetching CRDs: {e}")
             raise HTTPException(status_code=500, detail=f"Error fetching CRDs: {str(e)}")
 
-    def get_crd_items(self, group: str, version: str, plural: str, namespace: str = None):
+    def _list_crd_objects(self, group: str, version: str, plural: str, namespace: str = None, **kwargs):
+        # Read the body ourselves and parse it once instead of going through the client's deserializer
+        if namespace:
+            response = self.custom_objects_api.list_namespaced_custom_object(
+                group=group,
+                version=version,
+                namespace=namespace,
+                plural=plural,
+                _preload_content=False,
+                **kwargs,
+            )
+        else:
+            response = self.custom_objects_api.list_cluster_custom_object(
+                group=group,
+                version=version,
+                plural=plural,
+                _preload_content=False,
+                **kwargs,
+            )
+        return json_loads(response.data)
+
+    def _get_crd_object(self, group: str, version: str, plural: str, name: str, namespace: str = None, metadata_only: bool = False) -> dict:
+        kwargs = {"_preload_content": False}
+        if metadata_only:
+            kwargs["_headers"] = {"Accept": PARTIAL_OBJECT_METADATA_ACCEPT}
+        if namespace:
+            response = self.custom_objects_api.get_namespaced_custom_object(
+                group=group, version=version, namespace=namespace, plural=plural, name=name, **kwargs
+            )
+        else:
+            response = self.custom_objects_api.get_cluster_custom_object(
+                group=group, version=version, plural=plural, name=name, **kwargs
+            )
+        return json_loads(response.data)
+
+    def _schema_mask(self, group: str, version: str, plural: str) -> Optional[SchemaMask]:
+        # Compiled from the CRD schema when the CRD was indexed; None falls back to masking by key name
+        try:
+            crd = get_crd_index().find(group, plural)
+        except Exception as e:
+            logger.debug(f"CRD index unavailable, masking {plural}.{group} by key name: {e}")
+            return None
+        return (crd.get("masks") or {}).get(version) if crd else None
+
+    def get_crd_item(self, group: str, version: str, plural: str, name: str, namespace: str = None) -> Optional[dict]:
+        """
+        Get a single item of a CRD by name.
+
+        The object is read directly rather than listed, and masked once. The
+        masked object is cached by resourceVersion (CRD_ITEM_CACHE_SIZE):
+        while it is cached, a metadata-only read tells whether it changed,
+        and an unchanged object is returned without fetching or masking it
+        again.
+
+        Args:
+            group (str): The API group of the CRD.
+            version (str): The version of the CRD.
+            plural (str): The plural name of the CRD.
+            name (str): The name of the item.
+            namespace (str, optional): The namespace of the item (if the CRD is namespaced).
+
+        Returns:
+            Optional[dict]: The item with sensitive information masked, or None if it does not exist.
+        """
+        cache = get_crd_item_cache()
+        key = (group, version, plural, namespace or "", name)
+        try:
+            if cache.enabled and cache.peek(key) is not None:
+                metadata = self._get_crd_object(group, version, plural, name, namespace, metadata_only=True).get("metadata") or {}
+                cached = cache.get(key, metadata.get("resourceVersion"))
+                if cached is not None:
+                    return cached
+            item = self._get_crd_object(group, version, plural, name, namespace)
+        except ApiException as e:
+            if e.status == 404:
+                cache.discard(key)
+                return None
+            logger.error(f"Error fetching CRD item: {e}")
+            raise HTTPException(status_code=500, detail=f"Error fetching CRD item: {str(e)}")
+        item = mask_secrets(item, self._schema_mask(group, version, plural))
+        cache.put(key, (item.get("metadata") or {}).get("resourceVersion"), item)
+        return item
+
+    def get_crd_items(self, group: str, version: str, plural: str, namespace: str = None, limit: int = None, continue_token: str = None, selectors: Selectors = None, fields: List[str] = None):
         """
         Get items from a specific CRD.
 
@@ -37,82 +125,69 @@ class CRDManager:
             version (str): The version of the CRD.
             plural (str): The plural name of the CRD (e.g., "customresources").
             namespace (str, optional): The namespace to query (if the CRD is namespaced).
+            limit (int, optional): Maximum number of items to return; the API server may return a continue token.
+            continue_token (str, optional): Continue token of the previous page.
+            selectors (Selectors, optional): Label and field selectors; fields other than
+                metadata.name and metadata.namespace are matched in-process.
+            fields (List[str], optional): Dotted paths to keep of every item, e.g. ["metadata.name", "spec"].
 
         Returns:
             dict: A dictionary of items from the specified CRD with sensitive information masked.
         """
+        kwargs, residual = (selectors or Selectors()).for_resource(plural, COMMON_SELECTABLE_FIELDS)
+        if limit:
+            kwargs["limit"] = limit
+        if continue_token:
+            kwargs["_continue"] = continue_token
         try:
-            if namespace:
-                items = self.custom_objects_api.list_namespaced_custom_object(
-                    group=group,
-                    version=version,
-                    namespace=namespace,
-                    plural=plural,
-                )
-            else:
-                items = self.custom_objects_api.list_cluster_custom_object(
-                    group=group,
-                    version=version,
-                    plural=plural,
-                )
-            # Mask sensitive information
-            return mask_secrets(items)
+            items = self._list_crd_objects(group, version, plural, namespace, **kwargs)
+            if residual:
+                items["items"] = residual.filter(items.get("items") or [])
+            if fields:
+                items["items"] = [project_fields(item, fields) for item in items.get("items") or []]
+            # Mask sensitive information, at the paths the CRD schema marks if it is known
+            schema_mask = self._schema_mask(group, version, plural)
+            if schema_mask is None:
+                return mask_secrets(items)
+            items["items"] = [mask_secrets(item, schema_mask) for item in items.get("items") or []]
+            return items
         except ApiException as e:
             logger.error(f"Error fetching CRD items: {e}")
             raise HTTPException(status_code=500, detail=f"Error fetching CRD items: {str(e)}")
 
-    def create_dynamic_crd_functions(self):
-        """
-        Dynamically create functions for each CRD to list and get items,
-        separating namespaced and non-namespaced CRDs. The function names
-        will use the group name instead of the plural name.
+    def iter_crd_items(self, group: str, version: str, plural: str, namespace: str = None, continue_token: str = None, selectors: Selectors = None, fields: List[str] = None):
         """
-        try:
-            # Fetch all CRDs
-            crds = self.api_extension_client.list_custom_resource_definition()
+        Yield the masked items of a CRD page by page, so only one API server page is held in memory.
 
-            # Dictionary to store dynamically created functions
-            crd_functions = {}
-
-            for crd in crds.items:
-                group = crd.spec.group
-                version = crd.spec.versions[0].name
-                plural = crd.spec.names.plural
-                namespaced = crd.spec.scope == "Namespaced"
-
-                # Generate a unique identifier for the CRD using group and plural
-                group_identifier = group.replace(".", "_")  # Replace dots with underscores for valid function names
-
-                if namespaced:
-                    # Create a function to list items for the namespaced CRD
-                    def list_items(namespace: str, group=group, version=version, plural=plural):
-                        return self.get_crd_items(group=group, version=version, plural=plural, namespace=namespace)
-
-                    # Create a function to get a specific item for the namespaced CRD
-                    def get_item(namespace: str, name: str, group=group, version=version, plural=plural):
-                        items = self.get_crd_items(group=group, version=version, plural=plural, namespace=namespace)
-                        return next((item for item in items.get("items", []) if item["metadata"]["name"] == name), None)
-
-                    # Add the functions to the dictionary
-                    crd_functions[f"list_{group_identifier}_{plural}"] = list_items
-                    crd_functions[f"get_{group_identifier}_{plural}"] = get_item
-
-                else:
-                    # Create a function to list items for the cluster-scoped CRD
-                    def list_items(group=group, version=version, plural=plural):
-                        return self.get_crd_items(group=group, version=version, plural=plural)
-
-                    # Create a function to get a specific item for the cluster-scoped CRD
-                    def get_item(name: str, group=group, version=version, plural=plural):
-                        items = self.get_crd_items(group=group, version=version, plural=plural)
-                        return next((item for item in items.get("items", []) if item["metadata"]["name"] == name), None)
-
-                    # Add the functions to the dictionary
-                    crd_functions[f"list_{group_identifier}_{plural}"] = list_items
-                    crd_functions[f"get_{group_identifier}_{plural}"] = get_item
-
-            return crd_functions
+        Args:
+            group (str): The API group of the CRD.
+            version (str): The version of the CRD.
+            plural (str): The plural name of the CRD.
+            namespace (str, optional): The namespace to query (if the CRD is namespaced).
+            continue_token (str, optional): Resume from the continue token of a previous page.
+            selectors (Selectors, optional): Label and field selectors to apply.
+            fields (List[str], optional): Dotted paths to keep of every item.
 
-        except ApiException as e:
-            logger.error(f"Error creating dynamic CRD functions: {e}")
-            raise HTTPException(status_code=500, detail=f"Error creating dynamic CRD functions: {str(e)}")
\ No newline at end of file
+        Yields:
+            dict: One CRD item with sensitive information masked.
+        """
+        while True:
+            page = self.get_crd_items(group, version, plural, namespace, limit=get_stream_page_size(), continue_token=continue_token, selectors=selectors, fields=fields)
+            for item in page.get("items") or []:
+                yield item
+            continue_token = (page.get("metadata") or {}).get("continue")
+            if not continue_token:
+                break
+
+
+_default_crd_manager: Optional[CRDManager] = None
+
+
+def get_crd_manager() -> CRDManager:
+    """
+    Return the process-wide CRDManager shared by the CRD routes.
+    """
+    global _default_crd_manager
+    if _default_crd_manager is None:
+        _default_crd_manager = CRDManager()
+    return _default_crd_manager
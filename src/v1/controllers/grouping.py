@@ -0,0 +1,151 @@
+import asyncio
+import os
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+from kubernetes.client.exceptions import ApiException
+from base.k8s_client import AsyncAppsV1Api, AsyncCoreV1Api
+
+core_v1_api = AsyncCoreV1Api()
+apps_v1_api = AsyncAppsV1Api()
+
+GROUPING_MODE_CLUSTER = "cluster"
+GROUPING_MODE_NAMESPACED = "namespaced"
+
+
+def get_grouping_mode() -> str:
+    """
+    Helper function to determine how resources are fetched for grouping.
+
+    "cluster" issues one cluster-wide list per kind, "namespaced" lists every
+    namespace separately for deployments whose RBAC is namespace-scoped.
+    """
+    mode = os.getenv("RESOURCE_GROUPING_MODE", GROUPING_MODE_CLUSTER).lower()
+    return mode if mode in (GROUPING_MODE_CLUSTER, GROUPING_MODE_NAMESPACED) else GROUPING_MODE_CLUSTER
+
+
+def get_grouping_namespaces() -> Optional[List[str]]:
+    """
+    Helper function returning the namespaces configured for namespaced grouping, if any.
+    """
+    namespaces = os.getenv("RESOURCE_GROUPING_NAMESPACES", "")
+    return [ns.strip() for ns in namespaces.split(",") if ns.strip()] or None
+
+
+def get_grouping_concurrency() -> int:
+    """
+    Helper function returning the maximum number of namespaces fetched at once.
+    """
+    return max(1, int(os.getenv("RESOURCE_GROUPING_CONCURRENCY", "10")))
+
+
+def _empty_group() -> Dict[str, list]:
+    return {"pods": [], "services": [], "deployments": []}
+
+
+def _bucket(result: Dict[str, Dict[str, list]], pods: Iterable, services: Iterable, deployments: Iterable) -> Dict[str, Dict[str, list]]:
+    """
+    Add pods, services and deployments to their namespace bucket in a single pass.
+    """
+    for pod in pods:
+        result.setdefault(pod.metadata.namespace, _empty_group())["pods"].append(
+            {"name": pod.metadata.name, "status": pod.status.phase}
+        )
+    for svc in services:
+        result.setdefault(svc.metadata.namespace, _empty_group())["services"].append(
+            {"name": svc.metadata.name, "type": svc.spec.type}
+        )
+    for dep in deployments:
+        result.setdefault(dep.metadata.namespace, _empty_group())["deployments"].append(
+            {"name": dep.metadata.name, "replicas": dep.status.replicas}
+        )
+    return result
+
+
+async def group_cluster_wide() -> Dict[str, Dict[str, list]]:
+    """
+    Fetch pods, services and deployments with concurrent cluster-wide lists and
+    group them by namespace.
+
+    Returns:
+        Dict[str, Dict[str, list]]: Resources grouped by namespace. Namespaces
+        without any resources are included with empty lists.
+    """
+    namespaces, pods, services, deployments = await asyncio.gather(
+        core_v1_api.list_namespace(_metadata_only=True),
+        core_v1_api.list_pod_for_all_namespaces(),
+        core_v1_api.list_service_for_all_namespaces(),
+        apps_v1_api.list_deployment_for_all_namespaces(),
+    )
+    result = {ns.metadata.name: _empty_group() for ns in namespaces.items}
+    return _bucket(result, pods.items, services.items, deployments.items)
+
+
+async def group_namespace(namespace: str) -> Dict[str, list]:
+    """
+    Fetch pods, services and deployments of a single namespace concurrently.
+
+    Args:
+        namespace (str): The namespace to query.
+
+    Returns:
+        Dict[str, list]: The grouped resources of that namespace.
+    """
+    pods, services, deployments = await asyncio.gather(
+        core_v1_api.list_namespaced_pod(namespace=namespace),
+        core_v1_api.list_namespaced_service(namespace=namespace),
+        apps_v1_api.list_namespaced_deployment(namespace=namespace),
+    )
+    result = _bucket({namespace: _empty_group()}, pods.items, services.items, deployments.items)
+    return result[namespace]
+
+
+async def group_per_namespace(namespaces: Optional[List[str]] = None, max_concurrency: Optional[int] = None) -> Dict[str, Dict[str, list]]:
+    """
+    Fetch pods, services and deployments namespace by namespace with bounded concurrency.
+
+    Intended for service accounts that are only allowed to list inside specific
+    namespaces. When no namespaces are given, they are listed from the cluster.
+
+    Args:
+        namespaces (List[str], optional): The namespaces to query.
+        max_concurrency (int, optional): Maximum number of namespaces fetched at once.
+
+    Returns:
+        Dict[str, Dict[str, list]]: Resources grouped by namespace.
+    """
+    if namespaces is None:
+        namespace_list = await core_v1_api.list_namespace(_metadata_only=True)
+        namespaces = [ns.metadata.name for ns in namespace_list.items]
+
+    semaphore = asyncio.Semaphore(max_concurrency or get_grouping_concurrency())
+
+    async def fetch(namespace: str) -> Dict[str, list]:
+        async with semaphore:
+            return await group_namespace(namespace)
+
+    groups = await asyncio.gather(*(fetch(namespace) for namespace in namespaces))
+    return dict(zip(namespaces, groups))
+
+
+async def group_resources(namespace: Optional[str] = None) -> Dict[str, Dict[str, list]]:
+    """
+    Fetch pods, services and deployments grouped by namespace using the configured mode.
+
+    Args:
+        namespace (str, optional): Only fetch this namespace.
+
+    Returns:
+        Dict[str, Dict[str, list]]: Resources grouped by namespace.
+
+    Raises:
+        HTTPException: If the Kubernetes API returns an error.
+    """
+    try:
+        if namespace:
+            return {namespace: await group_namespace(namespace)}
+        if get_grouping_mode() == GROUPING_MODE_NAMESPACED:
+            return await group_per_namespace(get_grouping_namespaces())
+        return await group_cluster_wide()
+    except ApiException as e:
+        raise HTTPException(status_code=e.status, detail=f"Error fetching resources: {e.reason}")
@@ -1,84 +1,91 @@
 import asyncio
 import base64
+import contextlib
+import functools
+import json
+import re
 import yaml
 import os
 from datetime import datetime
 from fastapi import HTTPException, WebSocket
 from kubernetes import client
-from fastapi import HTTPException
-from kubernetes import client, watch, config, stream
 from kubernetes.client.exceptions import ApiException
-from base.k8s_config import load_k8s_config
-from typing import Optional
+from base.clients import get_api, get_client_registry
+from base.k8s_client import (
+    AsyncAppsV1Api,
+    AsyncBatchV1Api,
+    AsyncCoreV1Api,
+    AsyncNetworkingV1Api,
+    AsyncStorageV1Api,
+)
+from base.informer import cached_resources_grouped_by_namespace
+from base.discovery import get_discovery_cache
+from base.events import EventFilter, get_event_broadcaster, get_event_heartbeat_interval
+from base.exec_session import ExecSession
+from base.log_stream import MergeItem, get_log_search_max_streams, iter_lines, merge_live, merge_sorted, split_timestamp
+from base.pagination import ListPage, iter_pages
+from base.responses import dumps_json
+from base.selectors import Selectors, filter_items, label_selector_from_spec
+from base.utils import mask_secrets, project_fields
+from v1.controllers.grouping import group_resources
+from typing import AsyncIterator, List, Optional
 from v1.models.models import PersistentVolume, PersistentVolumeClaim, StorageClass
 import traceback
 import logging
 
-# Load Kubernetes Configurations
-load_k8s_config()
+# Non-blocking API clients sharing one pooled connection to the API server
+core_v1_api = AsyncCoreV1Api()
+apps_v1_api = AsyncAppsV1Api()
+batch_v1_api = AsyncBatchV1Api()
+networking_v1_api = AsyncNetworkingV1Api()
+storage_v1_api = AsyncStorageV1Api()
 
-core_v1_api = client.CoreV1Api()
-apps_v1_api = client.AppsV1Api()
-apis_api = client.ApisApi()
-networking_v1_api = client.NetworkingV1Api()
-storage_v1_api = client.StorageV1Api()
 
-def get_all_resource_types():
+async def get_all_resource_types(refresh: bool = False):
     """
     Fetch all available resource types in the Kubernetes cluster.
-    """
-    try:
-        # Fetch core API resources
-        core_resources = core_v1_api.get_api_resources()
-        core_resource_types = [
-            {"name": resource.name, "kind": resource.kind, "namespaced": resource.namespaced}
-            for resource in core_resources.resources
-        ]
-
-        # Fetch resources from all API groups
-        api_groups = apis_api.get_api_versions()
-        group_resource_types = []
-        for group in api_groups.groups:
-            for version in group.versions:
-                group_version = f"{group.name}/{version.version}" if group.name else version.version
-                try:
-                    group_resources = client.ApiClient().call_api(
-                        f"/apis/{group_version}", "GET", response_type="V1APIResourceList"
-                    )
-                    group_resource_types.extend([
-                        {
-                            "name": resource.name,
-                            "kind": resource.kind,
-                            "namespaced": resource.namespaced,
-                            "groupVersion": group_version,
-                        }
-                        for resource in group_resources.resources
-                    ])
-                except Exception:
-                    continue
-
-        # Combine core and group resources
-        all_resource_types = core_resource_types + group_resource_types
 
-        return {"resource_types": all_resource_types}
+    Served from the discovery cache; group versions that could not be
+    discovered are listed under "errors".
 
+    Args:
+        refresh (bool): Run discovery again instead of using the cached result.
+    """
+    try:
+        return await get_discovery_cache().get_resource_types(refresh=refresh)
     except ApiException as e:
         raise HTTPException(status_code=500, detail=f"Error fetching resource types: {str(e)}")
 
-async def describe_resource(namespace: str, resource_type: str, resource_name: str):
+async def describe_resource(namespace: str, resource_type: str, resource_name: str, raw: bool = False, fields: Optional[List[str]] = None):
+    """
+    Fetch the metadata, spec and status of a pod, service or deployment.
+
+    Args:
+        namespace (str): The namespace of the resource.
+        resource_type (str): "pod", "service" or "deployment".
+        resource_name (str): The name of the resource.
+        raw (bool): Return the API server's JSON (camelCase, masked) without model deserialization.
+        fields (List[str], optional): Dotted paths to keep in raw mode, e.g. ["metadata.name", "status.phase"].
+    """
     try:
+        raw = raw or bool(fields)
         if resource_type == "pod":
-            resource = core_v1_api.read_namespaced_pod(name=resource_name, namespace=namespace)
+            resource = await core_v1_api.read_namespaced_pod(name=resource_name, namespace=namespace, _preload_content=not raw)
         elif resource_type == "service":
-            resource = core_v1_api.read_namespaced_service(name=resource_name, namespace=namespace)
+            resource = await core_v1_api.read_namespaced_service(name=resource_name, namespace=namespace, _preload_content=not raw)
         elif resource_type == "deployment":
-            resource = apps_v1_api.read_namespaced_deployment(name=resource_name, namespace=namespace)
+            resource = await apps_v1_api.read_namespaced_deployment(name=resource_name, namespace=namespace, _preload_content=not raw)
         else:
             raise HTTPException(status_code=400, detail=f"Unsupported resource type: {resource_type}")
 
         if not resource:
             raise HTTPException(status_code=404, detail=f"{resource_type.capitalize()} '{resource_name}' not found in namespace '{namespace}'")
 
+        if raw:
+            if not fields:
+                fields = ["metadata", "spec", "status"]
+            return mask_secrets(project_fields(resource, fields))
+
         return {
             "metadata": resource.metadata.to_dict(),
             "spec": resource.spec.to_dict(),
@@ -89,70 +96,69 @@ async def describe_resource(namespace: str, resource_type: str, resource_name: s
             raise HTTPException(status_code=404, detail=f"{resource_type.capitalize()} '{resource_name}' not found in namespace '{namespace}'")
         raise HTTPException(status_code=500, detail=f"Error fetching resource: {str(e)}")
 
-async def list_resources_grouped_by_namespace():
+async def list_resources_grouped_by_namespace(namespace: Optional[str] = None):
     """
     Fetch all resources (pods, services, deployments) grouped by namespace.
+
+    The result is served from the informer cache when it is synced and only
+    falls back to listing against the API server otherwise.
+
+    Args:
+        namespace (str, optional): Restrict the result to a single namespace.
     """
-    try:
-        namespaces = core_v1_api.list_namespace().items
-        result = {}
-
-        for ns in namespaces:
-            namespace_name = ns.metadata.name
-
-            # Fetch resources in the namespace
-            pods = core_v1_api.list_namespaced_pod(namespace=namespace_name).items
-            services = core_v1_api.list_namespaced_service(namespace=namespace_name).items
-            deployments = apps_v1_api.list_namespaced_deployment(namespace=namespace_name).items
-
-            # Group resources by namespace
-            result[namespace_name] = {
-                "pods": [{"name": pod.metadata.name, "status": pod.status.phase} for pod in pods],
-                "services": [{"name": svc.metadata.name, "type": svc.spec.type} for svc in services],
-                "deployments": [{"name": dep.metadata.name, "replicas": dep.status.replicas} for dep in deployments],
-            }
+    cached = cached_resources_grouped_by_namespace(namespace)
+    if cached is not None:
+        return cached
 
-        return result
-    except ApiException as e:
-        raise HTTPException(status_code=e.status, detail=f"Error fetching resources: {e.reason}")
+    try:
+        return await group_resources(namespace)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
-async def stream_kubernetes_events():
-    """
-    Stream Kubernetes events in real-time.
+async def stream_kubernetes_events(event_filter: Optional[EventFilter] = None, last_event_id: Optional[str] = None):
     """
-    v1 = client.CoreV1Api()
-    w = watch.Watch()
+    Stream Kubernetes events in real-time as Server-Sent Events.
 
+    All streams share one upstream watch. Every message carries the event's
+    resourceVersion as its id, so a reconnecting client that sends
+    `Last-Event-ID` receives the buffered events it missed. A keepalive
+    comment is written whenever the stream has been idle for
+    EVENT_STREAM_HEARTBEAT seconds.
+
+    Args:
+        event_filter (EventFilter, optional): Namespace, reason, type and involvedObject kind filters.
+        last_event_id (str, optional): Resume after this event id.
+    """
+    broadcaster = get_event_broadcaster()
+    subscription = broadcaster.subscribe(event_filter, last_event_id)
+    heartbeat = get_event_heartbeat_interval()
     try:
-        # Watch events in the cluster
-        loop = asyncio.get_event_loop()
-        for event in await loop.run_in_executor(None, lambda: w.stream(core_v1_api.list_event_for_all_namespaces, timeout_seconds=5)):
-            # Format the event as a Server-Sent Event (SSE)
-            event_type = event.get("type", "UNKNOWN")
-            event_object = event.get("object", {})
-            event_name = getattr(event_object.metadata, "name", "UNKNOWN")
-            event_message = getattr(event_object, "message", "No message available")
-            yield f"data: {event_type} - {event_name} - {event_message}\n\n"
-    except Exception as e:
-        yield f"data: Error: {str(e)}\n\n"
+        while True:
+            event = await subscription.get(timeout=heartbeat)
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"id: {event.id}\nevent: {event.type}\ndata: {dumps_json(event.data).decode()}\n\n"
     finally:
-        w.stop()
+        broadcaster.unsubscribe(subscription)
 
-async def list_ingresses(namespace: str) -> list:
+async def list_ingresses(namespace: str, selectors: Optional[Selectors] = None) -> list:
     """
     Retrieves a list of Ingresses in the specified namespace.
 
     Args:
         namespace (str): The namespace to query for Ingresses.
+        selectors (Selectors, optional): Label and field selectors to apply.
 
     Returns:
         list: A list of Ingress objects in the specified namespace.
     """
     try:
         # List Ingresses in the specified namespace
-        ingresses = networking_v1_api.list_namespaced_ingress(namespace=namespace)
+        selector_kwargs, residual = (selectors or Selectors()).for_resource("ingresses")
+        ingresses = await networking_v1_api.list_namespaced_ingress(namespace=namespace, **selector_kwargs)
 
         # Extract relevant information from the Ingress objects
         ingress_list = [
@@ -165,7 +171,7 @@ async def list_ingresses(namespace: str) -> list:
                 ] if ingress.spec.rules and ingress.spec.rules[0].http else [],
                 "creation_timestamp": ingress.metadata.creation_timestamp,
             }
-            for ingress in ingresses.items
+            for ingress in filter_items(ingresses.items, residual)
         ]
 
         return ingress_list
@@ -173,36 +179,50 @@ async def list_ingresses(namespace: str) -> list:
     except ApiException as e:
         raise ApiException(f"Error retrieving Ingresses in namespace '{namespace}': {e.reason}")
 
-async def list_nodes() -> list:
+# List summaries read the parsed API server JSON directly; nodes in particular
+# carry large status blocks (e.g. cached image lists) that are costly to deserialize
+def _node_summary(node: dict) -> dict:
+    metadata, status = node.get("metadata") or {}, node.get("status") or {}
+    return {
+        "name": metadata.get("name"),
+        "status": "Ready" if any(
+            condition.get("type") == "Ready" and condition.get("status") == "True"
+            for condition in status.get("conditions") or []
+        ) else "NotReady",
+        "capacity": status.get("capacity"),
+        "allocatable": status.get("allocatable"),
+        "labels": metadata.get("labels"),
+        "creation_timestamp": metadata.get("creationTimestamp"),
+    }
+
+async def list_nodes(limit: Optional[int] = None, continue_token: Optional[str] = None, selectors: Optional[Selectors] = None) -> ListPage:
     """
     Retrieves a list of all Nodes in the Kubernetes cluster, including their status and resource usage.
 
+    Args:
+        limit (int, optional): Maximum number of nodes to return; the API server may return a continue token.
+        continue_token (str, optional): Continue token of the previous page.
+        selectors (Selectors, optional): Label and field selectors to apply.
+
     Returns:
-        list: A list of Node objects with relevant details.
+        ListPage: The Node details and the continue token for the next page.
     """
     try:
+        selector_kwargs, residual = (selectors or Selectors()).for_resource("nodes")
+        nodes = await core_v1_api.list_node(limit=limit, _continue=continue_token, _preload_content=False, **selector_kwargs)
+        return ListPage.from_list(nodes, [_node_summary(node) for node in filter_items(nodes["items"], residual)])
+    except ApiException as e:
+        raise HTTPException(status_code=e.status, detail=f"Error retrieving nodes: {e.reason}")
 
-        # List all nodes in the cluster
-        nodes = core_v1_api.list_node()
-
-        # Extract relevant information from the Node objects
-        node_list = [
-            {
-                "name": node.metadata.name,
-                "status": "Ready" if any(
-                    condition.type == "Ready" and condition.status == "True"
-                    for condition in node.status.conditions
-                ) else "NotReady",
-                "capacity": node.status.capacity,
-                "allocatable": node.status.allocatable,
-                "labels": node.metadata.labels,
-                "creation_timestamp": node.metadata.creation_timestamp,
-            }
-            for node in nodes.items
-        ]
-
-        return node_list
-
+async def stream_nodes(continue_token: Optional[str] = None, selectors: Optional[Selectors] = None):
+    """
+    Yield Node details page by page, so only one API server page is held in memory.
+    """
+    try:
+        selector_kwargs, residual = (selectors or Selectors()).for_resource("nodes")
+        async for nodes in iter_pages(core_v1_api.list_node, continue_token=continue_token, _preload_content=False, **selector_kwargs):
+            for node in filter_items(nodes["items"], residual):
+                yield _node_summary(node)
     except ApiException as e:
         raise HTTPException(status_code=e.status, detail=f"Error retrieving nodes: {e.reason}")
 
@@ -211,117 +231,307 @@ async def controller_list_storage_classes() -> list[StorageClass]:
     Controller to list all StorageClasses in the Kubernetes cluster.
     """
     try:
-        storage_classes = storage_v1_api.list_storage_class()
+        storage_classes = await storage_v1_api.list_storage_class()
         return [
             StorageClass(
                 name=sc.metadata.name,
                 namespace=None,
                 message="StorageClass retrieved successfully",
                 reason=None,
-                timestamp=sc.metadata.creation_timestamp.isoformat() if sc.metadata.creation_timestamp else None,
+                timestamp=sc.metadata.creation_timestamp,
             )
             for sc in storage_classes.items
         ]
     except client.exceptions.ApiException as e:
         raise HTTPException(status_code=e.status, detail=f"Error fetching StorageClasses: {e.reason}")
 
-async def interactive_exec(websocket: WebSocket, namespace: str, pod_name: str, container_name: str):
+async def interactive_exec(websocket: WebSocket, namespace: str, pod_name: str, container_name: str, binary: bool = False):
     """
     Controller to handle interactive WebSocket streaming to a Kubernetes container.
+
+    Output from the container is relayed as soon as it arrives, independently
+    of client input; see `ExecSession` for the message protocol.
+
+    Args:
+        websocket (WebSocket): The client connection; it is accepted once the exec stream is open.
+        namespace (str): The namespace of the pod.
+        pod_name (str): The name of the pod.
+        container_name (str): The name of the container.
+        binary (bool): Use channel-prefixed binary messages for output.
     """
+    await ExecSession(websocket, namespace, pod_name, container_name, binary=binary).run()
+
+def _api_error_message(e: ApiException) -> str:
+    # The API server explains most errors in the Status body, e.g. which container to pick
     try:
+        return json.loads(e.body).get("message") or e.reason
+    except (TypeError, ValueError, AttributeError):
+        return e.reason
+
+async def open_pod_log(
+    namespace: str,
+    pod_name: str,
+    container: Optional[str] = None,
+    follow: bool = False,
+    tail_lines: Optional[int] = None,
+    since_seconds: Optional[int] = None,
+    since_time: Optional[str] = None,
+    previous: bool = False,
+    timestamps: bool = False,
+    limit_bytes: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Open the log of a pod and return an iterator over its raw chunks.
+
+    The request is made before this function returns, so a missing pod or
+    container is raised here rather than in the middle of a response. The
+    chunks are relayed as they arrive and never buffered as a whole; closing
+    the iterator closes the upstream request (and stops following).
 
-        # Define the command to start a shell
-        exec_command = ["/bin/sh"]
+    Args:
+        namespace (str): The namespace of the pod.
+        pod_name (str): The name of the pod.
+        container (str, optional): The container; required for pods with more than one.
+        follow (bool): Keep streaming new log lines.
+        tail_lines (int, optional): Only return this many lines from the end of the log.
+        since_seconds (int, optional): Only return lines newer than this many seconds.
+        since_time (str, optional): Only return lines after this RFC 3339 timestamp.
+        previous (bool): Return the log of the previous, terminated container instance.
+        timestamps (bool): Prefix every line with its RFC 3339 timestamp.
+        limit_bytes (int, optional): Stop after this many bytes.
+
+    Returns:
+        AsyncIterator[bytes]: The log output.
 
-        # Open a WebSocket stream to the Kubernetes API
-        resp = stream.stream(
-            core_v1_api.connect_get_namespaced_pod_exec,
+    Raises:
+        HTTPException: With the API server's status if the log cannot be opened.
+    """
+    stack = contextlib.AsyncExitStack()
+    try:
+        response = await stack.enter_async_context(core_v1_api.stream_namespaced_pod_log(
             pod_name,
             namespace,
-            container=container_name,
-            command=exec_command,
-            stderr=True,
-            stdin=True,
-            stdout=True,
-            tty=True,
-            _preload_content=False,  # Disable automatic content processing
-        )
+            container=container,
+            follow=follow,
+            tail_lines=tail_lines,
+            since_seconds=since_seconds,
+            since_time=since_time,
+            previous=previous,
+            timestamps=timestamps,
+            limit_bytes=limit_bytes,
+        ))
+    except ApiException as e:
+        await stack.aclose()
+        raise HTTPException(status_code=e.status, detail=f"Error reading pod logs: {_api_error_message(e)}")
 
-        # Accept the WebSocket connection
-        await websocket.accept()
+    async def chunks() -> AsyncIterator[bytes]:
+        async with stack:
+            async for chunk in response.aiter_raw():
+                yield chunk
 
-        # Read and write data between the client and the Kubernetes pod
-        while resp.is_open():
-            # Read data from the Kubernetes stream
-            if resp.peek_stdout():
-                output = resp.read_stdout()
-                await websocket.send_text(output)
+    return chunks()
 
-            if resp.peek_stderr():
-                error = resp.read_stderr()
-                await websocket.send_text(error)
+async def _pod_log_items(namespace: str, pod_name: str, container: str, regex: Optional[re.Pattern], timestamps: bool, **log_kwargs) -> AsyncIterator[MergeItem]:
+    prefix = f"[{pod_name}/{container}] ".encode()
+    try:
+        chunks = await open_pod_log(namespace, pod_name, container, timestamps=True, **log_kwargs)
+    except HTTPException as e:
+        # Report the failing stream in-band; the other pods are still searched
+        yield b"", prefix + f"error: {e.detail}".encode() + b"\n"
+        return
+    try:
+        async for line in iter_lines(chunks):
+            key, message = split_timestamp(line)
+            if regex is not None and not regex.search(message.decode("utf-8", "replace")):
+                continue
+            yield key, prefix + (line if timestamps else message) + b"\n"
+    finally:
+        # Closing this generator must close the upstream request too
+        await chunks.aclose()
+
+async def search_pod_logs(
+    namespace: str,
+    selectors: Optional[Selectors] = None,
+    deployment: Optional[str] = None,
+    container: Optional[str] = None,
+    pattern: Optional[str] = None,
+    ignore_case: bool = False,
+    follow: bool = False,
+    tail_lines: Optional[int] = None,
+    since_seconds: Optional[int] = None,
+    since_time: Optional[str] = None,
+    timestamps: bool = False,
+    max_streams: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Search or tail the logs of every pod matching a selector or belonging to a deployment.
+
+    The log of every matching pod/container is opened concurrently and the
+    lines are merged by timestamp: exactly for finished logs, and within
+    LOG_MERGE_WINDOW for followed logs. Every line is prefixed with
+    `[pod/container]`; with a pattern only matching lines are returned. Only
+    one line per stream (and a bounded merge buffer when following) is held
+    in memory.
 
-            # Read data from the WebSocket client
-            data = await websocket.receive_text()
-            resp.write_stdin(data)
+    Args:
+        namespace (str): The namespace of the pods.
+        selectors (Selectors, optional): Label and field selectors for the pods.
+        deployment (str, optional): Only pods selected by this deployment's selector.
+        container (str, optional): Only this container; by default all containers of every pod.
+        pattern (str, optional): Regular expression a line must match.
+        ignore_case (bool): Match the pattern case-insensitively.
+        follow (bool): Keep streaming new lines.
+        tail_lines (int, optional): Lines from the end of each log.
+        since_seconds (int, optional): Only lines newer than this many seconds.
+        since_time (str, optional): Only lines after this RFC 3339 timestamp.
+        timestamps (bool): Keep the timestamp of every line in the output.
+        max_streams (int, optional): Maximum number of log streams to open (LOG_SEARCH_MAX_STREAMS).
 
-        resp.close()
-    except Exception as e:
-        await websocket.close()
-        raise HTTPException(status_code=500, detail=str(e))
+    Returns:
+        AsyncIterator[bytes]: The merged, prefixed log lines.
+
+    Raises:
+        HTTPException: 400 for an invalid pattern or selector or too many streams,
+            404 if no pod matches.
+    """
+    try:
+        regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0) if pattern else None
+    except re.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid pattern: {e}")
 
-async def list_pvcs(namespace: Optional[str] = None) -> list[PersistentVolumeClaim]:
+    selectors = selectors or Selectors()
+    try:
+        if deployment:
+            dep = await apps_v1_api.read_namespaced_deployment(deployment, namespace, _preload_content=False)
+            selectors = selectors.with_label_selector(label_selector_from_spec((dep.get("spec") or {}).get("selector")))
+        selector_kwargs, residual = selectors.for_resource("pods")
+        pods = await core_v1_api.list_namespaced_pod(namespace, _preload_content=False, **selector_kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid label selector: {e}")
+    except ApiException as e:
+        raise HTTPException(status_code=e.status, detail=f"Error resolving pods: {_api_error_message(e)}")
+
+    targets = []
+    for pod in filter_items(pods.get("items") or [], residual):
+        # Pending pods have no logs yet
+        if (pod.get("status") or {}).get("phase") == "Pending":
+            continue
+        names = [c.get("name") for c in (pod.get("spec") or {}).get("containers") or []]
+        targets.extend((pod["metadata"]["name"], name) for name in names if not container or name == container)
+    if not targets:
+        raise HTTPException(status_code=404, detail="No running pods match the selector.")
+
+    limit = min(max_streams or get_log_search_max_streams(), get_log_search_max_streams())
+    if len(targets) > limit:
+        raise HTTPException(status_code=400, detail=f"The selector matches {len(targets)} pod/container logs; at most {limit} can be searched at once. Narrow the selector or pick a container.")
+
+    log_kwargs = {"follow": follow, "tail_lines": tail_lines, "since_seconds": since_seconds, "since_time": since_time}
+    streams = [_pod_log_items(namespace, pod_name, name, regex, timestamps, **log_kwargs) for pod_name, name in targets]
+    return merge_live(streams) if follow else merge_sorted(streams)
+
+def _pvc_summary(pvc: dict) -> PersistentVolumeClaim:
+    metadata, spec, status = pvc.get("metadata") or {}, pvc.get("spec") or {}, pvc.get("status") or {}
+    return PersistentVolumeClaim(
+        name=metadata.get("name"),
+        namespace=metadata.get("namespace"),
+        status=status.get("phase"),
+        storage=(status.get("capacity") or {}).get("storage"),
+        access_modes=spec.get("accessModes"),
+        storage_class=spec.get("storageClassName"),
+    )
+
+def _list_pvcs_func(namespace: Optional[str] = None):
+    if namespace:
+        return functools.partial(core_v1_api.list_namespaced_persistent_volume_claim, namespace=namespace)
+    return core_v1_api.list_persistent_volume_claim_for_all_namespaces
+
+async def list_pvcs(namespace: Optional[str] = None, limit: Optional[int] = None, continue_token: Optional[str] = None, selectors: Optional[Selectors] = None) -> ListPage:
     """
     List PersistentVolumeClaims (PVCs) in the Kubernetes cluster.
     If a namespace is provided, list PVCs only in that namespace.
+
+    Args:
+        namespace (str, optional): Only list PVCs in this namespace.
+        limit (int, optional): Maximum number of PVCs to return; the API server may return a continue token.
+        continue_token (str, optional): Continue token of the previous page.
+        selectors (Selectors, optional): Label and field selectors to apply.
+
+    Returns:
+        ListPage: The PVCs and the continue token for the next page.
     """
     try:
-        if namespace:
-            pvcs = core_v1_api.list_namespaced_persistent_volume_claim(namespace=namespace)
-        else:
-            pvcs = core_v1_api.list_persistent_volume_claim_for_all_namespaces()
+        selector_kwargs, residual = (selectors or Selectors()).for_resource("persistentvolumeclaims")
+        pvcs = await _list_pvcs_func(namespace)(limit=limit, _continue=continue_token, _preload_content=False, **selector_kwargs)
+        return ListPage.from_list(pvcs, [_pvc_summary(pvc) for pvc in filter_items(pvcs["items"], residual)])
+    except ApiException as e:
+        raise HTTPException(status_code=e.status, detail=f"Error fetching PVCs: {e.reason}")
 
-        return [
-            PersistentVolumeClaim(
-                name=pvc.metadata.name,
-                namespace=pvc.metadata.namespace,
-                status=pvc.status.phase,
-                storage=pvc.status.capacity.get("storage") if pvc.status.capacity else None,
-                access_modes=pvc.spec.access_modes,
-                storage_class=pvc.spec.storage_class_name,
-            )
-            for pvc in pvcs.items
-        ]
+async def stream_pvcs(namespace: Optional[str] = None, continue_token: Optional[str] = None, selectors: Optional[Selectors] = None):
+    """
+    Yield PersistentVolumeClaims page by page, so only one API server page is held in memory.
+    """
+    try:
+        selector_kwargs, residual = (selectors or Selectors()).for_resource("persistentvolumeclaims")
+        async for pvcs in iter_pages(_list_pvcs_func(namespace), continue_token=continue_token, _preload_content=False, **selector_kwargs):
+            for pvc in filter_items(pvcs["items"], residual):
+                yield _pvc_summary(pvc)
     except ApiException as e:
         raise HTTPException(status_code=e.status, detail=f"Error fetching PVCs: {e.reason}")
 
-async def list_pvs(namespace: Optional[str] = None) -> list[PersistentVolume]:
+def _pv_summary(pv: dict) -> PersistentVolume:
+    metadata, spec, status = pv.get("metadata") or {}, pv.get("spec") or {}, pv.get("status") or {}
+    return PersistentVolume(
+        name=metadata.get("name"),
+        status=status.get("phase"),
+        capacity=(spec.get("capacity") or {}).get("storage"),
+        access_modes=spec.get("accessModes"),
+        reclaim_policy=spec.get("persistentVolumeReclaimPolicy"),
+        storage_class=spec.get("storageClassName"),
+        volume_mode=spec.get("volumeMode"),
+    )
+
+def _pv_selectors(namespace: Optional[str] = None, selectors: Optional[Selectors] = None):
+    selectors = selectors or Selectors()
+    if namespace:
+        # PersistentVolumes are cluster-scoped, so the namespace filter uses the bound claim
+        selectors = selectors.with_field("spec.claimRef.namespace", namespace)
+    return selectors.for_resource("persistentvolumes")
+
+async def list_pvs(namespace: Optional[str] = None, limit: Optional[int] = None, continue_token: Optional[str] = None, selectors: Optional[Selectors] = None) -> ListPage:
     """
     List PersistentVolumes (PVs) in the Kubernetes cluster.
     If a namespace is provided, filter PVs by their claimRef namespace.
+
+    The API server cannot select on the claimRef, so the namespace filter (and
+    any other unsupported field requirement) is matched on each page after it
+    is fetched; a page may hold fewer than `limit` PVs while a continue token
+    is returned.
+
+    Args:
+        namespace (str, optional): Only return PVs bound to claims in this namespace.
+        limit (int, optional): Maximum number of PVs to fetch; the API server may return a continue token.
+        continue_token (str, optional): Continue token of the previous page.
+        selectors (Selectors, optional): Label and field selectors to apply.
+
+    Returns:
+        ListPage: The PVs and the continue token for the next page.
     """
     try:
-        pvs = core_v1_api.list_persistent_volume()
-
-        # Filter PVs by namespace if provided
-        filtered_pvs = [
-            pv for pv in pvs.items
-            if not namespace or (pv.spec.claim_ref and pv.spec.claim_ref.namespace == namespace)
-        ]
+        selector_kwargs, residual = _pv_selectors(namespace, selectors)
+        pvs = await core_v1_api.list_persistent_volume(limit=limit, _continue=continue_token, _preload_content=False, **selector_kwargs)
+        return ListPage.from_list(pvs, [_pv_summary(pv) for pv in filter_items(pvs["items"], residual)])
+    except ApiException as e:
+        raise HTTPException(status_code=e.status, detail=f"Error fetching PVs: {e.reason}")
 
-        return [
-            PersistentVolume(
-                name=pv.metadata.name,
-                status=pv.status.phase,
-                capacity=pv.spec.capacity.get("storage") if pv.spec.capacity else None,
-                access_modes=pv.spec.access_modes,
-                reclaim_policy=pv.spec.persistent_volume_reclaim_policy,
-                storage_class=pv.spec.storage_class_name,
-                volume_mode=pv.spec.volume_mode,
-            )
-            for pv in filtered_pvs
-        ]
+async def stream_pvs(namespace: Optional[str] = None, continue_token: Optional[str] = None, selectors: Optional[Selectors] = None):
+    """
+    Yield PersistentVolumes page by page, so only one API server page is held in memory.
+    """
+    try:
+        selector_kwargs, residual = _pv_selectors(namespace, selectors)
+        async for pvs in iter_pages(core_v1_api.list_persistent_volume, continue_token=continue_token, _preload_content=False, **selector_kwargs):
+            for pv in filter_items(pvs["items"], residual):
+                yield _pv_summary(pv)
     except ApiException as e:
         raise HTTPException(status_code=e.status, detail=f"Error fetching PVs: {e.reason}")
 
@@ -341,11 +551,8 @@ def generate_kubeconfig(service_account_name: str, namespace: str, output_file:
         HTTPException: If the service account or related resources cannot be retrieved.
     """
     try:
-        # Load Kubernetes configuration
-        config.load_kube_config()  # Use load_incluster_config() if running inside a cluster
-
-        # Create API clients
-        core_v1_api = client.CoreV1Api()
+        # Shared, pooled client
+        core_v1_api = get_api(client.CoreV1Api)
 
         # Get the service account
         service_account = core_v1_api.read_namespaced_service_account(
@@ -365,7 +572,7 @@ def generate_kubeconfig(service_account_name: str, namespace: str, output_file:
         # Extract the token, CA certificate, and API server endpoint
         token = secret.data["token"]
         ca_cert = secret.data["ca.crt"]
-        api_server = config.kube_config.Configuration().host
+        api_server = core_v1_api.api_client.configuration.host
 
         # Decode the token and CA certificate
         token = base64.b64decode(token).decode("utf-8")
@@ -437,25 +644,22 @@ async def list_service_accounts_and_kubeconfigs(namespace: str) -> dict:
     """
     try:
         # List all service accounts in the namespace
-        service_accounts = core_v1_api.list_namespaced_service_account(namespace=namespace).items
-
-        result = {}
-        for sa in service_accounts:
-            sa_name = sa.metadata.name
+        service_accounts = (await core_v1_api.list_namespaced_service_account(namespace=namespace, _metadata_only=True)).items
 
-            # Generate kubeconfig for the service account
-            kubeconfig = generate_kubeconfig_as_dict(service_account_name=sa_name, namespace=namespace)
-
-            result[sa_name] = kubeconfig
+        # Generate a kubeconfig for every service account concurrently
+        sa_names = [sa.metadata.name for sa in service_accounts]
+        kubeconfigs = await asyncio.gather(
+            *(generate_kubeconfig_as_dict(service_account_name=sa_name, namespace=namespace) for sa_name in sa_names)
+        )
 
-        return result
+        return dict(zip(sa_names, kubeconfigs))
 
     except ApiException as e:
         raise HTTPException(status_code=e.status, detail=f"Error fetching service accounts: {e.reason}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
-def generate_kubeconfig_as_dict(service_account_name: str, namespace: str) -> dict:
+async def generate_kubeconfig_as_dict(service_account_name: str, namespace: str) -> dict:
     """
     Generate a kubeconfig for a specific service account and return it as a dictionary.
 
@@ -470,14 +674,8 @@ def generate_kubeconfig_as_dict(service_account_name: str, namespace: str) -> di
         Exception: If the service account or related resources cannot be retrieved.
     """
     try:
-        # Load Kubernetes configuration
-        config.load_kube_config()  # Use load_incluster_config() if running inside a cluster
-
-        # Create API clients
-        core_v1_api = client.CoreV1Api()
-
         # Get the service account
-        service_account = core_v1_api.read_namespaced_service_account(
+        service_account = await core_v1_api.read_namespaced_service_account(
             name=service_account_name, namespace=namespace
         )
 
@@ -486,12 +684,12 @@ def generate_kubeconfig_as_dict(service_account_name: str, namespace: str) -> di
             raise Exception(f"Service account '{service_account_name}' does not have an associated secret.")
         
         secret_name = service_account.secrets[0].name
-        secret = core_v1_api.read_namespaced_secret(name=secret_name, namespace=namespace)
+        secret = await core_v1_api.read_namespaced_secret(name=secret_name, namespace=namespace)
 
         # Extract the token, CA certificate, and API server endpoint
         token = secret.data["token"]
         ca_cert = secret.data["ca.crt"]
-        api_server = config.kube_config.Configuration().host
+        api_server = core_v1_api.api_client.configuration.host
 
         # Decode the token and CA certificate
         token = base64.b64decode(token).decode("utf-8")
@@ -549,9 +747,6 @@ def get_in_cluster_config() -> dict:
         HTTPException: If the in-cluster configuration cannot be loaded.
     """
     try:
-        # Load in-cluster configuration
-        config.load_incluster_config()
-
         # Read the service account token and CA certificate from the default paths
         with open("/var/run/secrets/kubernetes.io/serviceaccount/token", "r") as token_file:
             token = token_file.read().strip()
@@ -560,7 +755,7 @@ def get_in_cluster_config() -> dict:
             ca_cert = ca_file.read().strip()
 
         # Get the API server endpoint
-        api_server = config.kube_config.Configuration().host
+        api_server = get_client_registry().api_client().configuration.host
 
         # Construct the kubeconfig dictionary
         kubeconfig = {
@@ -600,12 +795,14 @@ def get_in_cluster_config() -> dict:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve in-cluster configuration: {str(e)}")
 
-async def get_storage_class(storage_class_name: str) -> dict:
+async def get_storage_class(storage_class_name: str, raw: bool = False, fields: Optional[List[str]] = None) -> dict:
     """
     Retrieve a specific StorageClass by name and return its full dictionary representation.
 
     Args:
         storage_class_name (str): The name of the StorageClass to retrieve.
+        raw (bool): Return the API server's JSON (camelCase) without model deserialization.
+        fields (List[str], optional): Dotted paths to keep in raw mode.
 
     Returns:
         dict: The full dictionary representation of the StorageClass.
@@ -614,8 +811,12 @@ async def get_storage_class(storage_class_name: str) -> dict:
         HTTPException: If the StorageClass cannot be found or an error occurs.
     """
     try:
+        if raw or fields:
+            storage_class = await storage_v1_api.read_storage_class(name=storage_class_name, _preload_content=False)
+            return project_fields(storage_class, fields)
+
         # Retrieve the StorageClass by name
-        storage_class = storage_v1_api.read_storage_class(name=storage_class_name)
+        storage_class = await storage_v1_api.read_storage_class(name=storage_class_name)
 
         # Convert the StorageClass object to a dictionary
         return storage_class.to_dict()
@@ -642,16 +843,17 @@ async def rollout_restart_deployment(namespace: str, deployment_name: str) -> di
         HTTPException: If the deployment cannot be found or an error occurs.
     """
     try:
-        # Retrieve the deployment
-        deployment = apps_v1_api.read_namespaced_deployment(name=deployment_name, namespace=namespace)
-
-        # Add or update an annotation to trigger a restart
-        annotations = deployment.spec.template.metadata.annotations or {}
-        annotations["kubectl.kubernetes.io/restartedAt"] = datetime.utcnow().isoformat()
-        deployment.spec.template.metadata.annotations = annotations
-
-        # Update the deployment
-        apps_v1_api.patch_namespaced_deployment(name=deployment_name, namespace=namespace, body=deployment)
+        # Add or update an annotation to trigger a restart, patching only that field
+        body = {
+            "spec": {
+                "template": {
+                    "metadata": {
+                        "annotations": {"kubectl.kubernetes.io/restartedAt": datetime.utcnow().isoformat()}
+                    }
+                }
+            }
+        }
+        await apps_v1_api.patch_namespaced_deployment(name=deployment_name, namespace=namespace, body=body)
 
         return {"message": f"Deployment '{deployment_name}' in namespace '{namespace}' restarted successfully."}
 
@@ -670,11 +872,10 @@ async def rollout_restart_deployment(namespace: str, deployment_name: str) -> di
             headers={"X-Debug-Info": error_details}
         )
 
-def create_cleanup_evicted_pods_job(namespace: str = "default", job_name: str = "cleanup-evicted-pods"):
+async def create_cleanup_evicted_pods_job(namespace: str = "default", job_name: str = "cleanup-evicted-pods"):
     """
     Create a Kubernetes Job that deletes all evicted pods in the given namespace.
     """
-    batch_v1 = client.BatchV1Api()
     # Get the service account name attached to the current pod (the API)
     service_account_name = os.environ.get("KUBERNETES_SERVICEACCOUNT", None)
     if not service_account_name:
@@ -711,18 +912,17 @@ def create_cleanup_evicted_pods_job(namespace: str = "default", job_name: str =
         },
     }
     try:
-        batch_v1.create_namespaced_job(namespace=namespace, body=job_manifest)
+        await batch_v1_api.create_namespaced_job(namespace=namespace, body=job_manifest)
         return {"message": f"Cleanup job '{job_name}' created in namespace '{namespace}'."}
     except client.exceptions.ApiException as e:
         raise HTTPException(status_code=e.status, detail=f"Failed to create cleanup job: {e.reason}")
 
-def get_secret(namespace: str, secret_name: str) -> dict:
+async def get_secret(namespace: str, secret_name: str) -> dict:
     """
     Retrieve a Kubernetes Secret and return its decoded values.
     """
     try:
-        v1 = client.CoreV1Api()
-        secret = v1.read_namespaced_secret(secret_name, namespace)
+        secret = await core_v1_api.read_namespaced_secret(secret_name, namespace)
         decoded_data = {}
         for key, value in secret.data.items():
             decoded_data[key] = base64.b64decode(value).decode("utf-8")
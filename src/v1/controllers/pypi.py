@@ -1,6 +1,5 @@
-import requests
-from requests.auth import HTTPBasicAuth
 from typing import Dict, Optional
+from base.metrics import observe_upstream
 
 def test_artifactory_repository(
     repository_url: str,
@@ -19,6 +18,10 @@ def test_artifactory_repository(
     :param skip_tls_verify: Whether to skip TLS certificate verification.
     :return: A dictionary with the test result.
     """
+    # Imported on first use, so workers that never test a repository do not load requests
+    import requests
+    from requests.auth import HTTPBasicAuth
+
     headers = {}
     auth = None
 
@@ -38,12 +41,14 @@ def test_artifactory_repository(
             repository_url += "/"
 
         # Test the repository URL
-        response = requests.get(
-            repository_url,
-            headers=headers,
-            auth=auth,
-            verify=not skip_tls_verify  # Control TLS verification
-        )
+        with observe_upstream("pypi", "GET") as observed:
+            response = requests.get(
+                repository_url,
+                headers=headers,
+                auth=auth,
+                verify=not skip_tls_verify  # Control TLS verification
+            )
+            observed["status"] = str(response.status_code)
 
         # Check the response status
         if response.status_code == 200:
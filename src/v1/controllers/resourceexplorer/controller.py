@@ -1,83 +1,99 @@
+import logging
 from fastapi import HTTPException
 from kubernetes.client.exceptions import ApiException
-from kubernetes import client, config
+from kubernetes import client
 from typing import List, Dict, Optional
 from v1.models.models import ResourceType
-from base.k8s_config import load_k8s_config
+from base.k8s_client import AsyncAppsV1Api, AsyncCoreV1Api
+from base.pagination import ListPage, iter_pages
+from base.selectors import Selectors, filter_items
+from base.informer import cached_namespace_names, cached_resources_grouped_by_namespace
+from v1.controllers.grouping import group_resources
 
-# Load Kubernetes Configurations
-load_k8s_config()
-core_v1_api = client.CoreV1Api()
-apps_v1_api = client.AppsV1Api()
+logger = logging.getLogger(__name__)
 
-def get_all_namespaces() -> List[str]:
+core_v1_api = AsyncCoreV1Api()
+apps_v1_api = AsyncAppsV1Api()
+
+async def get_all_namespaces() -> List[str]:
     """
     List all namespaces in the Kubernetes cluster.
     
     Returns:
         List[str]: A list of namespace names.
     """
+    cached = cached_namespace_names()
+    if cached is not None:
+        return cached
+
     try:
-        namespaces = core_v1_api.list_namespace()
+        namespaces = await core_v1_api.list_namespace(_metadata_only=True)
         namespace_names = [ns.metadata.name for ns in namespaces.items]
         return namespace_names
     except client.exceptions.ApiException as e:
-        print(f"Error listing namespaces: {e}")
+        logger.error(f"Error listing namespaces: {e}")
         return []
 
-def get_all_secrets() -> List[Dict[str, str]]:
+def _secret_name(secret: dict) -> Dict[str, str]:
+    metadata = secret.get("metadata") or {}
+    return {"name": metadata.get("name"), "namespace": metadata.get("namespace")}
+
+async def get_all_secrets(limit: Optional[int] = None, continue_token: Optional[str] = None, selectors: Optional[Selectors] = None) -> ListPage:
     """
     List all secrets in the Kubernetes cluster.
-    
+
+    Args:
+        limit (int, optional): Maximum number of secrets to return; the API server may return a continue token.
+        continue_token (str, optional): Continue token of the previous page.
+        selectors (Selectors, optional): Label and field selectors to apply.
+
     Returns:
-        List[Dict[str, str]]: A list of secret names and their corresponding namespaces.
+        ListPage: Secret names and their corresponding namespaces, and the continue token for the next page.
     """
     try:
-        secrets = core_v1_api.list_secret_for_all_namespaces()
-        secret_names = [{"name": secret.metadata.name, "namespace": secret.metadata.namespace} for secret in secrets.items]
-        return secret_names
+        selector_kwargs, residual = (selectors or Selectors()).for_resource("secrets")
+        # Only names are returned, so skip transferring the secret payloads
+        secrets = await core_v1_api.list_secret_for_all_namespaces(
+            limit=limit, _continue=continue_token, _metadata_only=residual is None, _preload_content=False, **selector_kwargs
+        )
+        secret_names = [_secret_name(secret) for secret in filter_items(secrets["items"], residual)]
+        return ListPage.from_list(secrets, secret_names)
     except client.exceptions.ApiException as e:
-        print(f"Error listing secrets: {e}")
-        return []
+        logger.error(f"Error listing secrets: {e}")
+        return ListPage()
 
-def list_resources_grouped_by_namespace():
+async def stream_secrets(continue_token: Optional[str] = None, selectors: Optional[Selectors] = None):
     """
-    Fetch all resources (pods, services, deployments) grouped by namespace.
+    Yield secret names and namespaces page by page, so only one API server page is held in memory.
     """
     try:
-        namespaces = core_v1_api.list_namespace().items
-        result = {}
-
-        for ns in namespaces:
-            namespace_name = ns.metadata.name
-
-            # Fetch resources in the namespace
-            pods = core_v1_api.list_namespaced_pod(namespace=namespace_name).items
-            services = core_v1_api.list_namespaced_service(namespace=namespace_name).items
-            deployments = apps_v1_api.list_namespaced_deployment(namespace=namespace_name).items
-
-            # Group resources by namespace
-            result[namespace_name] = {
-                "pods": [{"name": pod.metadata.name, "status": pod.status.phase} for pod in pods],
-                "services": [{"name": svc.metadata.name, "type": svc.spec.type} for svc in services],
-                "deployments": [{"name": dep.metadata.name, "replicas": dep.status.replicas} for dep in deployments],
-            }
+        selector_kwargs, residual = (selectors or Selectors()).for_resource("secrets")
+        async for secrets in iter_pages(
+            core_v1_api.list_secret_for_all_namespaces,
+            continue_token=continue_token,
+            _metadata_only=residual is None,
+            _preload_content=False,
+            **selector_kwargs,
+        ):
+            for secret in filter_items(secrets["items"], residual):
+                yield _secret_name(secret)
+    except client.exceptions.ApiException as e:
+        logger.error(f"Error listing secrets: {e}")
 
-        return result
+async def list_resources_grouped_by_namespace():
+    """
+    Fetch all resources (pods, services, deployments) grouped by namespace.
+    """
+    cached = cached_resources_grouped_by_namespace()
+    if cached is not None:
+        return cached
 
-    except ApiException as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching resources: {str(e)}")
+    return await group_resources()
 
-def delete_deployment(namespace: str, deployment_name: str):
+async def delete_deployment(namespace: str, deployment_name: str):
     try:
-        # Load Kubernetes configuration
-        config.load_kube_config()
-
-        # Create an API client for deployments
-        apps_v1 = client.AppsV1Api()
-
         # Delete the deployment
-        response = apps_v1.delete_namespaced_deployment(
+        response = await apps_v1_api.delete_namespaced_deployment(
             name=deployment_name,
             namespace=namespace,
             body=client.V1DeleteOptions()
@@ -89,7 +105,7 @@ def delete_deployment(namespace: str, deployment_name: str):
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
 
-def delete_resource(namespace: Optional[str], resource_name: str, resource_type: ResourceType, force: bool) -> dict:
+async def delete_resource(namespace: Optional[str], resource_name: str, resource_type: ResourceType, force: bool) -> dict:
     """
     Delete a Kubernetes resource.
 
@@ -108,40 +124,40 @@ def delete_resource(namespace: Optional[str], resource_name: str, resource_type:
     try:
         if resource_type == ResourceType.PERSISTENTVOLUME:
             # Delete PersistentVolume (cluster-wide resource)
-            response = core_v1_api.delete_persistent_volume(name=resource_name)
+            response = await core_v1_api.delete_persistent_volume(name=resource_name)
         elif resource_type == ResourceType.PERSISTENTVOLUMECLAIM:
             # Delete PersistentVolumeClaim (namespace-scoped resource)
-            response = core_v1_api.delete_namespaced_persistent_volume_claim(
+            response = await core_v1_api.delete_namespaced_persistent_volume_claim(
                 name=resource_name, namespace=namespace
             )
         elif resource_type == ResourceType.DEPLOYMENT:
             # Delete Deployment (namespace-scoped resource)
-            response = apps_v1_api.delete_namespaced_deployment(
+            response = await apps_v1_api.delete_namespaced_deployment(
                 name=resource_name, namespace=namespace
             )
         elif resource_type == ResourceType.STATEFULSET:
             # Delete StatefulSet (namespace-scoped resource)
-            response = apps_v1_api.delete_namespaced_stateful_set(
+            response = await apps_v1_api.delete_namespaced_stateful_set(
                 name=resource_name, namespace=namespace
             )
         elif resource_type == ResourceType.REPLICASET:
             # Delete ReplicaSet (namespace-scoped resource)
-            response = apps_v1_api.delete_namespaced_replica_set(
+            response = await apps_v1_api.delete_namespaced_replica_set(
                 name=resource_name, namespace=namespace
             )
         elif resource_type == ResourceType.POD:
             # Delete Pod (namespace-scoped resource)
-            response = core_v1_api.delete_namespaced_pod(
+            response = await core_v1_api.delete_namespaced_pod(
                 name=resource_name, namespace=namespace
             )
         elif resource_type == ResourceType.SERVICE:
             # Delete Service (namespace-scoped resource)
-            response = core_v1_api.delete_namespaced_service(
+            response = await core_v1_api.delete_namespaced_service(
                 name=resource_name, namespace=namespace
             )
         elif resource_type == ResourceType.NAMESPACE:
             # Delete Namespace (cluster-wide resource)
-            response = core_v1_api.delete_namespace(name=resource_name)
+            response = await core_v1_api.delete_namespace(name=resource_name)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1,9 +1,17 @@
-import boto3
-from botocore.exceptions import NoCredentialsError, PartialCredentialsError, ClientError
 from fastapi import HTTPException
+from base.metrics import observe_upstream
+from base.tracing import instrument_boto3
 
-s3_client_auth = boto3.client("iam")
+def _create_client(service_name: str, **kwargs):
+    """
+    Create a boto3 client. boto3 and botocore are imported on first use, so workers that never call S3 do not load them.
+    """
+    import boto3
 
+    instrument_boto3()
+    return boto3.client(service_name, **kwargs)
+
+@observe_upstream("s3", "test_s3_account")
 def test_s3_account(access_key: str, secret_key: str, endpoint_url: str = None, secure_flag: bool = True, cert_check: bool = True) -> dict:
     """
     Tests an S3-compatible account by validating the provided credentials using boto3.
@@ -18,12 +26,14 @@ def test_s3_account(access_key: str, secret_key: str, endpoint_url: str = None,
     Returns:
         dict: A dictionary containing the status and message of the validation.
     """
+    from botocore.exceptions import NoCredentialsError, PartialCredentialsError, ClientError
+
     if not access_key or not secret_key:
         raise HTTPException(status_code=400, detail="Access key and secret key are required.")
 
     try:
         # Create an S3 client with the provided credentials and optional endpoint URL
-        s3_client = boto3.client(
+        s3_client = _create_client(
             "s3",
             aws_access_key_id=access_key,
             aws_secret_access_key=secret_key,
@@ -46,13 +56,16 @@ def test_s3_account(access_key: str, secret_key: str, endpoint_url: str = None,
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
     
+@observe_upstream("s3", "create_user")
 def create_user(access_key: str, secret_key: str, username: str, policy_arn: str = None, endpoint_url: str = None, secure_flag: bool = True, cert_check: bool = True):
     """
     Create a new S3 user and optionally attach a policy.
     """
+    from botocore.exceptions import ClientError
+
     try:
         # Create an IAM client with the provided credentials and optional endpoint URL
-        s3_client_auth = boto3.client(
+        s3_client_auth = _create_client(
             "iam",
             aws_access_key_id=access_key,
             aws_secret_access_key=secret_key,
@@ -78,13 +91,16 @@ def create_user(access_key: str, secret_key: str, username: str, policy_arn: str
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@observe_upstream("s3", "get_user")
 def get_user(access_key: str, secret_key: str, username: str, endpoint_url: str = None, secure_flag: bool = True, cert_check: bool = True):
     """
     Get details of an S3 user.
     """
+    from botocore.exceptions import ClientError
+
     try:
         # Create an IAM client with the provided credentials and optional endpoint URL
-        s3_client_auth = boto3.client(
+        s3_client_auth = _create_client(
             "iam",
             aws_access_key_id=access_key,
             aws_secret_access_key=secret_key,
@@ -104,13 +120,16 @@ def get_user(access_key: str, secret_key: str, username: str, endpoint_url: str
         raise HTTPException(status_code=404, detail=str(e))
 
 
+@observe_upstream("s3", "update_user")
 def update_user(access_key: str, secret_key: str, username: str, new_username: str, endpoint_url: str = None, secure_flag: bool = True, cert_check: bool = True):
     """
     Update an S3 user (e.g., rename the user).
     """
+    from botocore.exceptions import ClientError
+
     try:
         # Create an IAM client with the provided credentials and optional endpoint URL
-        s3_client_auth = boto3.client(
+        s3_client_auth = _create_client(
             "iam",
             aws_access_key_id=access_key,
             aws_secret_access_key=secret_key,
@@ -125,13 +144,16 @@ def update_user(access_key: str, secret_key: str, username: str, new_username: s
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@observe_upstream("s3", "delete_user")
 def delete_user(access_key: str, secret_key: str, username: str, endpoint_url: str = None, secure_flag: bool = True, cert_check: bool = True):
     """
     Delete an S3 user.
     """
+    from botocore.exceptions import ClientError
+
     try:
         # Create an IAM client with the provided credentials and optional endpoint URL
-        s3_client_auth = boto3.client(
+        s3_client_auth = _create_client(
             "iam",
             aws_access_key_id=access_key,
             aws_secret_access_key=secret_key,
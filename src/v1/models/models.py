@@ -120,7 +120,7 @@ class StorageClass(BaseModel):
     namespace: Optional[str]
     message: str
     reason: Optional[str]
-    timestamp: Optional[str]
+    timestamp: Optional[datetime]
 
 class DeleteDeploymentRequest(BaseModel):
     namespace: str
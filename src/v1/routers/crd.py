@@ -1,8 +1,13 @@
-from fastapi import APIRouter, HTTPException
-from v1.controllers.crd import CRDManager
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from base.pagination import ListPage, ndjson_response, wants_ndjson
+from base.selectors import Selectors, selector_query
+from base.utils import parse_fields
+from base.crd_index import get_crd_index
+from base.responses import FastJSONResponse
+from v1.controllers.crd import get_crd_manager
 from v1.models.models import CRDItemRequest
-from pydantic import BaseModel, create_model
-from typing import List, Optional, Dict, Any
+from typing import Optional
 
 router = APIRouter(prefix="/crds", tags=["Custom Resources"])
 
@@ -11,92 +16,137 @@ def list_crds():
     """
     API endpoint to list all Custom Resource Definitions (CRDs).
     """
-    crd_manager = CRDManager()
-    return crd_manager.list_crds()
+    # Served from the CRD index, which the CRD informer keeps current
+    return [{"name": crd["name"], "group": crd["group"], "version": crd["versions"][0]} for crd in get_crd_index().list() if crd.get("versions")]
 
 @router.post("/items")
-def get_items_from_crd(request: CRDItemRequest):
+async def get_items_from_crd(
+    request: CRDItemRequest,
+    http_request: Request,
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of items to return"),
+    continue_token: Optional[str] = Query(None, alias="continue", description="Continue token from the X-Continue-Token header of the previous page"),
+    selectors: Selectors = Depends(selector_query),
+    fields: Optional[str] = Query(None, description="Comma-separated dotted paths to keep of every item, e.g. 'metadata.name,spec'"),
+):
     """
     API endpoint to get items from a specific CRD.
+    Send `Accept: application/x-ndjson` to stream one item per line instead.
     """
-    crd_manager = CRDManager()
+    crd_manager = get_crd_manager()
 
-    return crd_manager.get_crd_items(
+    if wants_ndjson(http_request):
+        return await ndjson_response(crd_manager.iter_crd_items(
+            group=request.group,
+            version=request.version,
+            plural=request.plural,
+            namespace=request.namespace,
+            continue_token=continue_token,
+            selectors=selectors,
+            fields=parse_fields(fields),
+        ))
+
+    items = await run_in_threadpool(
+        crd_manager.get_crd_items,
         group=request.group,
         version=request.version,
         plural=request.plural,
         namespace=request.namespace,
+        limit=limit,
+        continue_token=continue_token,
+        selectors=selectors,
+        fields=parse_fields(fields),
     )
+    # Large bodies: serialize directly instead of running jsonable_encoder first
+    response = FastJSONResponse(items)
+    ListPage.from_list(items, []).apply_headers(response)
+    return response
 
 @router.get("/{group}/{version}/{plural}/{namespace}")
-def list_namespaced_crd_items(group: str, version: str, plural: str, namespace: str):
+def list_namespaced_crd_items(
+    group: str,
+    version: str,
+    plural: str,
+    namespace: str,
+    selectors: Selectors = Depends(selector_query),
+    fields: Optional[str] = Query(None, description="Comma-separated dotted paths to keep of every item"),
+):
     """
     List items from a namespaced CRD.
     """
-    return crd_manager.get_crd_items(group=group, version=version, plural=plural, namespace=namespace)
+    return get_crd_manager().get_crd_items(group=group, version=version, plural=plural, namespace=namespace, selectors=selectors, fields=parse_fields(fields))
 
 @router.get("/{group}/{version}/{plural}/{namespace}/{name}")
 def get_namespaced_crd_item(group: str, version: str, plural: str, namespace: str, name: str):
     """
     Get a specific item from a namespaced CRD.
     """
-    items = crd_manager.get_crd_items(group=group, version=version, plural=plural, namespace=namespace)
-    return next((item for item in items.get("items", []) if item["metadata"]["name"] == name), None)
+    return get_crd_manager().get_crd_item(group=group, version=version, plural=plural, name=name, namespace=namespace)
 
-# Dynamically create and add CRD routes
-crd_manager = CRDManager()
-for group_name, function in crd_manager.create_dynamic_crd_functions().items():
-    # Dynamically create a generic model for each CRD
-    crd_model_name = f"{group_name.capitalize()}Model"
-    crd_model = create_model(
-        crd_model_name,
-        apiVersion=(Optional[str], None),
-        kind=(Optional[str], None),
-        metadata=(Optional[Dict[str, Any]], None),
-        items=(Optional[List[Dict[str, Any]]], None),
-        group=(Optional[str], None),
-        version=(Optional[str], None),
-        plural=(Optional[str], None),
-        __base__=BaseModel,
-    )
+def resolve_crd(plural: str) -> dict:
+    """
+    Look up the CRD served under `/crds/{plural}`.
 
-    plural = function.__annotations__.get("plural", group_name[5:] if group_name.startswith("list_") else group_name[4:])
+    Raises:
+        HTTPException: 404 if no CRD has this name, 409 if the plural is served by several groups.
+    """
+    matches = get_crd_index().resolve(plural)
+    if not matches:
+        raise HTTPException(status_code=404, detail=f"No custom resource definition named '{plural}'.")
+    if len(matches) > 1:
+        names = ", ".join(sorted(crd["name"] for crd in matches))
+        raise HTTPException(status_code=409, detail=f"'{plural}' is served by several groups; use one of: {names}.")
+    return matches[0]
 
-    if group_name.startswith("list_"):
-        if "namespace" in function.__code__.co_varnames:
-            # Namespaced CRD
-            router.add_api_route(
-                f"/{plural}/{{namespace}}",
-                function,
-                methods=["GET"],
-                name=f"List {plural}",
-                response_model=crd_model,
-            )
-        else:
-            # Non-namespaced CRD
-            router.add_api_route(
-                f"/{plural}",
-                function,
-                methods=["GET"],
-                name=f"List {plural}",
-                response_model=crd_model,
-            )
-    elif group_name.startswith("get_"):
-        if "namespace" in function.__code__.co_varnames:
-            # Namespaced CRD
-            router.add_api_route(
-                f"/{plural}/{{namespace}}/{{name}}",
-                function,
-                methods=["GET"],
-                name=f"Get {plural}",
-                response_model=crd_model,
-            )
-        else:
-            # Non-namespaced CRD
-            router.add_api_route(
-                f"/{plural}/{{name}}",
-                function,
-                methods=["GET"],
-                name=f"Get {plural}",
-                response_model=crd_model,
-            )
\ No newline at end of file
+def _crd_response(crd: dict, content: Optional[dict]):
+    # The CRD's model is built on its first response
+    if content is None:
+        raise HTTPException(status_code=404, detail=f"{crd['kind']} not found.")
+    return get_crd_index().get_model(crd).model_validate(content)
+
+@router.get("/{plural}")
+def list_crd_objects(
+    plural: str,
+    version: Optional[str] = Query(None, description="API version to read, defaults to the first served version"),
+    selectors: Selectors = Depends(selector_query),
+    fields: Optional[str] = Query(None, description="Comma-separated dotted paths to keep of every item"),
+):
+    """
+    List the objects of a CRD, across all namespaces for a namespaced CRD.
+    The CRD is addressed by plural, `plural.group` or `group_plural` (dots replaced by underscores).
+    """
+    crd = resolve_crd(plural)
+    items = get_crd_manager().get_crd_items(group=crd["group"], version=version or crd["versions"][0], plural=crd["plural"], selectors=selectors, fields=parse_fields(fields))
+    return _crd_response(crd, items)
+
+@router.get("/{plural}/{namespace_or_name}")
+def get_crd_objects(
+    plural: str,
+    namespace_or_name: str,
+    version: Optional[str] = Query(None, description="API version to read, defaults to the first served version"),
+    selectors: Selectors = Depends(selector_query),
+    fields: Optional[str] = Query(None, description="Comma-separated dotted paths to keep of every item"),
+):
+    """
+    List the objects of a namespaced CRD in a namespace, or get a cluster-scoped object by name.
+    """
+    crd = resolve_crd(plural)
+    version = version or crd["versions"][0]
+    if crd["scope"] == "Namespaced":
+        items = get_crd_manager().get_crd_items(group=crd["group"], version=version, plural=crd["plural"], namespace=namespace_or_name, selectors=selectors, fields=parse_fields(fields))
+        return _crd_response(crd, items)
+    return _crd_response(crd, get_crd_manager().get_crd_item(group=crd["group"], version=version, plural=crd["plural"], name=namespace_or_name))
+
+@router.get("/{plural}/{namespace}/{name}")
+def get_namespaced_crd_object(
+    plural: str,
+    namespace: str,
+    name: str,
+    version: Optional[str] = Query(None, description="API version to read, defaults to the first served version"),
+):
+    """
+    Get an object of a namespaced CRD by name.
+    """
+    crd = resolve_crd(plural)
+    if crd["scope"] != "Namespaced":
+        raise HTTPException(status_code=404, detail=f"{crd['kind']} is cluster-scoped; use /crds/{plural}/{{name}}.")
+    return _crd_response(crd, get_crd_manager().get_crd_item(group=crd["group"], version=version or crd["versions"][0], plural=crd["plural"], name=name, namespace=namespace))
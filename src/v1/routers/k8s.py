@@ -1,5 +1,5 @@
-from fastapi import APIRouter, HTTPException, WebSocket, Query, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, WebSocket, Query, Depends, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from kubernetes.client.exceptions import ApiException
 from v1.models.models import ResourceDetail, NotFoundResponse, StorageClass, PersistentVolumeClaim, PersistentVolume, KubeconfigResponse, KubeconfigRequest, SecretRequest, SecretResponse
 from v1.controllers.k8s import (
@@ -8,16 +8,29 @@ from v1.controllers.k8s import (
     list_resources_grouped_by_namespace as controller_list_resources_grouped_by_namespace,
     list_ingresses as controller_list_ingresses,
     list_nodes as controller_list_nodes,
+    stream_nodes as controller_stream_nodes,
     controller_list_storage_classes,  # Ensure the correct import
     interactive_exec,
     get_in_cluster_config,
-    list_pvcs, list_pvs, generate_kubeconfig, list_service_accounts_and_kubeconfigs,
+    list_pvcs, list_pvs, stream_pvcs, stream_pvs, generate_kubeconfig, generate_kubeconfig_as_dict, list_service_accounts_and_kubeconfigs,
     rollout_restart_deployment,
     create_cleanup_evicted_pods_job,
-    get_secret
+    get_secret,
+    stream_kubernetes_events as controller_stream_kubernetes_events,
+    open_pod_log,
+    search_pod_logs,
 )
 from utils.auth import validate_token
+from base.events import EventFilter
+from base.log_stream import log_stream_response
+from base.pagination import ndjson_response, wants_ndjson
+from base.selectors import Selectors, selector_query
+from base.utils import parse_fields
+from base.responses import ClosingStreamingResponse, FastJSONResponse
 from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
 
 k8s_resources_router = APIRouter(
     prefix="/k8s",
@@ -49,22 +62,53 @@ async def create_kubeconfig(request: KubeconfigRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @k8s_resources_router.get("/resourcetypes", response_model=dict)
-async def list_resource_types():
+async def list_resource_types(refresh: bool = Query(False, description="Bypass the discovery cache")):
     """
     API endpoint to list all available resource types in the Kubernetes cluster.
     """
     try:
-        return controller_get_all_resource_types()
+        return FastJSONResponse(await controller_get_all_resource_types(refresh=refresh))
     except HTTPException as e:
         raise e
     
+@k8s_resources_router.get("/events/stream", response_class=StreamingResponse)
+async def stream_events(
+    request: Request,
+    namespace: Optional[str] = Query(None, description="Only events in these namespaces (comma separated)"),
+    reason: Optional[str] = Query(None, description="Only events with these reasons, e.g. 'BackOff,Failed'"),
+    type: Optional[str] = Query(None, description="Only events of these types, e.g. 'Warning'"),
+    kind: Optional[str] = Query(None, description="Only events whose involvedObject has one of these kinds"),
+):
+    """
+    API endpoint streaming cluster events as Server-Sent Events.
+
+    Reconnecting clients send the `Last-Event-ID` header (EventSource does
+    this automatically) to receive the events they missed.
+    """
+    event_filter = EventFilter.from_query(namespace, reason, type, kind)
+    return ClosingStreamingResponse(
+        controller_stream_kubernetes_events(event_filter, request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @k8s_resources_router.get("/{namespace}/{resource_type}/{resource_name}", response_model=ResourceDetail, responses={404: {"model": NotFoundResponse}})
-async def get_resource_details(namespace: str, resource_type: str, resource_name: str):
+async def get_resource_details(
+    namespace: str,
+    resource_type: str,
+    resource_name: str,
+    raw: bool = Query(False, description="Return the API server's JSON (masked) without model conversion"),
+    fields: Optional[str] = Query(None, description="Comma-separated dotted paths to keep, e.g. 'metadata.name,status.phase'; implies raw"),
+):
     """
     API endpoint to get details of a specific Kubernetes resource.
     """
     try:
-        resource_detail = await controller_describe_resource(namespace, resource_type, resource_name)
+        fields = parse_fields(fields)
+        resource_detail = await controller_describe_resource(namespace, resource_type, resource_name, raw=raw, fields=fields)
+        if raw or fields:
+            # Already masked and shaped; skip ResourceDetail validation
+            return FastJSONResponse(resource_detail)
         return resource_detail
     except HTTPException as e:
         if e.status_code == 404:
@@ -73,11 +117,11 @@ async def get_resource_details(namespace: str, resource_type: str, resource_name
 
 
 @k8s_resources_router.get("/resources", response_model=dict)
-def get_resources_grouped_by_namespace():
+async def get_resources_grouped_by_namespace():
     """
     API endpoint to list all Kubernetes resources grouped by namespace.
     """
-    return controller_list_resources_grouped_by_namespace()
+    return FastJSONResponse(await controller_list_resources_grouped_by_namespace())
 
 @k8s_resources_router.get("/{namespace}/resources", response_model=dict)
 async def list_resources_by_namespace(namespace: str):
@@ -85,19 +129,19 @@ async def list_resources_by_namespace(namespace: str):
     API endpoint to list all Kubernetes resources in a specific namespace.
     """
     try:
-        all_resources = await controller_list_resources_grouped_by_namespace()
+        all_resources = await controller_list_resources_grouped_by_namespace(namespace)
         namespace_resources = all_resources.get(namespace, {})
-        return {"namespace": namespace, "resources": namespace_resources}
+        return FastJSONResponse({"namespace": namespace, "resources": namespace_resources})
     except ApiException as e:
         raise HTTPException(status_code=e.status, detail=e.reason)
 
 @k8s_resources_router.get("/{namespace}/ingresses", response_model=dict)
-async def list_ingresses(namespace: str):
+async def list_ingresses(namespace: str, selectors: Selectors = Depends(selector_query)):
     """
     API endpoint to list all Ingresses in a specific namespace.
     """
     try:
-        ingresses = await controller_list_ingresses(namespace)
+        ingresses = await controller_list_ingresses(namespace, selectors)
         return {"namespace": namespace, "ingresses": ingresses}
     except ApiException as e:
         raise HTTPException(status_code=e.status, detail=e.reason)
@@ -115,6 +159,60 @@ async def list_services(namespace: str):
     except ApiException as e:
         raise HTTPException(status_code=e.status, detail=e.reason)
     
+@k8s_resources_router.get("/{namespace}/logs", response_class=StreamingResponse)
+async def search_logs(
+    request: Request,
+    namespace: str,
+    selectors: Selectors = Depends(selector_query),
+    deployment: Optional[str] = Query(None, description="Search the pods of this deployment"),
+    container: Optional[str] = Query(None, description="Only this container; by default all containers"),
+    pattern: Optional[str] = Query(None, description="Regular expression a line must match"),
+    ignore_case: bool = Query(False, description="Match the pattern case-insensitively"),
+    follow: bool = Query(False, description="Keep streaming new log lines"),
+    tail_lines: Optional[int] = Query(None, ge=0, description="Lines from the end of each log"),
+    since_seconds: Optional[int] = Query(None, ge=1, description="Only return lines newer than this many seconds"),
+    since_time: Optional[str] = Query(None, description="Only return lines after this RFC 3339 timestamp"),
+    timestamps: bool = Query(False, description="Keep the timestamp of every line"),
+    max_streams: Optional[int] = Query(None, ge=1, description="Maximum number of pod/container logs to open"),
+):
+    """
+    API endpoint searching or tailing the logs of all pods matching a label selector or deployment.
+
+    Lines of all pods are merged by timestamp and prefixed with `[pod/container]`.
+    """
+    if since_seconds and since_time:
+        raise HTTPException(status_code=400, detail="Only one of since_seconds and since_time can be set.")
+    chunks = await search_pod_logs(
+        namespace, selectors, deployment, container, pattern, ignore_case,
+        follow, tail_lines, since_seconds, since_time, timestamps, max_streams,
+    )
+    return log_stream_response(request, chunks)
+
+@k8s_resources_router.get("/{namespace}/pods/{pod_name}/logs", response_class=StreamingResponse)
+async def get_pod_logs(
+    request: Request,
+    namespace: str,
+    pod_name: str,
+    container: Optional[str] = Query(None, description="The container; required for pods with more than one"),
+    follow: bool = Query(False, description="Keep streaming new log lines"),
+    tail_lines: Optional[int] = Query(None, ge=0, description="Only return this many lines from the end of the log"),
+    since_seconds: Optional[int] = Query(None, ge=1, description="Only return lines newer than this many seconds"),
+    since_time: Optional[str] = Query(None, description="Only return lines after this RFC 3339 timestamp"),
+    previous: bool = Query(False, description="Return the log of the previous, terminated container"),
+    timestamps: bool = Query(False, description="Prefix every line with its timestamp"),
+    limit_bytes: Optional[int] = Query(None, ge=1, description="Stop after this many bytes"),
+):
+    """
+    API endpoint streaming the log of a pod.
+
+    Returns chunked plain text, or one Server-Sent Event per line when the
+    client accepts `text/event-stream`; compressed when the client accepts gzip.
+    """
+    if since_seconds and since_time:
+        raise HTTPException(status_code=400, detail="Only one of since_seconds and since_time can be set.")
+    chunks = await open_pod_log(namespace, pod_name, container, follow, tail_lines, since_seconds, since_time, previous, timestamps, limit_bytes)
+    return log_stream_response(request, chunks)
+
 @k8s_resources_router.get("/jobs", response_model=dict)
 async def list_all_jobs():
     """
@@ -177,13 +275,23 @@ async def list_secrets(namespace: str):
         raise HTTPException(status_code=e.status, detail=e.reason)
     
 @k8s_resources_router.get("/nodes", response_model=dict)
-async def list_nodes():
+async def list_nodes(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of nodes to return"),
+    continue_token: Optional[str] = Query(None, alias="continue", description="Continue token from the X-Continue-Token header of the previous page"),
+    selectors: Selectors = Depends(selector_query),
+):
     """
     API endpoint to list all Nodes in the Kubernetes cluster, including their status and resource usage.
+    Send `Accept: application/x-ndjson` to stream one node per line instead.
     """
     try:
-        nodes = await controller_list_nodes()
-        return {"nodes": nodes}
+        if wants_ndjson(request):
+            return await ndjson_response(controller_stream_nodes(continue_token, selectors))
+        page = await controller_list_nodes(limit, continue_token, selectors)
+        page.apply_headers(response)
+        return {"nodes": page.items}
     except ApiException as e:
         raise HTTPException(status_code=e.status, detail=e.reason)
 
@@ -211,43 +319,73 @@ async def list_storage_classes():
         raise HTTPException(status_code=e.status, detail=e.reason)
 
 @k8s_resources_router.get("/storageclasses/{storage_class_name}", response_model=dict, tags=["StorageClasses"])
-async def get_k8s_storage_class(storage_class_name: str):
+async def get_k8s_storage_class(
+    storage_class_name: str,
+    raw: bool = Query(False, description="Return the API server's JSON without model conversion"),
+    fields: Optional[str] = Query(None, description="Comma-separated dotted paths to keep; implies raw"),
+):
     """
     Retrieve a specific StorageClass by name.
 
     Args:
         storage_class_name (str): The name of the StorageClass to retrieve.
+        raw (bool): Return the API server's JSON without model conversion.
+        fields (str, optional): Comma-separated dotted paths to keep.
 
     Returns:
         dict: The full dictionary representation of the StorageClass.
     """
     try:
         from v1.controllers.k8s import get_storage_class
-        return await get_storage_class(storage_class_name)
+        return await get_storage_class(storage_class_name, raw=raw, fields=parse_fields(fields))
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @k8s_resources_router.get("/pvcs", response_model=list[PersistentVolumeClaim])
-async def get_pvcs(namespace: Optional[str] = None):
+async def get_pvcs(
+    request: Request,
+    response: Response,
+    namespace: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of PVCs to return"),
+    continue_token: Optional[str] = Query(None, alias="continue", description="Continue token from the X-Continue-Token header of the previous page"),
+    selectors: Selectors = Depends(selector_query),
+):
     """
     API endpoint to list PersistentVolumeClaims (PVCs) in the Kubernetes cluster.
     If a namespace is provided, list PVCs only in that namespace.
+    Send `Accept: application/x-ndjson` to stream one PVC per line instead.
     """
     try:
-        return await list_pvcs(namespace)
+        if wants_ndjson(request):
+            return await ndjson_response(stream_pvcs(namespace, continue_token, selectors))
+        page = await list_pvcs(namespace, limit, continue_token, selectors)
+        page.apply_headers(response)
+        return page.items
     except HTTPException as e:
         raise e
 
 @k8s_resources_router.get("/pvs", response_model=list[PersistentVolume])
-async def get_pvs(namespace: Optional[str] = None):
+async def get_pvs(
+    request: Request,
+    response: Response,
+    namespace: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of PVs to return"),
+    continue_token: Optional[str] = Query(None, alias="continue", description="Continue token from the X-Continue-Token header of the previous page"),
+    selectors: Selectors = Depends(selector_query),
+):
     """
     API endpoint to list PersistentVolumes (PVs) in the Kubernetes cluster.
     If a namespace is provided, filter PVs by their claimRef namespace.
+    Send `Accept: application/x-ndjson` to stream one PV per line instead.
     """
     try:
-        return await list_pvs(namespace)
+        if wants_ndjson(request):
+            return await ndjson_response(stream_pvs(namespace, continue_token, selectors))
+        page = await list_pvs(namespace, limit, continue_token, selectors)
+        page.apply_headers(response)
+        return page.items
     except HTTPException as e:
         raise e
 
@@ -257,20 +395,18 @@ async def exec_websocket(
     namespace: str = Query(...),
     pod_name: str = Query(...),
     container_name: str = Query(...),
+    binary: bool = Query(False, description="Send output as channel-prefixed binary messages"),
     user_info: dict = Depends(validate_token),  # Inject user info from the dependency
 ):
     """
     WebSocket endpoint to interactively connect to a Kubernetes container.
     Authentication is performed using Entra ID tokens.
     """
-    # Accept the WebSocket connection after successful authentication
-    await websocket.accept()
-
     # Log the authenticated user's information (optional)
-    print(f"Authenticated user: {user_info.get('preferred_username')}")
+    logger.info(f"Authenticated user: {user_info.get('preferred_username')}")
 
-    # Call the interactive_exec function to handle the Kubernetes interaction
-    await interactive_exec(websocket, namespace, pod_name, container_name)
+    # The connection is accepted once the exec stream to the container is open
+    await interactive_exec(websocket, namespace, pod_name, container_name, binary=binary)
 
 @k8s_resources_router.get("/ws/exec-docs", response_model=dict)
 def websocket_docs():
@@ -284,6 +420,11 @@ def websocket_docs():
             "namespace": "The namespace of the pod.",
             "pod_name": "The name of the pod.",
             "container_name": "The name of the container.",
+            "binary": "Optional. If true, output is sent as binary messages prefixed with the channel byte (1 = stdout, 3 = exit status).",
+        },
+        "messages": {
+            "text": "Written to stdin.",
+            "binary": "First byte is the channel: 0 = stdin, 4 = terminal resize with a JSON body such as {\"Width\": 120, \"Height\": 40}.",
         },
         "authentication": "Requires a Bearer token in the Authorization header.",
     }
@@ -347,7 +488,7 @@ async def cleanup_evicted_pods(namespace: str):
     Create a Kubernetes Job to delete all evicted pods in the given namespace.
     """
     try:
-        return create_cleanup_evicted_pods_job(namespace)
+        return await create_cleanup_evicted_pods_job(namespace)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -358,4 +499,4 @@ async def get_secret_endpoint(request: SecretRequest):
     """
     Retrieve a Kubernetes Secret and its decoded values.
     """
-    return get_secret(request.namespace, request.secret_name)
\ No newline at end of file
+    return await get_secret(request.namespace, request.secret_name)
\ No newline at end of file
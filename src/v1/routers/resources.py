@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from typing import Optional
+from base.pagination import ndjson_response, wants_ndjson
+from base.selectors import Selectors, selector_query
 from v1.controllers.resourceexplorer.controller import (
     get_all_namespaces as controller_get_namespaces,
     get_all_secrets as controller_get_secrets,
+    stream_secrets as controller_stream_secrets,
     delete_deployment as controller_delete_deployment,
     delete_resource as controller_delete_resource
 )
@@ -11,16 +14,31 @@ from v1.models.models import DeleteDeploymentRequest, DeleteResourceRequest
 router = APIRouter()
 
 @router.get("/get-secrets")
-async def get_secrets():
+async def get_secrets(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of secrets to return"),
+    continue_token: Optional[str] = Query(None, alias="continue", description="Continue token from the X-Continue-Token header of the previous page"),
+    selectors: Selectors = Depends(selector_query),
+):
+    """
+    List secret names and namespaces. Send `Accept: application/x-ndjson` to stream them instead.
+    """
     try:
-        return controller_get_secrets()
+        if wants_ndjson(request):
+            return await ndjson_response(controller_stream_secrets(continue_token, selectors))
+        page = await controller_get_secrets(limit, continue_token, selectors)
+        page.apply_headers(response)
+        return page.items
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/get-namespaces")
 async def get_namespaces():
     try:
-        return controller_get_namespaces()
+        return await controller_get_namespaces()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -30,7 +48,7 @@ async def delete_k8s_deployment(request: DeleteDeploymentRequest):
     Delete a Kubernetes deployment.
     """
     try:
-        result = controller_delete_deployment(request.namespace, request.deployment_name)
+        result = await controller_delete_deployment(request.namespace, request.deployment_name)
         return result
     except HTTPException as e:
         raise e
@@ -49,7 +67,7 @@ async def delete_k8s_resource(request: DeleteResourceRequest):
         dict: A success message and details of the deletion.
     """
     try:
-        result = controller_delete_resource(
+        result = await controller_delete_resource(
             request.namespace,
             request.resource_name,
             request.resource_type,
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, Request
-from base.auth import AuthWrapper
+from base.auth import get_auth_wrapper
 
 router = APIRouter(prefix="/auth")
-auth_wrapper = AuthWrapper()
+auth_wrapper = get_auth_wrapper()
 
 async def get_auth_info(request: Request):
     return await auth_wrapper.validate(request, required_resource="*")
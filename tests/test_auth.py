@@ -0,0 +1,28 @@
+import pytest
+from fastapi import HTTPException
+
+from base.auth import AuthWrapper
+
+
+@pytest.fixture
+def auth(monkeypatch):
+    auth = AuthWrapper()
+
+    def read_secret():
+        raise AssertionError("the secret must not be read on the event loop")
+
+    monkeypatch.setattr(auth, "_initialize_api_key", read_secret)
+    return auth
+
+
+async def test_api_key_before_the_key_is_loaded_is_answered_with_503(auth):
+    with pytest.raises(HTTPException) as error:
+        await auth.validate(request=None, api_key="k")
+    assert error.value.status_code == 503
+
+
+async def test_api_key_after_the_key_is_loaded(auth, monkeypatch):
+    monkeypatch.setattr(auth, "_initialize_api_key", lambda: "k")
+    auth.load_api_key()
+
+    assert await auth.validate(request=None, api_key="k") == {"auth_type": "api_key"}
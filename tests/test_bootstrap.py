@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import base.bootstrap
+import main
+from base.bootstrap import Bootstrap
+
+STEPS = ["api_key", "informers", "discovery", "crd_index"]
+
+
+class Steps:
+    """
+    Stand-ins for the startup steps of the lifespan: each one blocks until released and can be made to fail.
+    """
+
+    def __init__(self):
+        self.released = {name: threading.Event() for name in STEPS}
+        self.failing = set()
+
+    def release(self, name: str) -> None:
+        self.released[name].set()
+
+    def blocking(self, name: str):
+        def step():
+            self.released[name].wait(5)
+            if name in self.failing:
+                raise RuntimeError(f"{name} failed")
+        return step
+
+    def coroutine(self, name: str):
+        async def step():
+            while not self.released[name].is_set():
+                await asyncio.sleep(0.01)
+            if name in self.failing:
+                raise RuntimeError(f"{name} failed")
+        return step
+
+
+@pytest.fixture
+def steps(monkeypatch):
+    steps = Steps()
+    monkeypatch.setattr(base.bootstrap, "_default_bootstrap", Bootstrap(started=time.perf_counter(), retry_interval=0.01))
+    monkeypatch.setattr(main, "load_k8s_config", lambda: None)
+    monkeypatch.setattr(main.KubernetesHelper, "get_runtime_info", lambda self: {})
+    monkeypatch.setattr(main.auth_wrapper, "load_api_key", steps.blocking("api_key"))
+    monkeypatch.setattr(main, "start_informers", steps.blocking("informers"))
+    monkeypatch.setattr(main, "warm_discovery", steps.coroutine("discovery"))
+    monkeypatch.setattr(main, "get_crd_index", lambda: type("Index", (), {"refresh": staticmethod(steps.blocking("crd_index"))})())
+    monkeypatch.setattr(main, "stop_informers", lambda: None)
+    yield steps
+    for event in steps.released.values():
+        event.set()
+
+
+def wait_for(client: TestClient, predicate, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get("/readiness")
+        if predicate(response) or time.monotonic() > deadline:
+            return response
+        time.sleep(0.01)
+
+
+def step_status(response, name: str):
+    return response.json()["steps"].get(name, {}).get("status")
+
+
+def test_readiness_waits_for_every_step(steps):
+    with TestClient(main.app) as client:
+        for name in STEPS:
+            response = client.get("/readiness")
+            assert response.status_code == 503
+            assert response.json()["ready"] is False
+            steps.release(name)
+            response = wait_for(client, lambda response: step_status(response, name) == "ok")
+            assert step_status(response, name) == "ok"
+
+        response = wait_for(client, lambda response: response.status_code == 200)
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
+        assert response.json()["startup_seconds"] is not None
+        assert {name: status["status"] for name, status in response.json()["steps"].items()} == dict.fromkeys(STEPS, "ok")
+
+
+def test_failing_step_keeps_readiness_503_until_it_succeeds(steps):
+    steps.failing.add("api_key")
+    with TestClient(main.app) as client:
+        for name in STEPS:
+            steps.release(name)
+        response = wait_for(client, lambda response: response.json()["steps"].get("api_key", {}).get("attempts", 0) >= 3)
+        assert response.status_code == 503
+        assert step_status(response, "api_key") == "failed"
+        assert response.json()["steps"]["api_key"]["error"] == "api_key failed"
+        assert all(step_status(response, name) == "ok" for name in STEPS if name != "api_key")
+
+        # The step is retried; once it succeeds the application becomes ready
+        steps.failing.clear()
+        response = wait_for(client, lambda response: response.status_code == 200)
+        assert response.status_code == 200
+        assert "error" not in response.json()["steps"]["api_key"]
@@ -0,0 +1,70 @@
+import pytest
+from kubernetes import client
+
+import base.clients
+from base.clients import DEFAULT_POOL, INFORMER_POOL, ClientRegistry, get_k8s_pool_size
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(base.clients, "load_k8s_config", lambda: None)
+    registry = ClientRegistry(pool_size=7, tcp_keepalive=True)
+    yield registry
+    registry.close()
+
+
+def test_api_objects_are_shared(registry):
+    core = registry.api(client.CoreV1Api)
+
+    assert registry.api(client.CoreV1Api) is core
+    # Every API group of a pool uses the same ApiClient, i.e. the same connection pool
+    assert registry.api(client.CustomObjectsApi).api_client is core.api_client
+    assert core.api_client is registry.api_client(DEFAULT_POOL)
+
+
+def test_informers_use_a_pool_of_their_own(registry):
+    informer_core = registry.api(client.CoreV1Api, INFORMER_POOL)
+
+    assert informer_core is not registry.api(client.CoreV1Api)
+    assert informer_core.api_client is not registry.api_client(DEFAULT_POOL)
+
+
+def test_pool_configuration(registry):
+    configuration = registry.api_client().configuration
+
+    assert configuration.connection_pool_maxsize == 7
+    assert configuration.keep_alive is True
+    assert registry.api_client().rest_client.pool_manager.connection_pool_kw["maxsize"] == 7
+
+
+def test_pool_size_from_the_environment(monkeypatch):
+    monkeypatch.delenv("K8S_POOL_SIZE", raising=False)
+    monkeypatch.setenv("K8S_MAX_CONNECTIONS", "40")
+    assert get_k8s_pool_size() == 40
+    monkeypatch.setenv("K8S_POOL_SIZE", "12")
+    assert get_k8s_pool_size() == 12
+
+
+def test_default_pool_is_the_kubernetes_client_default(registry):
+    api_client = registry.api_client()
+
+    # Code that creates API objects without a client shares the pool too
+    assert client.CoreV1Api().api_client is api_client
+
+    registry.close()
+    assert client.CoreV1Api().api_client is not api_client
+
+
+def test_pool_stats(registry):
+    api_client = registry.api_client()
+    pool = api_client.rest_client.pool_manager.connection_from_url("https://kubernetes.default:443")
+
+    stats = registry.pool_stats()
+
+    assert stats == [{"client": "sync:default", "host": pool.host, "active": 0, "idle": 0, "max": 7, "waiting": 0}]
+
+    # A connection taken from the pool counts as active until it is returned
+    connection = pool._get_conn()
+    assert registry.pool_stats()[0]["active"] == 1
+    pool._put_conn(connection)
+    assert registry.pool_stats()[0] == {**stats[0], "idle": 1}
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import base.crd_index
+from base.crd_index import CRDIndex
+
+
+def crd(plural: str, group: str = "example.com") -> dict:
+    return {
+        "metadata": {"name": f"{plural}.{group}"},
+        "spec": {
+            "group": group,
+            "scope": "Namespaced",
+            "names": {"plural": plural, "kind": plural.capitalize()},
+            "versions": [{"name": "v1", "served": True}],
+        },
+    }
+
+
+class FakeApiextensions:
+    """
+    Lists the CRDs in `crds`; a list waits for `release` when `block` is set.
+    """
+
+    def __init__(self, crds):
+        self.crds = crds
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.block = False
+        self.release = threading.Event()
+
+    def list_custom_resource_definition(self, **kwargs):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if self.block:
+                self.release.wait(5)
+            return SimpleNamespace(data=json.dumps({"items": self.crds}).encode())
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def api(monkeypatch):
+    api = FakeApiextensions([crd("widgets")])
+    monkeypatch.setattr(base.crd_index, "get_api", lambda api_class: api)
+    monkeypatch.setattr(base.crd_index, "get_informer", lambda name: None)
+    yield api
+    api.release.set()
+
+
+def wait_until(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_first_lookup_builds_the_index(api):
+    index = CRDIndex(ttl=60)
+    assert [match["name"] for match in index.resolve("widgets")] == ["widgets.example.com"]
+    assert index.find("example.com", "widgets")["plural"] == "widgets"
+    assert index.resolve("widgets.example.com") == index.resolve("example_com_widgets")
+    assert api.calls == 1
+
+
+def test_expired_index_is_served_while_one_background_refresh_runs(api):
+    index = CRDIndex(ttl=0)
+    index.refresh()
+    api.crds = [crd("widgets"), crd("gadgets")]
+    api.block = True
+
+    # Every lookup answers from the expired index at once; only one list runs
+    started = time.monotonic()
+    for _ in range(20):
+        assert index.find("example.com", "widgets") is not None
+        assert index.find("example.com", "gadgets") is None
+    assert time.monotonic() - started < 1
+    assert wait_until(lambda: api.active == 1)
+    assert index.stats()["refreshing"] is True
+
+    api.release.set()
+    assert wait_until(lambda: index.find("example.com", "gadgets") is not None)
+    assert api.max_active == 1
+
+
+def test_missing_name_relists_in_the_background(api):
+    index = CRDIndex(ttl=60)
+    index.refresh()
+    index.MISS_REFRESH_INTERVAL = 0
+    api.crds = [crd("widgets"), crd("gadgets")]
+
+    # Not known yet: the miss is answered right away and triggers a relist
+    assert index.resolve("gadgets") == []
+    assert wait_until(lambda: index.resolve("gadgets") != [])
+
+
+def test_failed_background_refresh_keeps_the_previous_index(api):
+    index = CRDIndex(ttl=0)
+    index.refresh()
+
+    def fail(**kwargs):
+        raise RuntimeError("API server unavailable")
+
+    api.list_custom_resource_definition = fail
+    assert index.find("example.com", "widgets") is not None
+    assert wait_until(lambda: not index.stats()["refreshing"])
+    assert index.find("example.com", "widgets") is not None
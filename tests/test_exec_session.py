@@ -0,0 +1,184 @@
+import asyncio
+import queue
+from types import SimpleNamespace
+
+import pytest
+from kubernetes.stream.ws_client import ERROR_CHANNEL, STDIN_CHANNEL, STDOUT_CHANNEL
+from websocket import ABNF, WebSocketConnectionClosedException
+
+from base.exec_session import ExecSession
+
+
+class FakeSocket:
+    """
+    Pod side of the exec stream: frames are read from a queue, `abort` unblocks a pending read.
+    """
+
+    def __init__(self):
+        self.frames: "queue.Queue" = queue.Queue()
+        self.aborted = False
+
+    def emit(self, channel: int, data: bytes) -> None:
+        self.frames.put((ABNF.OPCODE_BINARY, SimpleNamespace(data=bytes([channel]) + data)))
+
+    def close_stream(self) -> None:
+        self.frames.put((ABNF.OPCODE_CLOSE, SimpleNamespace(data=b"")))
+
+    def recv_data_frame(self, control_frame: bool):
+        frame = self.frames.get()
+        if frame is None:
+            raise WebSocketConnectionClosedException("aborted")
+        return frame
+
+    def abort(self) -> None:
+        self.aborted = True
+        self.frames.put(None)
+
+
+class FakeStream:
+    """
+    An exec stream running `cat`: whatever is written to stdin is echoed on stdout.
+    """
+
+    def __init__(self, echo: bool = True):
+        self.sock = FakeSocket()
+        self.echo = echo
+        self.written = []
+
+    def write_channel(self, channel: int, data: bytes) -> None:
+        self.written.append((channel, data))
+        if self.echo and channel == STDIN_CHANNEL:
+            self.sock.emit(STDOUT_CHANNEL, data)
+
+    def close(self) -> None:
+        pass
+
+
+class FakeWebSocket:
+    """
+    Client side: messages to the session are queued with `type_text`/`disconnect`, output is collected.
+    """
+
+    def __init__(self):
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.output: asyncio.Queue = asyncio.Queue()
+        self.accepted = False
+        self.close_code = None
+
+    async def accept(self):
+        self.accepted = True
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def send_text(self, text: str):
+        await self.output.put(text)
+
+    async def send_bytes(self, data: bytes):
+        await self.output.put(data)
+
+    async def close(self, code: int = 1000, reason: str = None):
+        self.close_code = code
+
+    def type_text(self, text: str) -> None:
+        self.incoming.put_nowait({"type": "websocket.receive", "text": text})
+
+    def disconnect(self) -> None:
+        self.incoming.put_nowait({"type": "websocket.disconnect", "code": 1000})
+
+
+def start_session(monkeypatch, pod: FakeStream, websocket: FakeWebSocket, **kwargs) -> asyncio.Task:
+    monkeypatch.setattr(ExecSession, "_connect", lambda self: pod)
+    session = ExecSession(websocket, "default", "pod", "shell", **kwargs)
+    return asyncio.create_task(session.run())
+
+
+def other_tasks():
+    return {task for task in asyncio.all_tasks() if task is not asyncio.current_task()}
+
+
+async def test_output_is_relayed_without_client_input(monkeypatch):
+    pod, websocket = FakeStream(), FakeWebSocket()
+    run = start_session(monkeypatch, pod, websocket)
+
+    # The prompt arrives although the client has not sent anything
+    pod.sock.emit(STDOUT_CHANNEL, b"$ ")
+    assert await asyncio.wait_for(websocket.output.get(), 2) == "$ "
+    assert websocket.accepted
+
+    websocket.type_text("ls\n")
+    assert await asyncio.wait_for(websocket.output.get(), 2) == "ls\n"
+    assert pod.written == [(STDIN_CHANNEL, b"ls\n")]
+
+    websocket.disconnect()
+    await asyncio.wait_for(run, 2)
+
+
+async def test_input_is_written_while_output_streams(monkeypatch):
+    pod, websocket = FakeStream(echo=False), FakeWebSocket()
+    run = start_session(monkeypatch, pod, websocket, queue_size=4)
+
+    # The client sends input while the pod keeps producing output, in both directions at once
+    for index in range(50):
+        pod.sock.emit(STDOUT_CHANNEL, f"line {index}\n".encode())
+        websocket.type_text(f"input {index}\n")
+    received = [await asyncio.wait_for(websocket.output.get(), 2) for _ in range(50)]
+
+    assert received == [f"line {index}\n" for index in range(50)]
+    for _ in range(100):
+        if len(pod.written) == 50:
+            break
+        await asyncio.sleep(0.01)
+    assert pod.written == [(STDIN_CHANNEL, f"input {index}\n".encode()) for index in range(50)]
+
+    websocket.disconnect()
+    await asyncio.wait_for(run, 2)
+
+
+async def test_client_disconnect_tears_down_the_session(monkeypatch):
+    pod, websocket = FakeStream(), FakeWebSocket()
+    run = start_session(monkeypatch, pod, websocket)
+    pod.sock.emit(STDOUT_CHANNEL, b"$ ")
+    await asyncio.wait_for(websocket.output.get(), 2)
+
+    websocket.disconnect()
+    await asyncio.wait_for(run, 2)
+
+    # The reader thread was unblocked and the sender and receiver tasks are gone
+    assert pod.sock.aborted
+    assert other_tasks() == set()
+
+
+async def test_pod_exit_tears_down_the_session(monkeypatch):
+    pod, websocket = FakeStream(), FakeWebSocket()
+    run = start_session(monkeypatch, pod, websocket, binary=True)
+
+    pod.sock.emit(STDOUT_CHANNEL, b"bye\n")
+    pod.sock.emit(ERROR_CHANNEL, b'{"status":"Success"}')
+    pod.sock.close_stream()
+    await asyncio.wait_for(run, 2)
+
+    assert websocket.output.get_nowait() == bytes([STDOUT_CHANNEL]) + b"bye\n"
+    assert websocket.output.get_nowait() == bytes([ERROR_CHANNEL]) + b'{"status":"Success"}'
+    assert websocket.close_code == 1000
+    # The receiver, still waiting for client input, was cancelled
+    assert other_tasks() == set()
+
+
+@pytest.mark.parametrize("sessions", [20])
+async def test_stalled_session_does_not_stall_the_others(monkeypatch, sessions):
+    pods = [FakeStream() for _ in range(sessions)]
+    websockets = [FakeWebSocket() for _ in range(sessions)]
+    connected = iter(pods)
+    monkeypatch.setattr(ExecSession, "_connect", lambda self: next(connected))
+    runs = [asyncio.create_task(ExecSession(websocket, "default", f"pod-{index}", "shell").run()) for index, websocket in enumerate(websockets)]
+
+    # Session 0 never produces output and its client never reads: its reader thread blocks on the pod
+    for websocket in websockets[1:]:
+        websocket.type_text("echo\n")
+    for websocket in websockets[1:]:
+        assert await asyncio.wait_for(websocket.output.get(), 2) == "echo\n"
+
+    for websocket in websockets:
+        websocket.disconnect()
+    await asyncio.wait_for(asyncio.gather(*runs), 5)
@@ -0,0 +1,99 @@
+import copy
+import sys
+
+import pytest
+
+from base.masking import DEFAULT_DENY_PATTERNS, REDACTED, SecretMasker
+from base.utils import mask_secrets
+
+
+@pytest.fixture
+def masker():
+    return SecretMasker(deny_patterns=DEFAULT_DENY_PATTERNS, allow_patterns=[])
+
+
+def test_input_is_not_mutated(masker):
+    document = {
+        "metadata": {"name": "app", "labels": {"tier": "web"}},
+        "spec": {"password": "hunter2", "containers": [{"name": "app", "env": [{"name": "A", "token": "t"}]}]},
+    }
+    original = copy.deepcopy(document)
+
+    masked = masker.mask(document)
+
+    assert document == original
+    assert masked["spec"]["password"] == REDACTED
+    assert masked["spec"]["containers"][0]["env"][0]["token"] == REDACTED
+    # Only the containers on the path to a masked key are copied
+    assert masked["metadata"] is document["metadata"]
+    assert masked["spec"] is not document["spec"]
+
+
+def test_document_without_sensitive_keys_is_returned_as_is(masker):
+    document = {"metadata": {"name": "app"}, "spec": {"replicas": 3, "ports": [{"port": 80}]}}
+    assert masker.mask(document) is document
+
+
+@pytest.mark.parametrize("key", ["PrivateKey", "privateKey", "client_secret", "clientSecret", "API_TOKEN", "Password", "tlsCert", "basicAuth"])
+def test_keys_match_regardless_of_case(masker, key):
+    assert masker.mask({key: "value"}) == {key: REDACTED}
+
+
+@pytest.mark.parametrize("key", ["name", "image", "replicas", "privileged"])
+def test_other_keys_are_kept(masker, key):
+    assert masker.mask({key: "value"}) == {key: "value"}
+
+
+def test_lists_of_dicts_and_nested_lists(masker):
+    document = {"items": [{"secret": "a", "name": "x"}, {"name": "y"}, [{"token": "b"}], "plain"]}
+
+    masked = masker.mask(document)
+
+    assert masked == {"items": [{"secret": REDACTED, "name": "x"}, {"name": "y"}, [{"token": REDACTED}], "plain"]}
+    assert masked["items"][1] is document["items"][1]
+    assert masker.mask([{"password": "p"}]) == [{"password": REDACTED}]
+
+
+def test_deep_nesting_beyond_the_recursion_limit(masker):
+    depth = sys.getrecursionlimit() * 2
+    document = leaf = {}
+    for _ in range(depth):
+        leaf["child"] = {}
+        leaf = leaf["child"]
+    leaf["secret"] = "s"
+
+    masked = masker.mask(document)
+
+    for _ in range(depth):
+        masked = masked["child"]
+    assert masked == {"secret": REDACTED}
+    assert leaf == {"secret": "s"}
+
+
+def test_shared_subdocuments_are_masked_everywhere(masker):
+    shared = {"token": "t"}
+    masked = masker.mask({"a": shared, "b": [shared, shared]})
+    assert masked == {"a": {"token": REDACTED}, "b": [{"token": REDACTED}, {"token": REDACTED}]}
+    assert shared == {"token": "t"}
+
+
+def test_allow_and_deny_patterns():
+    masker = SecretMasker(deny_patterns=["password", "^apikey$"], allow_patterns=["^passwordPolicy$"])
+    masked = masker.mask({"password": "p", "passwordPolicy": "strict", "ApiKey": "k", "apikeyName": "n", "token": "t"})
+    assert masked == {"password": REDACTED, "passwordPolicy": "strict", "ApiKey": REDACTED, "apikeyName": "n", "token": "t"}
+
+
+def test_patterns_from_the_environment(monkeypatch):
+    monkeypatch.setenv("MASKING_DENY_PATTERNS", "credential, ^pin$")
+    monkeypatch.setenv("MASKING_ALLOW_PATTERNS", "^tlsVersion$")
+    masked = SecretMasker().mask({"userCredential": "c", "pin": "1", "spin": "s", "tlsVersion": "1.3", "tls": "x"})
+    assert masked == {"userCredential": REDACTED, "pin": REDACTED, "spin": "s", "tlsVersion": "1.3", "tls": REDACTED}
+
+
+def test_mask_secrets_respects_enable_masking(monkeypatch):
+    document = {"password": "p"}
+    assert mask_secrets(document) == {"password": REDACTED}
+    assert document == {"password": "p"}
+
+    monkeypatch.setenv("ENABLE_MASKING", "false")
+    assert mask_secrets(document) is document
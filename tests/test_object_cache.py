@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from base.object_cache import ResourceVersionCache
+
+
+def test_result_is_reused_while_the_resource_version_matches():
+    cache = ResourceVersionCache(max_size=2)
+    cache.put("a", "1", {"masked": True})
+
+    assert cache.peek("a") == "1"
+    assert cache.get("a", "1") == {"masked": True}
+    assert cache.get("a", "2") is None
+    assert cache.peek("b") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "evictions": 0, "size": 1}
+
+
+def test_least_recently_used_object_is_evicted():
+    cache = ResourceVersionCache(max_size=2)
+    cache.put("a", "1", "a")
+    cache.put("b", "1", "b")
+    cache.get("a", "1")
+    cache.put("c", "1", "c")
+
+    assert cache.peek("b") is None
+    assert cache.peek("a") == "1"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disabled_cache_and_objects_without_resource_version_are_not_stored():
+    disabled = ResourceVersionCache(max_size=0)
+    disabled.put("a", "1", "a")
+    cache = ResourceVersionCache(max_size=2)
+    cache.put("a", None, "a")
+
+    assert not disabled.enabled
+    assert disabled.stats()["size"] == 0
+    assert cache.stats()["size"] == 0
+
+
+def test_counters_are_exact_under_concurrent_lookups():
+    cache = ResourceVersionCache(max_size=1000)
+    for index in range(1000):
+        cache.put(index, "1", index)
+
+    def lookups(_):
+        for index in range(1000):
+            assert cache.peek(index) == "1"
+            cache.peek(-1 - index)
+            cache.get(index, "1")
+            cache.get(index, "2")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lookups, range(8)))
+
+    # One hit per thread and key; misses from the absent keys and the changed resourceVersion
+    assert cache.stats() == {"hits": 8000, "misses": 16000, "evictions": 0, "size": 1000}
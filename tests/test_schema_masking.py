@@ -0,0 +1,176 @@
+import copy
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import v1.controllers.crd
+from base.masking import DEFAULT_DENY_PATTERNS, REDACTED, SchemaMask, SecretMasker, compile_schema_masks
+from v1.controllers.crd import CRDManager
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "spec": {
+            "type": "object",
+            "properties": {
+                "size": {"type": "integer"},
+                # Name not matched by the keywords, marked by the schema
+                "pin": {"type": "string", "format": "password"},
+                "apiToken": {"type": "string"},
+                "users": {"type": "array", "items": {"type": "object", "properties": {
+                    "name": {"type": "string"},
+                    "pw": {"type": "string", "format": "password"},
+                }}},
+                "logins": {"type": "object", "additionalProperties": {"type": "string", "format": "password"}},
+                "env": {"type": "object", "additionalProperties": {"type": "string"}},
+                "backends": {"type": "object", "additionalProperties": {"type": "object", "properties": {
+                    "host": {"type": "string"},
+                    "key": {"type": "string", "format": "password"},
+                }}},
+                "pins": {"type": "array", "items": {"type": "string", "format": "password"}},
+                "raw": {"type": "object", "x-kubernetes-preserve-unknown-fields": True},
+            },
+        },
+        "status": {"type": "object", "properties": {"phase": {"type": "string"}}},
+    },
+}
+
+OBJECT = {
+    "apiVersion": "example.com/v1",
+    "kind": "Widget",
+    "metadata": {"name": "w", "labels": {"app": "w"}, "annotations": {"auth-hint": "a", "note": "n"}},
+    "spec": {
+        "size": 1,
+        "pin": "1234",
+        "apiToken": "t",
+        "users": [{"name": "alice", "pw": "a"}, {"name": "bob", "pw": "b"}],
+        "logins": {"admin": "x", "reader": "y"},
+        "env": {"DB_PASSWORD": "p", "HOST": "h"},
+        "backends": {"primary": {"host": "db", "key": "k"}},
+        "pins": ["1", "2"],
+        "raw": {"nested": {"clientSecret": "s", "mode": "m"}, "pin": "kept"},
+    },
+    "status": {"phase": "Ready"},
+}
+
+
+@pytest.fixture
+def masker():
+    return SecretMasker(deny_patterns=DEFAULT_DENY_PATTERNS, allow_patterns=[])
+
+
+def test_schema_paths_are_masked(masker):
+    document = copy.deepcopy(OBJECT)
+
+    masked = SchemaMask(SCHEMA, masker).mask(document)
+
+    assert document == OBJECT
+    spec = masked["spec"]
+    assert spec["size"] == 1
+    assert spec["pin"] == REDACTED
+    assert spec["apiToken"] == REDACTED
+    assert spec["users"] == [{"name": "alice", "pw": REDACTED}, {"name": "bob", "pw": REDACTED}]
+    assert spec["pins"] == [REDACTED, REDACTED]
+    assert masked["status"] is document["status"]
+
+
+def test_additional_properties_map_values(masker):
+    spec = SchemaMask(SCHEMA, masker).mask(copy.deepcopy(OBJECT))["spec"]
+
+    # Every value of a map of passwords; map keys are data and matched by name
+    assert spec["logins"] == {"admin": REDACTED, "reader": REDACTED}
+    assert spec["env"] == {"DB_PASSWORD": REDACTED, "HOST": "h"}
+    assert spec["backends"] == {"primary": {"host": "db", "key": REDACTED}}
+
+
+def test_preserve_unknown_fields_falls_back_to_key_names(masker):
+    masked = SchemaMask(SCHEMA, masker).mask(copy.deepcopy(OBJECT))
+
+    # Not described by the schema: matched by key name only, so "pin" is kept here
+    assert masked["spec"]["raw"] == {"nested": {"clientSecret": REDACTED, "mode": "m"}, "pin": "kept"}
+    assert masked["metadata"]["annotations"] == {"auth-hint": REDACTED, "note": "n"}
+    assert masked["metadata"]["labels"] == {"app": "w"}
+
+
+def test_analyzed_paths(masker):
+    assert SchemaMask(SCHEMA, masker).paths == [
+        "spec.pin",
+        "spec.apiToken",
+        "spec.users[*].pw",
+        "spec.logins.*",
+        "spec.backends.*.key",
+        "spec.pins[*]",
+        "spec.raw (by key name)",
+    ]
+
+
+def test_object_without_schema_is_masked_by_key_name(masker):
+    document = {"spec": {"password": "p", "nested": [{"token": "t"}], "pin": "1"}}
+    assert SchemaMask(None, masker).mask(document) == {"spec": {"password": REDACTED, "nested": [{"token": REDACTED}], "pin": "1"}}
+
+
+def test_unchanged_object_is_returned_as_is(masker):
+    document = {"spec": {"size": 1, "users": [{"name": "alice"}]}, "status": {"phase": "Ready"}}
+    assert SchemaMask(SCHEMA, masker).mask(document) is document
+
+
+def test_compile_schema_masks_covers_served_versions():
+    crd = {"spec": {"versions": [
+        {"name": "v1", "served": True, "schema": {"openAPIV3Schema": SCHEMA}},
+        {"name": "v1beta1", "served": False, "schema": {"openAPIV3Schema": SCHEMA}},
+        {"name": "v2", "served": True},
+    ]}}
+
+    masks = compile_schema_masks(crd)
+
+    assert sorted(masks) == ["v1", "v2"]
+    assert "spec.pin" in masks["v1"].paths
+    assert masks["v2"].mask({"spec": {"pin": "1"}}) == {"spec": {"pin": "1"}}
+
+
+class FakeCustomObjects:
+    def __init__(self, items):
+        self.items = items
+
+    def list_namespaced_custom_object(self, **kwargs):
+        return SimpleNamespace(data=json.dumps({"apiVersion": "example.com/v1", "kind": "WidgetList", "metadata": {}, "items": self.items}).encode())
+
+
+@pytest.fixture
+def crd_manager(monkeypatch):
+    items = [{"metadata": {"name": "w"}, "spec": {"pin": "1234", "apiToken": "t", "size": 1}}]
+    monkeypatch.setattr(v1.controllers.crd, "get_api", lambda api_class: FakeCustomObjects(items))
+    return CRDManager()
+
+
+def index_with(crd):
+    return SimpleNamespace(find=lambda group, plural: crd)
+
+
+def test_get_crd_items_uses_the_schema_of_an_indexed_crd(monkeypatch, crd_manager):
+    crd = {"name": "widgets.example.com", "masks": {"v1": SchemaMask(SCHEMA)}}
+    monkeypatch.setattr(v1.controllers.crd, "get_crd_index", lambda: index_with(crd))
+
+    items = crd_manager.get_crd_items("example.com", "v1", "widgets", namespace="default")
+
+    assert items["items"][0]["spec"] == {"pin": REDACTED, "apiToken": REDACTED, "size": 1}
+
+
+def test_get_crd_items_falls_back_to_key_names_without_an_indexed_crd(monkeypatch, crd_manager):
+    monkeypatch.setattr(v1.controllers.crd, "get_crd_index", lambda: index_with(None))
+
+    items = crd_manager.get_crd_items("example.com", "v1", "widgets", namespace="default")
+
+    assert items["items"][0]["spec"] == {"pin": "1234", "apiToken": REDACTED, "size": 1}
+
+
+def test_get_crd_items_falls_back_to_key_names_when_the_index_fails(monkeypatch, crd_manager):
+    def unavailable():
+        raise RuntimeError("API server unavailable")
+
+    monkeypatch.setattr(v1.controllers.crd, "get_crd_index", lambda: SimpleNamespace(find=lambda group, plural: unavailable()))
+
+    items = crd_manager.get_crd_items("example.com", "v1", "widgets", namespace="default")
+
+    assert items["items"][0]["spec"] == {"pin": "1234", "apiToken": REDACTED, "size": 1}
@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("resource")
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# Budgets for importing the core application; raise them on slow machines
+IMPORT_BUDGET_SECONDS = float(os.getenv("STARTUP_IMPORT_BUDGET_SECONDS", "2.0"))
+RSS_BUDGET_MB = float(os.getenv("STARTUP_RSS_BUDGET_MB", "120"))
+
+# Cloud SDKs: imported on the first call of their integration, never at startup
+SDK_MODULES = ["boto3", "botocore", "azure", "azure.identity", "azure.containerregistry", "msal"]
+
+# Integrations that must not be imported while their feature is disabled. `requests`
+# itself is not listed: the kubernetes client depends on it
+DISABLED_MODULES = SDK_MODULES + [
+    "v1.controllers.s3",
+    "v1.controllers.acr",
+    "v1.controllers.pypi",
+    "v1.routers.pypi",
+]
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import main
+seconds = time.perf_counter() - started
+print(json.dumps({
+    "seconds": seconds,
+    # Kilobytes on Linux, bytes on macOS
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+def import_main(**env) -> dict:
+    env = {**os.environ, "PYTHONPATH": str(SRC), "ENABLE_TRACING": "false", "LOG_LEVEL": "ERROR", **env}
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=SRC, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture(scope="module")
+def core_import():
+    return import_main(ENABLE_S3="false", ENABLE_ACR="false", ENABLE_PYPI="false")
+
+
+@pytest.fixture(scope="module")
+def full_import():
+    return import_main(ENABLE_S3="true", ENABLE_ACR="true", ENABLE_PYPI="true")
+
+
+def test_core_import_time_within_budget(core_import):
+    assert core_import["seconds"] <= IMPORT_BUDGET_SECONDS, (
+        f"importing main took {core_import['seconds']:.2f}s, budget {IMPORT_BUDGET_SECONDS}s (STARTUP_IMPORT_BUDGET_SECONDS)"
+    )
+
+
+def test_core_rss_within_budget(core_import):
+    assert core_import["max_rss_mb"] <= RSS_BUDGET_MB, (
+        f"importing main peaked at {core_import['max_rss_mb']:.0f} MB RSS, budget {RSS_BUDGET_MB} MB (STARTUP_RSS_BUDGET_MB)"
+    )
+
+
+def test_disabled_integrations_are_not_imported(core_import):
+    loaded = set(core_import["modules"])
+    assert [module for module in DISABLED_MODULES if module in loaded] == []
+
+
+def test_enabled_integrations_do_not_import_the_sdks(full_import):
+    loaded = set(full_import["modules"])
+    assert "v1.controllers.s3" in loaded
+    assert [module for module in SDK_MODULES if module in loaded] == []